@@ -1,5 +1,7 @@
-from fastapi import APIRouter, HTTPException, Request
-from services.data_service import DataService
+import json
+from fastapi import APIRouter, HTTPException, Request, Query, Response
+from fastapi.responses import StreamingResponse
+from services.data_service import DataService, SECTIONS
 from services.indicator_service import IndicatorService
 from services.screener_service import ScreenerService
 from services.drawing_service import DrawingService
@@ -7,7 +9,11 @@ from services.portfolio_service import PortfolioService
 from services.watchlist_service import WatchlistService
 from services.alert_service import AlertService
 from services.news_service import news_service
+from services.quote_stream import QuoteStream
+from services.bar_alerts import BarAlertFeed
 from services.backtest_service import backtest_service
+from services.correlation import MIN_PERIODS
+from services import serialization, screen_expression
 from typing import Optional, List, Dict
 from pydantic import BaseModel
 
@@ -44,16 +50,35 @@ drawing_service = DrawingService()
 portfolio_service = PortfolioService()
 watchlist_service = WatchlistService()
 alert_service = AlertService()
+bar_alerts = BarAlertFeed(data_service, indicator_service, alert_service)
+quote_stream = QuoteStream(data_service.quotes, alert_service, bar_alerts=bar_alerts)
+
+def _sse(events) -> StreamingResponse:
+    """Formats (event, data) pairs from a sync or async generator as a Server-Sent Events response."""
+    def frame(event, data) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    if hasattr(events, '__aiter__'):
+        async def body():
+            async for event, data in events:
+                yield frame(event, data)
+    else:
+        def body():
+            for event, data in events:
+                yield frame(event, data)
+
+    return StreamingResponse(body(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 # --- ALERT ENDPOINTS ---
 
 class AlertInput(BaseModel):
     symbol: str
     target_price: float
-    condition: str # 'ABOVE' or 'BELOW'
+    condition: str # 'ABOVE', 'BELOW' or an indicator condition (alert_service.BAR_CONDITIONS)
 
 class AlertCheckInput(BaseModel):
-    prices: Dict[str, float]
+    prices: Dict[str, float] = {}
 
 @router.get("/alerts")
 def get_alerts(active_only: bool = False):
@@ -75,10 +100,33 @@ def delete_alert(alert_id: int):
 
 @router.post("/alerts/check")
 def check_alerts(input: AlertCheckInput):
-    """Checks current prices against alerts and returns triggered ones."""
-    triggered = alert_service.check_alerts(input.prices)
+    """
+    Checks prices against alerts and returns triggered ones. Without client
+    prices, the active alerts are checked against the shared quote table.
+    """
+    prices = input.prices
+    if not prices:
+        symbols = alert_service.active_symbols()
+        prices = data_service.quotes.get_prices(symbols) if symbols else {}
+    triggered = alert_service.check_alerts(prices) + bar_alerts.check(prices)
     return triggered
 
+# --- LIVE QUOTES ---
+
+@router.get("/quotes/stream")
+def stream_quotes(symbols: Optional[str] = None):
+    """
+    Server-Sent Events quote channel for a comma-separated symbol list (default:
+    the watchlist). Sends a `quotes` snapshot, then `quotes` events with only the
+    symbols whose price changed, `alerts` events with triggered alerts, and `ping`
+    keep-alives. One shared refresher serves every connected client.
+    """
+    if symbols:
+        wanted = [s.strip() for s in symbols.split(',') if s.strip()]
+    else:
+        wanted = [s['symbol'] for s in watchlist_service.get_watchlist()]
+    return _sse(quote_stream.stream(wanted))
+
 # --- WATCHLIST ENDPOINTS ---
 
 class WatchlistInput(BaseModel):
@@ -102,7 +150,7 @@ def get_watchlist_data():
     
     # Check Alerts
     flat_prices = {s: d['price'] for s, d in prices.items()}
-    triggered = alert_service.check_alerts(flat_prices)
+    triggered = alert_service.check_alerts(flat_prices) + bar_alerts.check(flat_prices)
     
     result = []
     for s_meta in symbols_data:
@@ -189,75 +237,182 @@ async def save_drawings(symbol: str, request: Request):
 # --- EXISTING ENDPOINTS ---
 
 @router.get("/stock/{symbol}")
-def get_stock(symbol: str, period: str = "1y", interval: str = "1d", indicators: bool = True):
+def get_stock(request: Request, symbol: str, period: str = "1y", interval: str = "1d", indicators: str = "true",
+              fmt: str = Query("records", alias="format"), sections: str = ",".join(SECTIONS)):
     """
     Get stock data with optional indicators.
+    `indicators` is true/false (all or none) or an explicit selection with
+    parameters, e.g. "RSI:14,EMA:9,BB:20:2", in which case only that set
+    (plus dependencies) is computed and returned.
+    `format=columnar` returns price_data as one array per field with epoch-second
+    `time` values (null for missing values) instead of one dict per bar.
+    Clients sending `Accept: application/vnd.apache.arrow.stream` or
+    `application/msgpack` get the columnar payload in that binary encoding.
+    `sections` picks the side data (fundamental, news, correlation; "none" for
+    candles only). Sections that time out are listed in `pending` and can be
+    loaded from /stock/{symbol}/{section}.
     """
+    if fmt not in ('records', 'columnar'):
+        raise HTTPException(status_code=400, detail=f"Unknown format: {fmt}")
+    media_type = serialization.negotiate(request.headers.get('accept', ''))
+    if media_type is None:
+        raise HTTPException(status_code=406, detail=f"Supported media types: {serialization.available_media_types()}")
+    binary = media_type != serialization.JSON
+    layout = 'arrays' if binary else fmt
+
+    requested = [s.strip().lower() for s in sections.split(',') if s.strip()]
+    if requested == ['none']:
+        requested = []
+    unknown = [s for s in requested if s not in SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown sections: {unknown}")
+
+    flag = indicators.strip().lower()
+    selection = None
+    if flag not in ('true', '1', 'yes', 'on', 'all', 'false', '0', 'no', 'off', 'none', ''):
+        try:
+            selection = indicator_service.parse_indicator_spec(indicators)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
     try:
         # Fetch raw data
-        result = data_service.get_stock_data(symbol, period, interval)
+        result = data_service.get_stock_data(symbol, period, interval, layout=layout, sections=requested)
         
         if result.get('error'):
             raise HTTPException(status_code=400, detail=result['error'])
+        result['price_format'] = 'columnar' if binary else fmt
             
         # Calculate indicators if requested
-        if indicators and result['price_data']:
-            result['price_data'] = indicator_service.add_indicators(result['price_data'])
-            
+        if result['price_data']:
+            if selection is not None:
+                result['price_data'] = indicator_service.add_selected_indicators(
+                    result['price_data'], selection, layout=layout
+                )
+            elif layout != 'records' and flag in ('true', '1', 'yes', 'on', 'all'):
+                result['price_data'] = indicator_service.add_indicators(result['price_data'], layout=layout)
+            elif flag in ('true', '1', 'yes', 'on', 'all'):
+                # Incremental: usually only the last candle changed
+                result['price_data'] = indicator_service.update_indicators(
+                    f"{symbol}_{period}_{interval}", result['price_data']
+                )
+
+        if binary:
+            return Response(content=serialization.encode(result, media_type), media_type=media_type)
         return result
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/stock/{symbol}/{section}")
+def get_stock_section(symbol: str, section: str):
+    """Lazily loaded side section of /stock/{symbol}: fundamental, news or correlation."""
+    if section not in SECTIONS:
+        raise HTTPException(status_code=404, detail=f"Unknown section: {section}")
+    try:
+        return {"symbol": symbol, section: data_service.get_section(symbol, section)}
+    except TimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+@router.get("/correlation/universe")
+def get_universe_correlation(symbols: Optional[str] = None, window: int = 120, top: int = 10,
+                             threshold: float = 0.5, matrix: bool = False):
+    """
+    Daily return correlation across the screener universe (or a comma-separated
+    `symbols` subset) over the last `window` trading days: top / bottom `top`
+    pairs, clusters whose average correlation is at least `threshold`, the
+    dendrogram order and, with matrix=true, the full N x N matrix.
+    """
+    universe = [s.strip() for s in symbols.split(',') if s.strip()] if symbols else screener_service.bist_100_symbols
+    # `window` closes give window - 1 returns, and a symbol needs MIN_PERIODS of them
+    if not MIN_PERIODS + 1 <= window <= 500:
+        raise HTTPException(status_code=400, detail=f"window must be between {MIN_PERIODS + 1} and 500")
+    if not -1.0 <= threshold <= 1.0:
+        raise HTTPException(status_code=400, detail="threshold must be between -1 and 1")
+    return data_service.get_universe_correlation(
+        universe, window=window, top_k=max(0, top), threshold=threshold, include_matrix=matrix
+    )
+
+@router.get("/data/stats")
+def get_data_stats():
+    """Upstream fetch counters (executed vs. coalesced), fetch scheduler state and fundamentals cache hit rates."""
+    return {
+        "upstream": data_service.get_flight_stats(),
+        "scheduler": data_service.get_scheduler_stats(),
+        "quotes": data_service.get_quote_stats(),
+        "quote_stream": quote_stream.get_stats(),
+        "bar_alerts": bar_alerts.get_stats(),
+        "fundamentals": data_service.get_fundamental_cache_stats()
+    }
+
 @router.get("/screener/start")
 def start_screener():
     """Triggers a background scan."""
     screener_service.start_background_scan()
     return {"message": "Screener started in background"}
 
+@router.get("/screener/stream")
+def stream_screener(start: bool = False):
+    """
+    Server-Sent Events stream of the running scan: a `result` event per symbol as
+    soon as it is scored, `progress` events after each chunk and every second,
+    and a final `done` event. With start=true a scan is triggered first.
+    """
+    return _sse(screener_service.stream_scan(start=start))
+
 @router.get("/screener/status")
 def get_screener_status():
     """Returns current scan status and progress."""
     return screener_service.get_status()
 
 @router.get("/screener/results")
-def get_screener_results(filter: Optional[str] = None):
-    """Returns the latest screening results."""
-    return screener_service.get_results(filter_type=filter)
+def get_screener_results(filter: Optional[str] = None, expr: Optional[str] = None):
+    """
+    Returns the latest screening results, optionally narrowed by a screen
+    expression such as `RSI < 30 and CLOSE > MA200 and VOL > 1.5 * VOL_AVG20`.
+    """
+    try:
+        return screener_service.get_results(filter_type=filter, expression=expr)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/screener/fields")
+def get_screener_fields():
+    """Fields (and aliases) available in screen expressions."""
+    return {"fields": screen_expression.FIELDS, "aliases": screen_expression.ALIASES}
 
 @router.get("/index/{symbol}")
 def get_index_data(symbol: str):
     """
     Simplified endpoint for top-bar index tracking (BIST100, etc.)
     """
-    try:
-        # We use a 5d period with 1d interval to get latest change
-        data = data_service.get_stock_data(symbol, "5d", "1d")
-        if data.get('price_data') and len(data['price_data']) >= 2:
-            latest = data['price_data'][-1]
-            prev = data['price_data'][-2]
-            
-            close = latest['Close']
-            change = close - prev['Close']
-            pct = (change / prev['Close']) * 100
-            
-            return {
-                "symbol": symbol,
-                "price": close,
-                "change": change,
-                "percent": pct
-            }
-        return {"error": "Insufficient data"}
-    except Exception as e:
-        return {"error": str(e)}
+    return _index_quotes([symbol])[0]
+
+TOP_INDICES = ["XU100.IS", "USDTRY=X"]
 
 @router.get("/indices")
 def get_top_indices():
-    # Return a quick list of main index values
-    return [
-       get_index_data("XU100.IS"),
-       get_index_data("USDTRY=X")
-    ]
+    # Return a quick list of main index values (one read of the shared quote table)
+    return _index_quotes(TOP_INDICES)
+
+def _index_quotes(symbols: List[str]) -> List[Dict]:
+    try:
+        quotes = data_service.quotes.get_quotes(symbols)
+    except Exception as e:
+        return [{"error": str(e)} for _ in symbols]
+    result = []
+    for symbol in symbols:
+        quote = quotes.get(symbol)
+        if quote is None:
+            result.append({"error": "Insufficient data"})
+            continue
+        result.append({
+            "symbol": symbol,
+            "price": quote['price'],
+            "change": quote['change'],
+            "percent": quote['percent']
+        })
+    return result
 
 @router.get("/symbols")
 def get_all_symbols():
@@ -0,0 +1,100 @@
+"""
+Benchmark: checking a quote tick against many price alerts.
+
+The legacy check reloads every active alert from SQLite, scans them linearly
+and updates hits in the same call. AlertService keeps active alerts in a
+per-symbol sorted book and finds hits with a bisect; triggers are written
+behind in one transaction. Both run the same ticks over the same alerts.
+
+Usage (from backend/):
+    python -m benchmarks.bench_alert_book [alerts] [ticks]
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.alert_service import AlertService
+
+
+def seed(db_path: str, count: int, symbols: list, rng: random.Random):
+    AlertService(db_path=db_path)  # creates the table
+    rows = [(rng.choice(symbols), round(rng.uniform(50, 150), 2), rng.choice(['ABOVE', 'BELOW']))
+            for _ in range(count)]
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany('INSERT INTO alerts (symbol, target_price, condition) VALUES (?, ?, ?)', rows)
+        conn.commit()
+
+
+def legacy_check(db_path: str, prices: dict) -> int:
+    """The previous check_alerts: full reload, linear scan, update in the same call."""
+    with sqlite3.connect(db_path) as conn:
+        conn.row_factory = sqlite3.Row
+        active = [dict(r) for r in conn.execute('SELECT * FROM alerts WHERE is_triggered = 0 ORDER BY created_at DESC')]
+    hits = 0
+    with sqlite3.connect(db_path) as conn:
+        for alert in active:
+            price = prices.get(alert['symbol'])
+            if price is None:
+                continue
+            if (alert['condition'] == 'ABOVE' and price >= alert['target_price']) or \
+                    (alert['condition'] == 'BELOW' and price <= alert['target_price']):
+                conn.execute('UPDATE alerts SET is_triggered = 1, triggered_at = ? WHERE id = ?',
+                             (datetime.now().isoformat(), alert['id']))
+                hits += 1
+        conn.commit()
+    return hits
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = random.Random(42)
+    symbols = [f"SYM{i:03d}" for i in range(100)]
+
+    # Random walk around 100 for a few symbols per tick, like a live quote stream
+    price = {sym: 100.0 for sym in symbols}
+    tape = []
+    for _ in range(ticks):
+        tick = {}
+        for sym in rng.sample(symbols, 10):
+            price[sym] *= 1 + rng.gauss(0, 0.01)
+            tick[sym] = price[sym]
+        tape.append(tick)
+
+    legacy_db = os.path.join(tempfile.mkdtemp(), 'alerts.db')
+    book_db = os.path.join(tempfile.mkdtemp(), 'alerts.db')
+    seed(legacy_db, count, symbols, random.Random(7))
+    seed(book_db, count, symbols, random.Random(7))
+
+    t0 = time.perf_counter()
+    legacy_hits = sum(legacy_check(legacy_db, tick) for tick in tape)
+    legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    service = AlertService(db_path=book_db)
+    load = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    book_hits = sum(len(service.check_alerts(tick)) for tick in tape)
+    book = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    service.flush()
+    flush = time.perf_counter() - t0
+
+    print(f"{count} alerts, {ticks} ticks x 10 symbols")
+    print(f"  legacy (reload + scan)  : {legacy * 1000 / ticks:8.3f} ms/tick, {legacy_hits} triggered")
+    print(f"  indexed book            : {book * 1000 / ticks:8.3f} ms/tick, {book_hits} triggered")
+    print(f"  book load {load * 1000:.1f} ms, write-behind flush {flush * 1000:.1f} ms")
+    with sqlite3.connect(book_db) as conn:
+        stored = conn.execute('SELECT COUNT(*) FROM alerts WHERE is_triggered = 1').fetchone()[0]
+    print(f"  triggered rows in SQLite: {stored}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: indicator alerts on a live price tick.
+
+The naive approach recomputes add_indicators over the full history for every
+active alert on each tick. BarAlertFeed revises only the forming bar of the
+symbols whose price changed (one incremental stream per alerted symbol) and then
+evaluates just those symbols' alerts. The alert count grows with a fixed
+number of changed symbols per tick.
+
+Usage (from backend/):
+    python -m benchmarks.bench_bar_alerts [symbols] [changed_per_tick] [ticks]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import contextlib
+import io
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.alert_service import AlertService, BAR_CONDITIONS
+from services.bar_alerts import BarAlertFeed, PERIOD, INTERVAL
+from services.candle_store import CandleStore
+from services.data_service import DataService
+from services.fundamental_cache import FundamentalCache
+from services.indicator_service import IndicatorService
+from services.market_data import ReplayProvider
+
+
+def main():
+    n_symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    changed = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    ticks = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    rng = random.Random(5)
+
+    provider = ReplayProvider(root_dir=tempfile.mkdtemp(), bars=600)
+    store_dir = tempfile.mkdtemp()
+    data = DataService(provider=provider, candle_store=CandleStore(os.path.join(store_dir, 'candles')),
+                       fundamental_cache=FundamentalCache(provider, os.path.join(store_dir, 'fundamentals.db')))
+    indicators = IndicatorService()
+    symbols = [f"SYM{i:02d}.IS" for i in range(n_symbols)]
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        history = {sym: data.get_stock_data(sym, PERIOD, INTERVAL, sections=())['price_data'] for sym in symbols}
+
+    # Never-firing thresholds keep every alert active for the whole run
+    conditions = ['RSI_CROSS_ABOVE', 'PCT_UP', 'VOLUME_SPIKE']
+    print(f"{n_symbols} symbols, {changed} changed per tick, {ticks} ticks")
+    for per_symbol in (5, 50, 500):
+        alerts = AlertService(db_path=os.path.join(tempfile.mkdtemp(), 'alerts.db'))
+        for sym in symbols:
+            for i in range(per_symbol):
+                alerts.add_alert(sym, 1e9, conditions[i % len(conditions)])
+        feed = BarAlertFeed(data, indicators, alerts)
+        tape = [{sym: history[sym][-1]['Close'] * (1 + rng.gauss(0, 0.01))
+                 for sym in rng.sample(symbols, changed)} for _ in range(ticks)]
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            feed.check({sym: history[sym][-1]['Close'] for sym in symbols})  # seed the incremental streams
+            t0 = time.perf_counter()
+            for tick in tape:
+                feed.check(tick)
+            incremental = (time.perf_counter() - t0) / ticks
+
+        # Naive: one full indicator pass per active alert on each tick
+        active = alerts.get_alerts(active_only=True)
+        sample = active[:50]
+        t0 = time.perf_counter()
+        for alert in sample:
+            rows = indicators.add_indicators(history[alert['symbol']])
+            BAR_CONDITIONS[alert['condition']](rows[-1], rows[-2], alert['target_price'])
+        naive = (time.perf_counter() - t0) / len(sample) * len(active)
+
+        print(f"  {len(active):6d} alerts: naive {naive * 1000:10.1f} ms/tick (extrapolated), "
+              f"incremental {incremental * 1000:7.2f} ms/tick")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Micro-benchmark: CCI mean absolute deviation.
+
+Compares rolling().apply(lambda) (the previous implementation) with
+IndicatorService._rolling_mad on 10k - 100k bars and checks the resulting
+CCI column is identical.
+
+Usage (from backend/):
+    python -m benchmarks.bench_cci
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.indicator_service import IndicatorService
+
+
+def legacy_cci(df: pd.DataFrame, period: int = 20) -> pd.Series:
+    tp = (df['High'] + df['Low'] + df['Close']) / 3
+    sma_tp = tp.rolling(window=period).mean()
+    mad_tp = tp.rolling(window=period).apply(lambda x: np.abs(x - x.mean()).mean())
+    return (tp - sma_tp) / (0.015 * mad_tp)
+
+
+def make_frame(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        'High': close + rng.uniform(0, 1, n),
+        'Low': close - rng.uniform(0, 1, n),
+        'Close': close,
+    })
+
+
+def main():
+    service = IndicatorService()
+    print(f"{'bars':>8} {'lambda ms':>12} {'vector ms':>12} {'speedup':>9}")
+    for n in (10_000, 50_000, 100_000):
+        df = make_frame(n)
+
+        t0 = time.perf_counter()
+        legacy = legacy_cci(df)
+        t1 = time.perf_counter()
+        current = service.add_cci(df.copy())['CCI']
+        t2 = time.perf_counter()
+
+        np.testing.assert_array_equal(legacy.to_numpy(), current.to_numpy())
+        print(f"{n:>8,} {(t1 - t0) * 1000:>12.1f} {(t2 - t1) * 1000:>12.1f} {(t1 - t0) / (t2 - t1):>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: DataService.get_stock_data against the replay provider.
+
+Runs entirely offline: a ReplayProvider with simulated upstream latency
+serves synthetic OHLCV, and the CandleStore lives in a temporary directory.
+Measures a cold fetch, a warm (stored) fetch, and a burst of concurrent
+requests for one symbol, which single-flight collapses to one upstream call.
+
+Usage (from backend/):
+    python -m benchmarks.bench_data_service [latency_ms] [concurrency]
+"""
+
+import os
+import sys
+import time
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.candle_store import CandleStore
+from services.data_service import DataService
+from services.fundamental_cache import FundamentalCache
+from services.market_data import ReplayProvider
+
+
+def make_service(latency_ms: float) -> DataService:
+    provider = ReplayProvider(root_dir=tempfile.mkdtemp(), latency_ms=latency_ms, bars=1500)
+    store_dir = tempfile.mkdtemp()
+    return DataService(provider=provider, candle_store=CandleStore(os.path.join(store_dir, 'candles')),
+                       fundamental_cache=FundamentalCache(provider, os.path.join(store_dir, 'fundamentals.db')))
+
+
+def main():
+    latency_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 150.0
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    service = make_service(latency_ms)
+
+    t0 = time.perf_counter()
+    service.get_stock_data('THYAO.IS', '1y', '1d')
+    t1 = time.perf_counter()
+    service._get_price_data('THYAO.IS', '1y', '1d')
+    t2 = time.perf_counter()
+    print(f"latency {latency_ms:.0f} ms")
+    print(f"cold get_stock_data   {(t1 - t0) * 1000:>9.1f} ms")
+    print(f"warm price data       {(t2 - t1) * 1000:>9.1f} ms")
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        t0 = time.perf_counter()
+        list(pool.map(lambda _: service._get_price_data('AKBNK.IS', '2y', '1d'), range(concurrency)))
+        t1 = time.perf_counter()
+    history = service.get_flight_stats()['datasets']['history']
+    print(f"{concurrency} concurrent cold   {(t1 - t0) * 1000:>9.1f} ms  "
+          f"(executed {history['executed']}, coalesced {history['coalesced']})")
+
+
+if __name__ == "__main__":
+    main()
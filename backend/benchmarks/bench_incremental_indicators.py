@@ -0,0 +1,84 @@
+"""
+Benchmark + equivalence check: IndicatorService.update_indicators (incremental)
+against add_indicators (batch) while candles stream in.
+
+Each step first revises the forming bar, then appends a new one. After every
+step the incremental rows are compared with a full batch recomputation.
+
+Usage (from backend/):
+    python -m benchmarks.bench_incremental_indicators [bars] [steps]
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.indicator_service import IndicatorService
+
+
+def make_bars(n: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = close + rng.normal(0, 0.5, n)
+    high = np.maximum(open_, close) + rng.uniform(0, 1, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 1, n)
+    volume = rng.integers(1_000, 100_000, n).astype(float)
+    dates = pd.date_range('2020-01-01', periods=n, freq='D').strftime('%Y-%m-%dT%H:%M:%S+03:00')
+    return [
+        {"Date": d, "Open": o, "High": h, "Low": l, "Close": c, "Volume": v}
+        for d, o, h, l, c, v in zip(dates, open_, high, low, close, volume)
+    ]
+
+
+def assert_same(incremental, batch):
+    a, b = pd.DataFrame(incremental), pd.DataFrame(batch)
+    assert list(a.columns) == list(b.columns), "column mismatch"
+    num = [c for c in a.columns if c not in ('Date', 'AI_PATTERN_LABEL')]
+    np.testing.assert_allclose(a[num].to_numpy(float), b[num].to_numpy(float), rtol=1e-9, atol=1e-9)
+    assert (a['AI_PATTERN_LABEL'] == b['AI_PATTERN_LABEL']).all(), "pattern mismatch"
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    bars = make_bars(n + steps)
+    rng = np.random.default_rng(1)
+
+    service = IndicatorService()
+    data = bars[:n]
+    service.update_indicators('BENCH_1d', data)
+
+    t_inc = t_batch = 0.0
+    for i in range(steps):
+        # 1. Revise the forming bar
+        last = dict(data[-1])
+        last['Close'] += rng.normal(0, 0.3)
+        last['High'] = max(last['High'], last['Close'])
+        last['Low'] = min(last['Low'], last['Close'])
+        last['Volume'] += 500
+        data = data[:-1] + [last]
+        # 2. ...then a new bar arrives
+        for candles in (data, data + [bars[n + i]]):
+            t0 = time.perf_counter()
+            inc = service.update_indicators('BENCH_1d', candles)
+            t1 = time.perf_counter()
+            batch = service.add_indicators(candles)
+            t2 = time.perf_counter()
+            t_inc += t1 - t0
+            t_batch += t2 - t1
+            assert_same(inc, batch)
+        data = data + [bars[n + i]]
+
+    calls = steps * 2
+    print(f"bars: {n:,}  updates: {calls}  (all rows match batch)")
+    print(f"batch       : {t_batch / calls * 1000:10.2f} ms/update")
+    print(f"incremental : {t_inc / calls * 1000:10.2f} ms/update")
+    print(f"speedup     : {t_batch / t_inc:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: BIST intraday candle normalization in DataService.
+
+Compares the previous per-row loop (iterrows + astimezone + dict records)
+against the vectorized DataService._normalize_candles on synthetic 1m bars.
+
+Usage (from backend/):
+    python -m benchmarks.bench_price_normalize [days]
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import pytz
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.data_service import DataService
+
+
+def make_candles(days: int, step_seconds: int = 60) -> np.ndarray:
+    """Round-the-clock synthetic bars (prepost included) in the CandleStore layout."""
+    start = int(pd.Timestamp('2025-01-06', tz='UTC').timestamp())
+    ts = np.arange(start, start + days * 86400, step_seconds, dtype=np.int64)
+    rng = np.random.default_rng(42)
+    close = 100 + np.cumsum(rng.normal(0, 0.1, len(ts)))
+    open_ = close + rng.normal(0, 0.05, len(ts))
+    high = np.maximum(open_, close) + 0.1
+    low = np.minimum(open_, close) - 0.1
+    volume = rng.integers(100, 10000, len(ts)).astype(np.float64)
+    return np.vstack([ts.astype(np.float64), open_, high, low, close, volume])
+
+
+def legacy_normalize(candles: np.ndarray, symbol: str, interval: str) -> pd.DataFrame:
+    """The row-by-row implementation this benchmark replaces."""
+    df = pd.DataFrame(
+        {col: candles[i + 1] for i, col in enumerate(['Open', 'High', 'Low', 'Close', 'Volume'])},
+        index=pd.to_datetime(candles[0].astype('int64'), unit='s', utc=True)
+    )
+    data = []
+    istanbul_tz = pytz.timezone('Europe/Istanbul')
+    for index, row in df.iterrows():
+        dt_istanbul = index.astimezone(istanbul_tz)
+        is_bist = symbol.upper().endswith('.IS')
+        if is_bist and interval in ["1m", "2m", "5m", "15m", "30m", "1h", "90m"]:
+            total_minutes = dt_istanbul.hour * 60 + dt_istanbul.minute
+            if total_minutes < 600 or total_minutes > 1085:
+                continue
+        data.append({
+            "Date": dt_istanbul.isoformat(),
+            "Open": row['Open'],
+            "High": row['High'],
+            "Low": row['Low'],
+            "Close": row['Close'],
+            "Volume": row['Volume']
+        })
+    return pd.DataFrame(data)
+
+
+def assert_same(legacy: pd.DataFrame, vector: pd.DataFrame):
+    # The legacy loop builds an empty frame without columns when no bar is left
+    if legacy.empty:
+        assert vector.empty, f"expected no bars, got {len(vector)}"
+        return
+    pd.testing.assert_frame_equal(
+        legacy.reset_index(drop=True), vector.reset_index(drop=True), check_dtype=False
+    )
+
+
+def timed(fn, *args, repeat: int = 3):
+    best = float('inf')
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    candles = make_candles(days)
+    args = (candles, 'THYAO.IS', '1m')
+
+    t_legacy, legacy = timed(legacy_normalize, *args, repeat=1)
+    t_vector, vector = timed(DataService._normalize_candles, *args)
+
+    assert_same(legacy, vector)
+
+    # Edge case: a lone bar outside the session (21:00 Istanbul) leaves nothing
+    lone = np.array([[1736100000.0], [100.0], [100.5], [99.5], [100.2], [1000.0]])
+    assert_same(legacy_normalize(lone, 'THYAO.IS', '1m'), DataService._normalize_candles(lone, 'THYAO.IS', '1m'))
+
+    print(f"bars in: {candles.shape[1]:,}  bars out: {len(vector):,}")
+    print(f"legacy loop : {t_legacy * 1000:10.1f} ms")
+    print(f"vectorized  : {t_vector * 1000:10.1f} ms")
+    print(f"speedup     : {t_legacy / t_vector:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
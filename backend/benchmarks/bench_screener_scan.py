@@ -0,0 +1,145 @@
+"""
+Benchmark: screener scan, per-symbol history vs. bulk chunked download.
+
+Both paths run against a ReplayProvider with simulated upstream latency
+per round trip. The fetch phase compares the previous layout (10 workers,
+one history call per symbol) with chunked bulk_history requests; the full
+scan line is ScreenerService._run_scan end to end, checked against the
+original per-symbol scoring (IndicatorService.add_indicators over each
+symbol's history, reproduced below). The scoring line compares one
+vectorized pass over the stored universe with scoring each symbol on its own.
+
+Usage (from backend/):
+    python -m benchmarks.bench_screener_scan [latency_ms] [chunk_size]
+"""
+
+import os
+import sys
+import time
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.candle_store import CandleStore
+from services.indicator_service import IndicatorService
+from services.market_data import ReplayProvider
+from services.screener_service import PANEL_BARS, ScreenerService
+
+
+def legacy_score(indicator_service: IndicatorService, symbol: str, df: pd.DataFrame) -> Optional[Dict]:
+    """The screener's scoring before the panel: full add_indicators, then the signal rules on the last two rows."""
+    if df is None or df.empty:
+        return None
+    records = df.reset_index().to_dict(orient='records')
+    for r in records:
+        if 'Date' not in r and 'index' in r: r['Date'] = r['index']
+        elif 'Date' not in r and 'Datetime' in r: r['Date'] = r['Datetime']
+    analyzed = indicator_service.add_indicators(records)
+    if not analyzed:
+        return None
+
+    last = analyzed[-1]
+    prev = analyzed[-2] if len(analyzed) > 1 else last
+    close = float(last.get('Close', 0))
+    rsi = float(last.get('RSI', 50))
+    prev_rsi = float(prev.get('RSI', 50))
+    ema200 = float(last.get('MA200', 0))
+    ema50 = float(last.get('MA50', 0))
+    prev_close = float(prev.get('Close', 0))
+    prev_ema200 = float(prev.get('MA200', 0))
+    prev_ema50 = float(prev.get('MA50', 0))
+
+    score = 0
+    signals = []
+    if rsi < 30:
+        score += 40
+        signals.append('oversold')
+        if rsi > prev_rsi:
+            score += 20
+            signals.append('dip_donus')
+    elif rsi < 40:
+        score += 20
+        signals.append('accumulation')
+        if rsi > prev_rsi:
+            score += 10
+            signals.append('rsi_rising')
+    elif rsi < 60:
+        score += 5
+    elif rsi < 70:
+        score += 10
+        signals.append('momentum')
+    else:
+        score += 5
+        signals.append('overbought')
+        if rsi > 80:
+            signals.append('extreme_overbought')
+
+    if ema200 > 0 and close > ema200 and prev_close <= prev_ema200:
+        score += 35
+        signals.append('ema_cross')
+    elif ema200 > 0 and close > ema200:
+        score += 10
+    if ema50 > 0 and ema200 > 0 and ema50 > ema200 and prev_ema50 <= prev_ema200:
+        score += 30
+        signals.append('golden_cross')
+    if ema50 > 0 and ema200 > 0 and ema50 < ema200 and prev_ema50 >= prev_ema200:
+        score -= 10
+        signals.append('death_cross')
+
+    return {'symbol': symbol, 'price': round(close, 2), 'rsi': round(rsi, 2), 'ema200': round(ema200, 2),
+            'score': max(min(score, 100), 0), 'signals': signals}
+
+
+def fingerprint(result: Dict) -> tuple:
+    return (result['symbol'], result['score'], result['price'], result['rsi'], result['ema200'],
+            tuple(s if isinstance(s, str) else s['type'] for s in result['signals']))
+
+
+def main():
+    latency_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 200.0
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    provider = ReplayProvider(root_dir=tempfile.mkdtemp(), latency_ms=latency_ms, bars=400)
+    screener = ScreenerService(IndicatorService(), provider=provider, chunk_size=chunk_size,
+                               candle_store=CandleStore(tempfile.mkdtemp()),
+                               state_path=os.path.join(tempfile.mkdtemp(), 'screener_results.json'))
+    symbols = list(dict.fromkeys(screener.bist_100_symbols))
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        frames = list(pool.map(lambda sym: provider.history(sym, period="1y", interval="1d", auto_adjust=False),
+                               symbols))
+    t1 = time.perf_counter()
+    chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+    with ThreadPoolExecutor(max_workers=screener.scheduler.max_concurrency) as pool:
+        list(pool.map(screener._fetch_chunk, chunks))
+    t2 = time.perf_counter()
+    print(f"{len(symbols)} symbols, latency {latency_ms:.0f} ms, chunk {chunk_size}")
+    print(f"fetch per-symbol  {t1 - t0:>7.2f} s")
+    print(f"fetch bulk        {t2 - t1:>7.2f} s   ({(t1 - t0) / (t2 - t1):.1f}x)")
+
+    t0 = time.perf_counter()
+    screener._run_scan()
+    t1 = time.perf_counter()
+    legacy = [legacy_score(screener.indicator_service, sym, df) for sym, df in zip(symbols, frames)]
+    same = sorted(fingerprint(r) for r in legacy if r) == sorted(fingerprint(r) for r in screener.get_results())
+    print(f"full scan (bulk)  {t1 - t0:>7.2f} s   (matches add_indicators scoring: {same})")
+
+    closes = [screener._store.read(sym, "1d")[4] for sym in symbols]
+    t0 = time.perf_counter()
+    for sym, close in zip(symbols, closes):
+        panel, lengths = screener._stack_panel([close[-PANEL_BARS:]])
+        screener._score_panel([sym], panel, lengths)
+    t1 = time.perf_counter()
+    panel, lengths = screener._stack_panel([close[-PANEL_BARS:] for close in closes])
+    screener._score_panel(symbols, panel, lengths)
+    t2 = time.perf_counter()
+    print(f"scoring per-symbol {(t1 - t0) * 1000:>6.1f} ms")
+    print(f"scoring panel      {(t2 - t1) * 1000:>6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
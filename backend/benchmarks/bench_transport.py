@@ -0,0 +1,79 @@
+"""
+Benchmark: chart payload encoding for /api/stock.
+
+Compares payload size and encode time of JSON records (default), JSON
+columnar, Arrow IPC stream and MessagePack for synthetic intraday bars with
+every indicator attached. JSON is encoded the way Starlette's JSONResponse
+does it. Binary formats are skipped when pyarrow / msgpack are missing.
+
+Usage (from backend/):
+    python -m benchmarks.bench_transport [bars]
+"""
+
+import os
+import sys
+import json
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.indicator_service import IndicatorService
+from services import serialization
+
+
+def make_columns(n: int):
+    rng = np.random.default_rng(3)
+    close = 100 + np.cumsum(rng.normal(0, 0.2, n))
+    open_ = close + rng.normal(0, 0.1, n)
+    return {
+        'time': 1_736_150_400 + 300 * np.arange(n, dtype=np.int64),
+        'Open': open_,
+        'High': np.maximum(open_, close) + 0.1,
+        'Low': np.minimum(open_, close) - 0.1,
+        'Close': close,
+        'Volume': rng.integers(100, 10_000, n).astype(np.float64),
+    }
+
+
+def json_dumps(content) -> bytes:
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def timed(fn, repeat: int = 3):
+    best, out = float('inf'), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    service = IndicatorService()
+    columns = make_columns(n)
+    meta = {'symbol': 'BENCH.IS', 'timestamp': '', 'fundamental': {}, 'news': [], 'error': None}
+
+    arrays = service.add_indicators(columns, layout='arrays')
+    records = [dict(zip(arrays, row)) for row in zip(*(a.tolist() for a in arrays.values()))]
+    records = [{k: (0 if isinstance(v, float) and not np.isfinite(v) else v) for k, v in r.items()} for r in records]
+
+    cases = [
+        ('json records', lambda: json_dumps({**meta, 'price_data': records})),
+        ('json columnar', lambda: json_dumps({**meta, 'price_data': serialization.to_json_columns(arrays)})),
+    ]
+    if serialization.pa is not None:
+        cases.append(('arrow stream', lambda: serialization.encode_arrow({**meta, 'price_data': arrays})))
+    if serialization.msgpack is not None:
+        cases.append(('msgpack', lambda: serialization.encode_msgpack({**meta, 'price_data': arrays})))
+
+    print(f"bars: {n:,}  columns: {len(arrays)}")
+    print(f"{'format':<15} {'bytes':>12} {'encode ms':>10}")
+    for name, fn in cases:
+        t, payload = timed(fn)
+        print(f"{name:<15} {len(payload):>12,} {t * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,78 @@
 import sqlite3
 import os
+import time
+import atexit
+import bisect
+import threading
 from datetime import datetime
 from typing import List, Dict, Optional
 
+INF = float('inf')
+
+PRICE_CONDITIONS = ('ABOVE', 'BELOW')
+
+
+def _cross_above(prev: float, curr: float, level: float) -> bool:
+    return prev < level <= curr
+
+
+def _cross_below(prev: float, curr: float, level: float) -> bool:
+    return prev > level >= curr
+
+
+# Indicator conditions, evaluated on the latest bar of IndicatorService rows:
+# name -> fn(row, prev_row, target). `target` is the condition's parameter
+# (RSI level, percent, volume multiple) and is ignored where it has none.
+# ST_TREND is -1 in an uptrend and 1 in a downtrend; NW_SIGNAL is 1 buy / -1 sell.
+BAR_CONDITIONS = {
+    'RSI_CROSS_ABOVE': lambda row, prev, t: _cross_above(prev['RSI'], row['RSI'], t),
+    'RSI_CROSS_BELOW': lambda row, prev, t: _cross_below(prev['RSI'], row['RSI'], t),
+    'CLOSE_ABOVE_MA200': lambda row, prev, t: row['MA200'] > 0 and row['Close'] > row['MA200'],
+    'CLOSE_BELOW_MA200': lambda row, prev, t: row['MA200'] > 0 and row['Close'] < row['MA200'],
+    'ST_FLIP_UP': lambda row, prev, t: prev['ST_TREND'] == 1 and row['ST_TREND'] == -1,
+    'ST_FLIP_DOWN': lambda row, prev, t: prev['ST_TREND'] == -1 and row['ST_TREND'] == 1,
+    'PCT_UP': lambda row, prev, t: prev['Close'] > 0 and (row['Close'] / prev['Close'] - 1) * 100 >= t,
+    'PCT_DOWN': lambda row, prev, t: prev['Close'] > 0 and (row['Close'] / prev['Close'] - 1) * 100 <= -t,
+    'VOLUME_SPIKE': lambda row, prev, t: row.get('VOL_AVG20', 0) > 0 and row['Volume'] >= t * row['VOL_AVG20'],
+    'NW_BUY': lambda row, prev, t: row['NW_SIGNAL'] == 1,
+    'NW_SELL': lambda row, prev, t: row['NW_SIGNAL'] == -1,
+}
+
+
 class AlertService:
-    def __init__(self, db_path: str = None):
+    """
+    Price alerts. SQLite is the system of record; active alerts are also kept in
+    an in-memory book per symbol with ABOVE and BELOW thresholds as sorted
+    (target, id) lists, so a price finds every triggered alert with one bisect.
+    Triggers are applied to the book immediately and written to SQLite in
+    batched write-behind transactions (every `flush_interval` seconds).
+
+    Indicator alerts (BAR_CONDITIONS) are kept per symbol and only evaluated
+    by check_bar() when that symbol gets a new or revised bar.
+    """
+
+    def __init__(self, db_path: str = None, flush_interval: float = 1.0):
         if db_path is None:
             # Consistent with other services
             db_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
             os.makedirs(db_dir, exist_ok=True)
             db_path = os.path.join(db_dir, 'alerts.db')
         self.db_path = db_path
+        self.flush_interval = flush_interval
         self._init_db()
 
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._active: Dict[int, Dict] = {}  # {id: alert row}
+        self._book: Dict[str, Dict[str, List[tuple]]] = {}  # {symbol: {'ABOVE': [(target, id)], 'BELOW': [...]}}
+        self._bar_alerts: Dict[str, Dict[int, Dict]] = {}  # {symbol: {id: alert}} for BAR_CONDITIONS
+        self._pending: List[tuple] = []  # (triggered_at, id) not yet written to SQLite
+        self._flush_wake = threading.Event()
+        self._load_book()
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True, name='alert-flush')
+        self._flusher.start()
+        atexit.register(self.flush)
+
     def _init_db(self):
         """Initializes the SQLite database with the alerts table."""
         with sqlite3.connect(self.db_path) as conn:
@@ -21,7 +81,7 @@ class AlertService:
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     symbol TEXT NOT NULL,
                     target_price REAL NOT NULL,
-                    condition TEXT NOT NULL, -- 'ABOVE' or 'BELOW'
+                    condition TEXT NOT NULL, -- 'ABOVE', 'BELOW' or one of BAR_CONDITIONS
                     is_triggered INTEGER DEFAULT 0,
                     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                     triggered_at DATETIME
@@ -30,34 +90,39 @@ class AlertService:
             conn.commit()
 
     def add_alert(self, symbol: str, target_price: float, condition: str) -> bool:
-        """Adds a new price alert."""
+        """Adds a new price alert, or an indicator alert with target_price as its parameter."""
         symbol = symbol.upper().strip()
         condition = condition.upper().strip()
-        if condition not in ['ABOVE', 'BELOW']:
+        if condition not in PRICE_CONDITIONS and condition not in BAR_CONDITIONS:
             return False
             
         try:
             with sqlite3.connect(self.db_path) as conn:
-                conn.execute(
+                conn.row_factory = sqlite3.Row
+                cursor = conn.execute(
                     'INSERT INTO alerts (symbol, target_price, condition) VALUES (?, ?, ?)',
                     (symbol, target_price, condition)
                 )
+                row = conn.execute('SELECT * FROM alerts WHERE id = ?', (cursor.lastrowid,)).fetchone()
                 conn.commit()
-                return True
+            with self._lock:
+                self._index(dict(row))
+            return True
         except Exception as e:
             print(f"Error adding alert for {symbol}: {e}")
             return False
 
     def get_alerts(self, active_only: bool = False) -> List[Dict]:
-        """Retrieves alerts from the database."""
+        """Retrieves alerts; active ones come from the in-memory book, the full history from the database."""
+        if active_only:
+            with self._lock:
+                return [dict(alert) for _, alert in sorted(self._active.items(), reverse=True)]
+        self.flush()
         try:
             with sqlite3.connect(self.db_path) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
-                if active_only:
-                    cursor.execute('SELECT * FROM alerts WHERE is_triggered = 0 ORDER BY created_at DESC')
-                else:
-                    cursor.execute('SELECT * FROM alerts ORDER BY created_at DESC')
+                cursor.execute('SELECT * FROM alerts ORDER BY created_at DESC, id DESC')
                 rows = cursor.fetchall()
                 return [dict(row) for row in rows]
         except Exception as e:
@@ -70,50 +135,148 @@ class AlertService:
             with sqlite3.connect(self.db_path) as conn:
                 conn.execute('DELETE FROM alerts WHERE id = ?', (alert_id,))
                 conn.commit()
-                return True
+            with self._lock:
+                self._unindex(alert_id)
+            return True
         except Exception as e:
             print(f"Error deleting alert {alert_id}: {e}")
             return False
 
+    def active_symbols(self) -> List[str]:
+        """Symbols that have at least one active alert."""
+        with self._lock:
+            return list(self._book.keys() | self._bar_alerts.keys())
+
+    def bar_symbols(self) -> List[str]:
+        """Symbols that have at least one active indicator alert."""
+        with self._lock:
+            return list(self._bar_alerts)
+
     def check_alerts(self, current_prices: Dict[str, float]) -> List[Dict]:
         """
         Checks current prices against active alerts and returns triggered ones.
-        Updates triggered status in DB.
+        Triggered alerts leave the book at once; the DB update is written behind.
         """
         triggered = []
-        try:
-            active_alerts = self.get_alerts(active_only=True)
-            if not active_alerts:
+        now = datetime.now().isoformat()
+        with self._lock:
+            for symbol, curr_price in current_prices.items():
+                sides = self._book.get(symbol)
+                if sides is None or curr_price is None:
+                    continue
+                # ABOVE hits every target <= price (a prefix), BELOW every target >= price (a suffix)
+                above = sides['ABOVE']
+                cut = bisect.bisect_right(above, (curr_price, INF))
+                hits = above[:cut]
+                del above[:cut]
+                below = sides['BELOW']
+                cut = bisect.bisect_left(below, (curr_price, -INF))
+                hits += below[cut:]
+                del below[cut:]
+                if not above and not below:
+                    del self._book[symbol]
+
+                for _, alert_id in hits:
+                    alert_dict = dict(self._active.pop(alert_id))
+                    alert_dict['triggered_price'] = curr_price
+                    alert_dict['triggered_at'] = now
+                    triggered.append(alert_dict)
+                    self._pending.append((now, alert_id))
+        if triggered:
+            self._flush_wake.set()
+        return triggered
+
+    def check_bar(self, symbol: str, row: Dict, prev: Dict) -> List[Dict]:
+        """
+        Evaluates the symbol's indicator alerts on its latest bar. `row` and `prev`
+        are the last two IndicatorService rows (row may carry VOL_AVG20, the mean
+        volume of the 20 bars before it). Cost depends only on this symbol's alerts.
+        """
+        triggered = []
+        now = datetime.now().isoformat()
+        with self._lock:
+            alerts = self._bar_alerts.get(symbol)
+            if not alerts:
                 return []
+            for alert_id, alert in list(alerts.items()):
+                try:
+                    is_hit = BAR_CONDITIONS[alert['condition']](row, prev, alert['target_price'])
+                except (KeyError, TypeError, ZeroDivisionError):
+                    continue
+                if not is_hit:
+                    continue
+                del alerts[alert_id]
+                alert_dict = dict(self._active.pop(alert_id))
+                alert_dict['triggered_price'] = row['Close']
+                alert_dict['triggered_at'] = now
+                triggered.append(alert_dict)
+                self._pending.append((now, alert_id))
+            if not alerts:
+                del self._bar_alerts[symbol]
+        if triggered:
+            self._flush_wake.set()
+        return triggered
+
+    def flush(self):
+        """Writes pending triggers to SQLite in one transaction."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return
+            try:
+                with sqlite3.connect(self.db_path) as conn:
+                    conn.executemany('UPDATE alerts SET is_triggered = 1, triggered_at = ? WHERE id = ?', pending)
+                    conn.commit()
+            except Exception as e:
+                print(f"Error saving triggered alerts: {e}")
+                with self._lock:
+                    self._pending = pending + self._pending
+
+    # ---- In-memory book ----
 
+    def _load_book(self):
+        try:
             with sqlite3.connect(self.db_path) as conn:
-                for alert in active_alerts:
-                    symbol = alert['symbol']
-                    if symbol not in current_prices:
-                        continue
-                        
-                    curr_price = current_prices[symbol]
-                    target = alert['target_price']
-                    condition = alert['condition']
-                    is_hit = False
-                    
-                    if condition == 'ABOVE' and curr_price >= target:
-                        is_hit = True
-                    elif condition == 'BELOW' and curr_price <= target:
-                        is_hit = True
-                        
-                    if is_hit:
-                        now = datetime.now().isoformat()
-                        conn.execute(
-                            'UPDATE alerts SET is_triggered = 1, triggered_at = ? WHERE id = ?',
-                            (now, alert['id'])
-                        )
-                        alert_dict = dict(alert)
-                        alert_dict['triggered_price'] = curr_price
-                        alert_dict['triggered_at'] = now
-                        triggered.append(alert_dict)
-                conn.commit()
+                conn.row_factory = sqlite3.Row
+                rows = conn.execute('SELECT * FROM alerts WHERE is_triggered = 0').fetchall()
         except Exception as e:
-            print(f"Error checking alerts: {e}")
-            
-        return triggered
+            print(f"Error loading alerts: {e}")
+            rows = []
+        with self._lock:
+            for row in rows:
+                self._index(dict(row))
+
+    def _index(self, alert: Dict):
+        self._active[alert['id']] = alert
+        if alert['condition'] in BAR_CONDITIONS:
+            self._bar_alerts.setdefault(alert['symbol'], {})[alert['id']] = alert
+            return
+        sides = self._book.setdefault(alert['symbol'], {'ABOVE': [], 'BELOW': []})
+        bisect.insort(sides[alert['condition']], (alert['target_price'], alert['id']))
+
+    def _unindex(self, alert_id: int):
+        alert = self._active.pop(alert_id, None)
+        if alert is None:
+            return
+        if alert['condition'] in BAR_CONDITIONS:
+            alerts = self._bar_alerts[alert['symbol']]
+            alerts.pop(alert_id, None)
+            if not alerts:
+                del self._bar_alerts[alert['symbol']]
+            return
+        sides = self._book[alert['symbol']]
+        entries = sides[alert['condition']]
+        i = bisect.bisect_left(entries, (alert['target_price'], alert_id))
+        if i < len(entries) and entries[i][1] == alert_id:
+            del entries[i]
+        if not sides['ABOVE'] and not sides['BELOW']:
+            del self._book[alert['symbol']]
+
+    def _flush_loop(self):
+        while True:
+            self._flush_wake.wait()
+            # Let a burst of ticks collect into one transaction
+            time.sleep(self.flush_interval)
+            self._flush_wake.clear()
+            self.flush()
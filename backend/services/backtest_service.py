@@ -1,17 +1,16 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
 from datetime import datetime, timedelta
+from .market_data import MarketDataProvider, get_provider
 
 class BacktestService:
-    def __init__(self):
-        pass
+    def __init__(self, provider: MarketDataProvider = None):
+        self.provider = provider or get_provider()
 
     def run_backtest(self, symbol: str, strategy_name: str, params: dict, initial_capital: float = 10000.0):
         # 1. Fetch historical data (using 1y daily for now)
         try:
-            ticker = yf.Ticker(symbol)
-            df = ticker.history(period="1y", interval="1d")
+            df = self.provider.history(symbol, period="1y", interval="1d")
             if df.empty:
                 return {"error": "No data found for symbol"}
         except Exception as e:
@@ -0,0 +1,156 @@
+"""
+Bar Alerts - feeds live prices into indicator alerts.
+
+Every symbol with indicator alerts (AlertService.BAR_CONDITIONS) gets its own
+incremental indicator stream, seeded once from the stored daily candles. A
+new price then only reads the last few stored candles (to pick up a new
+session) and revises the forming bar from the stream's rolling state, and
+AlertService.check_bar evaluates that symbol's alerts on the result. The
+quote stream, /watchlist/data and /alerts/check all call in concurrently, so
+each symbol's advance, forming-bar update and row read run under that
+symbol's lock. Work
+per tick therefore scales with the symbols whose price changed and that
+have indicator alerts, not with the total number of alerts or the length
+of the history. Streams are dropped when a symbol's last alert goes.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .alert_service import AlertService
+from .data_service import DataService
+from .indicator_service import IndicatorService
+
+PERIOD = "2y"  # enough history for MA200 and the incremental state's warm-up
+TAIL_PERIOD = "5d"  # per-tick read: just the latest sessions
+INTERVAL = "1d"
+
+
+class BarAlertFeed:
+    def __init__(self, data_service: DataService, indicator_service: IndicatorService, alert_service: AlertService):
+        self.data = data_service
+        self.indicators = indicator_service
+        self.alerts = alert_service
+        # {symbol: {'state', 'records', 'ts': forming bar TS, 'bar': stored forming bar}}
+        self._streams: Dict[str, Dict] = {}
+        self._evaluated: Dict[str, tuple] = {}  # {symbol: (bar TS, close) last evaluated}
+        self._symbol_locks: Dict[str, threading.Lock] = {}  # kept when a stream is dropped, so one lock per symbol
+        self._lock = threading.Lock()
+
+    def check(self, prices: Dict[str, float]) -> List[Dict]:
+        """Evaluates indicator alerts for the symbols in `prices`; returns the triggered ones."""
+        symbols = set(self.alerts.bar_symbols())
+        with self._lock:
+            for symbol in set(self._streams) - symbols:
+                del self._streams[symbol]
+                self._evaluated.pop(symbol, None)
+
+        triggered = []
+        for symbol in set(prices) & symbols:
+            with self._lock:
+                symbol_lock = self._symbol_locks.setdefault(symbol, threading.Lock())
+            try:
+                with symbol_lock:
+                    row, prev = self._latest_bars(symbol, prices[symbol])
+            except Exception as e:
+                print(f"Bar alert error ({symbol}): {e}")
+                continue
+            if row is None:
+                continue
+            # Same bar, same close: nothing new to evaluate
+            key = (row['Date'], row['Close'])
+            with self._lock:
+                if self._evaluated.get(symbol) == key:
+                    continue
+                self._evaluated[symbol] = key
+            triggered += self.alerts.check_bar(symbol, row, prev)
+        return triggered
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {'streams': len(self._streams)}
+
+    # ---- Streams ----
+
+    def _latest_bars(self, symbol: str, price: Optional[float]) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """Last two indicator rows with the live price applied to the forming bar (caller holds the symbol lock)."""
+        with self._lock:
+            stream = self._streams.get(symbol)
+        if stream is not None:
+            stream = self._advance(symbol, stream)
+        if stream is None:
+            stream = self._seed(symbol)
+            if stream is None:
+                return None, None
+            with self._lock:
+                self._streams[symbol] = stream
+
+        bar = dict(stream['bar'])
+        if price:
+            bar['Close'] = price
+            bar['High'] = max(bar['High'], price)
+            bar['Low'] = min(bar['Low'], price)
+        state = stream['state']
+        if state is None:
+            # History shorter than the incremental warm-up: the (small) batch path
+            rows = self.indicators.add_indicators(stream['records'][:-1] + [bar])
+        elif state.update_bar(bar) is None:
+            return None, None
+        else:
+            rows = state.records
+        if len(rows) < 2:
+            return None, None
+
+        row, prev = dict(rows[-1]), dict(rows[-2])
+        volumes = [r['Volume'] for r in rows[-21:-1]]
+        row['VOL_AVG20'] = sum(volumes) / len(volumes) if len(volumes) == 20 else 0.0
+        return row, prev
+
+    def _seed(self, symbol: str) -> Optional[Dict]:
+        """New stream from the stored history (state is None when it is too short)."""
+        candles = self.data.get_candles(symbol, PERIOD, INTERVAL)
+        if candles is None or candles.shape[1] < 2:
+            return None
+        records = [self._record(candles[:, i]) for i in range(candles.shape[1])]
+        state, _ = self.indicators.create_stream(records)
+        return {'state': state, 'records': None if state else records,
+                'ts': records[-1]['Date'], 'bar': records[-1]}
+
+    def _advance(self, symbol: str, stream: Dict) -> Optional[Dict]:
+        """Moves the stream onto the latest stored sessions; None when it has to be re-seeded."""
+        state = stream['state']
+        if state is None:
+            return None
+        tail = self.data.get_candles(symbol, TAIL_PERIOD, INTERVAL)
+        if tail is None or not tail.shape[1]:
+            return stream
+        last_ts = float(tail[0, -1])
+        if last_ts == stream['ts']:
+            stream['bar'] = self._record(tail[:, -1])
+            return stream
+        if last_ts < stream['ts'] or not np.any(tail[0] == stream['ts']):
+            return None
+
+        # Finalize the previous forming bar from the store, then append the new sessions
+        start = int(np.searchsorted(tail[0], stream['ts']))
+        if state.update_bar(self._record(tail[:, start])) is None:
+            return None
+        for i in range(start + 1, tail.shape[1]):
+            if state.update_bar(self._record(tail[:, i]), append=True) is None:
+                return None
+        stream['ts'] = last_ts
+        stream['bar'] = self._record(tail[:, -1])
+        return stream
+
+    @staticmethod
+    def _record(candle: np.ndarray) -> Dict:
+        return {
+            'Date': float(candle[0]),
+            'Open': float(candle[1]),
+            'High': float(candle[2]),
+            'Low': float(candle[3]),
+            'Close': float(candle[4]),
+            'Volume': float(candle[5])
+        }
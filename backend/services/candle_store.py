@@ -0,0 +1,226 @@
+"""
+Candle Store - Persistent columnar OHLCV storage for DataService.
+
+Layout (one partition per symbol + interval):
+    <root>/<SYMBOL>/<interval>.json       -> partition metadata
+    <root>/<SYMBOL>/<interval>.<gen>.npy  -> float64 array, shape (6, n)
+
+The services use one root per market data provider
+(data/providers/<provider>/candles, see market_data.provider_data_dir).
+
+Rows of the array are the columns TS (UTC epoch seconds), Open, High, Low,
+Close, Volume, so every field is contiguous on disk and can be sliced from a
+memory map without touching the others. Each write produces a new generation
+file and then swaps the metadata pointer, so readers holding a map of the old
+generation are never disturbed (important on Windows, where a mapped file
+cannot be replaced). The previous generation is kept until the next write, so
+a reader that fetched the metadata just before a swap can still open it.
+"""
+
+import os
+import re
+import json
+import time
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+COLUMNS = ['TS', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def frame_to_candles(df: pd.DataFrame) -> np.ndarray:
+    """Converts a yfinance history frame to the (6, n) CandleStore layout."""
+    index = pd.DatetimeIndex(df.index)
+    index = index.tz_localize('UTC') if index.tz is None else index.tz_convert('UTC')
+    ts = np.asarray(index.tz_localize(None), dtype='datetime64[s]').astype(np.int64)
+    cols = [df[c].to_numpy(dtype=np.float64, na_value=np.nan) for c in COLUMNS[1:]]
+    return np.vstack([ts.astype(np.float64)] + cols)
+
+
+def period_start_ts(period: str):
+    """Converts a yfinance period string to a UTC epoch start, or None for 'max'."""
+    period = period.lower()
+    now = datetime.now(timezone.utc)
+    if period == "max":
+        return None
+    if period == "ytd":
+        return datetime(now.year, 1, 1, tzinfo=timezone.utc).timestamp()
+    units = {'d': 1, 'wk': 7, 'mo': 31, 'y': 366}
+    for suffix, days in units.items():
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return (now - timedelta(days=int(period[:-len(suffix)]) * days)).timestamp()
+    return None
+
+
+def interval_seconds(interval: str) -> float:
+    """Bar length of a yfinance interval string ('2m', '1h', '1d', '1wk', '1mo'), 0 if unknown."""
+    match = re.fullmatch(r'(\d+)(m|h|d|wk|mo)', interval.lower())
+    if not match:
+        return 0.0
+    units = {'m': 60, 'h': 3600, 'd': 86400, 'wk': 7 * 86400, 'mo': 31 * 86400}
+    return int(match.group(1)) * units[match.group(2)]
+
+
+def session_start_ts(start_ts: Optional[float], last_ts: Optional[float], interval: str):
+    """
+    Moves a period_start_ts() cut-off back by the time since the last stored bar
+    ended, so a period counts back from the latest session rather than from now
+    (on weekends and holidays '1d' still returns the last trading session).
+    """
+    if start_ts is None or last_ts is None:
+        return start_ts
+    idle = time.time() - (last_ts + interval_seconds(interval))
+    return start_ts - idle if idle > 0 else start_ts
+
+
+class CandleStore:
+    # Stores opened on the same directory (DataService, ScreenerService) share one write lock
+    _root_locks: Dict[str, threading.Lock] = {}
+    _root_locks_guard = threading.Lock()
+
+    def __init__(self, root_dir: str = None):
+        if root_dir is None:
+            # Consistent with the SQLite services
+            root_dir = os.path.join(os.path.dirname(__file__), '..', 'data', 'candles')
+        os.makedirs(root_dir, exist_ok=True)
+        self.root_dir = root_dir
+        with CandleStore._root_locks_guard:
+            self._lock = CandleStore._root_locks.setdefault(os.path.abspath(root_dir), threading.Lock())
+
+    # ---- Paths & Metadata ----
+
+    def _symbol_dir(self, symbol: str) -> str:
+        # Symbols such as ^GSPC, TRY=X, GC=F are escaped to stay filesystem-safe
+        safe = re.sub(r'[^A-Za-z0-9._-]', lambda m: f"%{ord(m.group()):02X}", symbol.upper())
+        return os.path.join(self.root_dir, safe)
+
+    def _meta_path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self._symbol_dir(symbol), f"{interval}.json")
+
+    def get_meta(self, symbol: str, interval: str) -> Optional[Dict]:
+        """Returns partition metadata or None if the partition does not exist."""
+        try:
+            with open(self._meta_path(symbol, interval), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    # ---- Read ----
+
+    def read(self, symbol: str, interval: str, start_ts: Optional[float] = None,
+             bars: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        Returns a (6, n) array of candles with TS >= start_ts (and at most the
+        last `bars` of them), or None if the partition is missing. The partition
+        is memory-mapped and only the requested tail is copied into memory.
+        """
+        mm = None
+        for _ in range(2):
+            meta = self.get_meta(symbol, interval)
+            if not meta:
+                return None
+            path = os.path.join(self._symbol_dir(symbol), meta['file'])
+            try:
+                mm = np.load(path, mmap_mode='r')
+                break
+            except (OSError, ValueError):
+                # Generation removed between the metadata read and the load: re-read once
+                continue
+        if mm is None:
+            return None
+
+        lo = 0
+        if start_ts is not None and mm.shape[1]:
+            lo = int(np.searchsorted(mm[0], start_ts, side='left'))
+        if bars is not None:
+            lo = max(lo, mm.shape[1] - bars)
+        data = np.array(mm[:, lo:], copy=True)
+        del mm
+        return data
+
+    # ---- Write ----
+
+    def merge(self, symbol: str, interval: str, candles: np.ndarray,
+              covered_from: Optional[float], complete: bool = False) -> Dict:
+        """
+        Merges freshly fetched candles into the partition.
+
+        Stored rows inside the [first, last] timestamp range of the new batch
+        are replaced by it (the last bar is usually still forming); rows outside
+        that range are kept. `covered_from` is the earliest time the upstream
+        request asked for, and `complete` marks a full-history ('max') fetch.
+        """
+        with self._lock:
+            meta = self.get_meta(symbol, interval) or {}
+            existing = self.read(symbol, interval)
+
+            if candles.shape[1]:
+                order = np.argsort(candles[0], kind='stable')
+                candles = candles[:, order]
+
+            if existing is not None and existing.shape[1] and candles.shape[1]:
+                keep = (existing[0] < candles[0, 0]) | (existing[0] > candles[0, -1])
+                merged = np.concatenate([existing[:, keep], candles], axis=1)
+                merged = merged[:, np.argsort(merged[0], kind='stable')]
+            elif existing is not None and existing.shape[1]:
+                merged = existing
+            else:
+                merged = candles
+
+            old_from = meta.get('covered_from')
+            if meta.get('complete') or complete:
+                new_from = None
+            elif old_from is None or covered_from is None:
+                new_from = covered_from if old_from is None else old_from
+            else:
+                new_from = min(old_from, covered_from)
+
+            gen = int(meta.get('gen', 0)) + 1
+            sym_dir = self._symbol_dir(symbol)
+            os.makedirs(sym_dir, exist_ok=True)
+            file_name = f"{interval}.{gen}.npy"
+            np.save(os.path.join(sym_dir, file_name), np.ascontiguousarray(merged, dtype=np.float64))
+
+            new_meta = {
+                'symbol': symbol,
+                'interval': interval,
+                'file': file_name,
+                'gen': gen,
+                'rows': int(merged.shape[1]),
+                'last_ts': float(merged[0, -1]) if merged.shape[1] else None,
+                'covered_from': new_from,
+                'complete': bool(meta.get('complete') or complete),
+                'fetched_at': time.time()
+            }
+            tmp_path = self._meta_path(symbol, interval) + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(new_meta, f)
+            os.replace(tmp_path, self._meta_path(symbol, interval))
+
+            self._cleanup_generations(sym_dir, interval, keep={file_name, meta.get('file')})
+            return new_meta
+
+    def _cleanup_generations(self, sym_dir: str, interval: str, keep: set):
+        """Removes generation files other than `keep`; mapped ones are retried on the next write."""
+        prefix = f"{interval}."
+        for name in os.listdir(sym_dir):
+            if name.startswith(prefix) and name.endswith('.npy') and name not in keep:
+                try:
+                    os.remove(os.path.join(sym_dir, name))
+                except OSError:
+                    pass
+
+    def clear(self):
+        """Deletes every stored partition."""
+        with self._lock:
+            for sym in os.listdir(self.root_dir):
+                sym_dir = os.path.join(self.root_dir, sym)
+                if not os.path.isdir(sym_dir):
+                    continue
+                for name in os.listdir(sym_dir):
+                    try:
+                        os.remove(os.path.join(sym_dir, name))
+                    except OSError:
+                        pass
@@ -0,0 +1,382 @@
+"""
+Correlation - shared benchmark matrix and vectorized correlation kernels.
+
+BenchmarkMatrix keeps the daily closes of the benchmark set (USD/TRY, gold,
+S&P 500, BIST 100) aligned on one calendar (Istanbul trading days) as a
+(k, T) float64 array with NaN where a market was closed. It is built once,
+shared by every request and refreshed in the background when it gets
+older than `refresh_seconds`.
+
+Correlations are computed for many series at once: pairwise_corr() takes a
+(n, T) block against the (k, T) benchmark block and handles missing days
+pairwise, like pandas Series.corr on an inner join.
+
+UniverseCorrelation builds the N x N return correlation of a whole symbol
+universe (blocked matrix products), top-k pairs and average-linkage
+clusters, cached per (universe, window, date).
+"""
+
+import time
+import threading
+import numpy as np
+import pytz
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .single_flight import SingleFlight
+
+ISTANBUL_TZ = pytz.timezone('Europe/Istanbul')
+
+BENCHMARKS = {
+    'USD/TRY': 'TRY=X',
+    'Gram Altın': 'GC=F',  # Global Gold Futures (Proxy)
+    'S&P 500': '^GSPC',
+    'BIST 100': 'XU100.IS'
+}
+
+MIN_PERIODS = 30      # Need enough data points
+ROLLING_WINDOW = 60   # Trading days for the rolling return correlation
+
+
+def pairwise_corr(a: np.ndarray, b: np.ndarray, min_periods: int = MIN_PERIODS) -> np.ndarray:
+    """
+    Pearson correlation of every row of a (n, T) against every row of b (k, T).
+    Days where either side is NaN are dropped per pair; pairs with fewer than
+    min_periods common days are NaN. Returns an (n, k) array.
+    """
+    a = np.atleast_2d(np.asarray(a, dtype=np.float64))
+    b = np.atleast_2d(np.asarray(b, dtype=np.float64))
+    valid = np.isfinite(a)[:, None, :] & np.isfinite(b)[None, :, :]
+    n = valid.sum(axis=2)
+
+    x = np.where(valid, a[:, None, :], 0.0)
+    y = np.where(valid, b[None, :, :], 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Two-pass (centered) sums, as pandas does, for numerical stability
+        x = np.where(valid, x - (x.sum(axis=2) / n)[..., None], 0.0)
+        y = np.where(valid, y - (y.sum(axis=2) / n)[..., None], 0.0)
+        corr = (x * y).sum(axis=2) / np.sqrt((x * x).sum(axis=2) * (y * y).sum(axis=2))
+    corr[n < max(min_periods, 2)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def rolling_corr(x: np.ndarray, y: np.ndarray, window: int = ROLLING_WINDOW) -> np.ndarray:
+    """
+    Rolling Pearson correlation of two aligned 1-D series. Windows containing
+    a NaN are NaN (pandas rolling(window).corr semantics). Output has the
+    length of the input; the first window-1 values are NaN.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    out = np.full(len(x), np.nan)
+    if len(x) < window:
+        return out
+    wx = sliding_window_view(x, window)
+    wy = sliding_window_view(y, window)
+    cx = wx - wx.mean(axis=1, keepdims=True)
+    cy = wy - wy.mean(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out[window - 1:] = (cx * cy).sum(axis=1) / np.sqrt((cx * cx).sum(axis=1) * (cy * cy).sum(axis=1))
+    return np.clip(out, -1.0, 1.0)
+
+
+def simple_returns(closes: np.ndarray) -> np.ndarray:
+    """Day-over-day returns along the last axis; the first column is NaN."""
+    closes = np.asarray(closes, dtype=np.float64)
+    out = np.full(closes.shape, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out[..., 1:] = closes[..., 1:] / closes[..., :-1] - 1.0
+    return out
+
+
+def align(days: np.ndarray, values: np.ndarray, calendar: np.ndarray) -> np.ndarray:
+    """Places values observed on `days` onto `calendar` (both sorted datetime64[D]); NaN elsewhere."""
+    out = np.full(len(calendar), np.nan)
+    if not len(days) or not len(calendar):
+        return out
+    pos = np.searchsorted(calendar, days)
+    hit = pos < len(calendar)
+    hit[hit] = calendar[pos[hit]] == days[hit]
+    out[pos[hit]] = values[hit]
+    return out
+
+
+class BenchmarkMatrix:
+    def __init__(self, load_closes: Callable[[str], Optional[Tuple[np.ndarray, np.ndarray]]],
+                 benchmarks: Dict[str, str] = None, refresh_seconds: float = 15 * 60):
+        """
+        load_closes(symbol) -> (days datetime64[D], closes float64) with unique,
+        sorted days, or None when the symbol has no data.
+        """
+        self.load_closes = load_closes
+        self.benchmarks = dict(benchmarks or BENCHMARKS)
+        self.refresh_seconds = refresh_seconds
+
+        self._snapshot = None   # (built_at, labels, symbols, calendar, closes, returns)
+        self._build_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._refreshing = False
+
+    def get(self):
+        """
+        Returns (labels, symbols, calendar, closes, returns); closes and returns
+        have shape (k, T). Returns are taken over each series' own trading days, so
+        a holiday in one market does not blank the next day's return.
+        The first call builds synchronously; later stale calls get the current
+        snapshot while a background thread rebuilds it.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._build_lock:
+                if self._snapshot is None:
+                    self._snapshot = self._build()
+                snapshot = self._snapshot
+        elif time.time() - snapshot[0] >= self.refresh_seconds:
+            with self._state_lock:
+                start = not self._refreshing
+                self._refreshing = True
+            if start:
+                threading.Thread(target=self._background_refresh, daemon=True).start()
+        return snapshot[1:]
+
+    def invalidate(self):
+        self._snapshot = None
+
+    def _background_refresh(self):
+        try:
+            with self._build_lock:
+                self._snapshot = self._build()
+        except Exception as e:
+            print(f"Benchmark matrix refresh error: {e}")
+        finally:
+            self._refreshing = False
+
+    def _build(self):
+        labels = list(self.benchmarks)
+        symbols = [self.benchmarks[label] for label in labels]
+        with ThreadPoolExecutor(max_workers=len(symbols) or 1) as pool:
+            series = list(pool.map(self.load_closes, symbols))
+
+        loaded = [(label, sym, s) for label, sym, s in zip(labels, symbols, series) if s is not None and len(s[0])]
+        if not loaded:
+            return time.time(), [], [], np.array([], dtype='datetime64[D]'), np.empty((0, 0)), np.empty((0, 0))
+
+        calendar = np.unique(np.concatenate([s[0] for _, _, s in loaded]))
+        closes = np.vstack([align(s[0], s[1], calendar) for _, _, s in loaded])
+        returns = np.vstack([align(s[0], simple_returns(s[1]), calendar) for _, _, s in loaded])
+        labels = [label for label, _, _ in loaded]
+        symbols = [sym for _, sym, _ in loaded]
+        return time.time(), labels, symbols, calendar, closes, returns
+
+
+def corr_matrix(returns: np.ndarray, min_periods: int = MIN_PERIODS, block: int = 256) -> np.ndarray:
+    """
+    Pairwise-complete Pearson correlation matrix of the rows of an (N, T)
+    array (NaN = no observation). Row blocks are computed with matrix
+    products, so memory stays at O(block * N) while BLAS does the work.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    valid = np.isfinite(returns)
+    m = valid.astype(np.float64)
+    x = np.where(valid, returns, 0.0)
+    x2 = x * x
+    size = len(returns)
+    out = np.empty((size, size))
+
+    for start in range(0, size, block):
+        stop = min(start + block, size)
+        mb, xb, x2b = m[start:stop], x[start:stop], x2[start:stop]
+        n = mb @ m.T            # common days
+        sx = xb @ m.T           # sum of row i over days both rows traded
+        sy = mb @ x.T
+        sxx = x2b @ m.T
+        syy = mb @ x2.T
+        sxy = xb @ x.T
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+        corr[n < max(min_periods, 2)] = np.nan
+        out[start:stop] = corr
+
+    out = np.clip(out, -1.0, 1.0)
+    diag = np.diagonal(out).copy()
+    np.fill_diagonal(out, np.where(np.isfinite(diag), 1.0, np.nan))
+    return out
+
+
+def average_linkage(dist: np.ndarray):
+    """
+    Agglomerative clustering with average linkage (UPGMA) on a square
+    distance matrix. Returns (merges, order): merges is a list of
+    (i, j, distance) in merge order, where i and j are the representative
+    row indices of the two clusters (the merged cluster keeps i), and order
+    is the dendrogram leaf order.
+    """
+    size = len(dist)
+    d = np.array(dist, dtype=np.float64)
+    np.fill_diagonal(d, np.inf)
+    counts = np.ones(size)
+    leaves = [[i] for i in range(size)]
+    merges = []
+
+    for _ in range(size - 1):
+        flat = int(np.argmin(d))
+        i, j = divmod(flat, size)
+        if not np.isfinite(d[i, j]):
+            break
+        if i > j:
+            i, j = j, i
+        merges.append((i, j, float(d[i, j])))
+        # Lance-Williams update for average linkage
+        merged = (counts[i] * d[i] + counts[j] * d[j]) / (counts[i] + counts[j])
+        d[i, :] = merged
+        d[:, i] = merged
+        d[i, i] = np.inf
+        d[j, :] = np.inf
+        d[:, j] = np.inf
+        counts[i] += counts[j]
+        leaves[i] = leaves[i] + leaves[j]
+        leaves[j] = []
+
+    order = [leaf for group in leaves for leaf in group]
+    return merges, order
+
+
+def cut_clusters(size: int, merges, threshold: float) -> np.ndarray:
+    """Cluster label per row after applying every merge with distance <= threshold."""
+    parent = np.arange(size)
+
+    def find(a):
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+
+    for i, j, distance in merges:
+        if distance > threshold:
+            break  # UPGMA merge heights are monotonic
+        parent[find(j)] = find(i)
+    return np.array([find(a) for a in range(size)])
+
+
+class UniverseCorrelation:
+    """
+    N x N return correlation over a symbol universe, with top-k pairs and
+    hierarchical clusters. The expensive part (loading closes, the matrix and
+    the linkage) is cached per (universe, window, date); slicing top pairs or
+    cutting clusters at a threshold runs per request on the cached result.
+    """
+
+    def __init__(self, load_closes: Callable[[str, int], Optional[Tuple[np.ndarray, np.ndarray]]],
+                 max_workers: int = 10, max_entries: int = 8):
+        """load_closes(symbol, window) -> (days datetime64[D], closes float64) or None."""
+        self.load_closes = load_closes
+        self.max_workers = max_workers
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+
+    def analyze(self, symbols: List[str], window: int = 120, top_k: int = 10,
+                threshold: float = 0.5, include_matrix: bool = False) -> Dict:
+        """threshold is the minimum average correlation inside a cluster."""
+        universe = tuple(sorted({s.upper() for s in symbols}))
+        key = (universe, window, datetime.now(ISTANBUL_TZ).date().isoformat())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            entry = self._flights.do(key, self._build, universe, window, dataset='universe')
+            with self._lock:
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        names, matrix = entry['symbols'], entry['matrix']
+        result = {
+            'symbols': names,
+            'dropped': entry['dropped'],
+            'window': window,
+            'as_of': entry['as_of'],
+            'top_positive': [],
+            'top_negative': [],
+            'clusters': [],
+            'order': [names[i] for i in entry['order']]
+        }
+        if len(names) >= 2:
+            result['top_positive'], result['top_negative'] = self._top_pairs(names, matrix, top_k)
+            result['clusters'] = self._clusters(names, matrix, entry['merges'], threshold)
+        if include_matrix:
+            rounded = np.round(matrix, 3).astype(object)
+            rounded[~np.isfinite(matrix)] = None
+            result['matrix'] = rounded.tolist()
+        return result
+
+    def _build(self, universe: tuple, window: int) -> Dict:
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            series = list(pool.map(lambda s: self.load_closes(s, window), universe))
+
+        loaded = [(sym, s) for sym, s in zip(universe, series) if s is not None and len(s[0]) > 1]
+        if not loaded:
+            return {'symbols': [], 'dropped': list(universe), 'as_of': None,
+                    'matrix': np.empty((0, 0)), 'merges': [], 'order': []}
+
+        calendar = np.unique(np.concatenate([s[0] for _, s in loaded]))[-window:]
+        returns = np.vstack([align(s[0], simple_returns(s[1]), calendar) for _, s in loaded])
+
+        # Symbols without enough observations in the window cannot be correlated
+        enough = np.isfinite(returns).sum(axis=1) >= MIN_PERIODS
+        names = [sym for (sym, _), ok in zip(loaded, enough) if ok]
+        dropped = sorted(set(universe) - set(names))
+        matrix = corr_matrix(returns[enough])
+
+        # Distance 1 - rho; pairs without enough common days count as unrelated
+        dist = 1.0 - np.where(np.isfinite(matrix), matrix, 0.0)
+        merges, order = average_linkage(dist) if len(names) else ([], [])
+        return {
+            'symbols': names,
+            'dropped': dropped,
+            'as_of': str(calendar[-1]),
+            'matrix': matrix,
+            'merges': merges,
+            'order': order
+        }
+
+    @staticmethod
+    def _top_pairs(names: List[str], matrix: np.ndarray, top_k: int):
+        rows, cols = np.triu_indices(len(names), k=1)
+        values = matrix[rows, cols]
+        finite = np.isfinite(values)
+        rows, cols, values = rows[finite], cols[finite], values[finite]
+        k = min(top_k, len(values))
+        if k == 0:
+            return [], []
+
+        def pairs(idx):
+            return [{'a': names[rows[i]], 'b': names[cols[i]], 'correlation': round(float(values[i]), 3)} for i in idx]
+
+        high = np.argpartition(-values, k - 1)[:k]
+        low = np.argpartition(values, k - 1)[:k]
+        return pairs(high[np.argsort(-values[high])]), pairs(low[np.argsort(values[low])])
+
+    @staticmethod
+    def _clusters(names: List[str], matrix: np.ndarray, merges, threshold: float) -> List[Dict]:
+        labels = cut_clusters(len(names), merges, 1.0 - threshold)
+        clusters = []
+        for label in np.unique(labels):
+            idx = np.flatnonzero(labels == label)
+            if len(idx) < 2:
+                continue
+            block = matrix[np.ix_(idx, idx)][~np.eye(len(idx), dtype=bool)]
+            clusters.append({
+                'size': int(len(idx)),
+                'members': [names[i] for i in idx],
+                'avg_correlation': round(float(np.nanmean(block)), 3) if np.isfinite(block).any() else None
+            })
+        clusters.sort(key=lambda c: c['size'], reverse=True)
+        for n, cluster in enumerate(clusters, 1):
+            cluster['id'] = n
+        return clusters
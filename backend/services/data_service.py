@@ -1,14 +1,15 @@
-import yfinance as yf
 import pandas as pd
+import numpy as np
 import requests
 from bs4 import BeautifulSoup
 import time
 import math
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Optional
 import sys
 import os
 import pytz
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 
 # Import utilities (assuming project root is in sys.path)
 try:
@@ -16,53 +17,107 @@ try:
 except ImportError:
     def safe_print(msg): print(msg)
 
+from .candle_store import CandleStore, frame_to_candles, period_start_ts, session_start_ts
+from .market_data import MarketDataProvider, get_provider, provider_data_dir
+from .fundamental_cache import FundamentalCache
+from .correlation import BenchmarkMatrix, UniverseCorrelation, align, pairwise_corr, rolling_corr, simple_returns
+from .single_flight import SingleFlight
+from .fetch_scheduler import FetchScheduler, get_scheduler
+from .quote_service import QuoteService, get_quote_service
+from .serialization import to_json_columns
+
+ISTANBUL_TZ = pytz.timezone('Europe/Istanbul')
+INTRADAY_INTERVALS = ["1m", "2m", "5m", "15m", "30m", "1h", "90m"]
+
+# Side sections of /api/stock: (default value, timeout in seconds)
+SECTIONS = {
+    'fundamental': (None, 8.0),
+    'news': ([], 4.0),
+    'correlation': ([], 8.0)
+}
+
 class DataService:
-    def __init__(self, cache_duration_minutes: int = 15):
+    def __init__(self, cache_duration_minutes: int = 15, provider: MarketDataProvider = None,
+                 scheduler: FetchScheduler = None, quote_service: QuoteService = None,
+                 candle_store: CandleStore = None, fundamental_cache: FundamentalCache = None):
         self.cache_duration = cache_duration_minutes
-        self._price_cache = {}
-        self._fundamental_cache = {}
+        self.provider = provider or get_provider()
+        self.scheduler = scheduler or get_scheduler()
+        # The shared quote table, unless this instance runs against its own provider
+        if quote_service is None:
+            quote_service = get_quote_service() if provider is None else QuoteService(self.provider, self.scheduler)
+        self.quotes = quote_service
+        # Persistent stores are kept per provider, so replayed data never reaches the live store
+        if candle_store is None:
+            candle_store = CandleStore(os.path.join(provider_data_dir(self.provider), 'candles'))
+        if fundamental_cache is None:
+            fundamental_cache = FundamentalCache(self.provider, os.path.join(provider_data_dir(self.provider), 'fundamentals.db'))
+        self._candle_store = candle_store
+        self._flights = SingleFlight()
+        self._fundamental_cache = fundamental_cache
+        # One pool per section, so a slow upstream for one section cannot queue up the others
+        self._section_pools = {
+            name: ThreadPoolExecutor(max_workers=4, thread_name_prefix=f'section-{name}') for name in SECTIONS
+        }
+        self._benchmarks = BenchmarkMatrix(self._daily_closes, refresh_seconds=cache_duration_minutes * 60)
+        self._universe = UniverseCorrelation(
+            lambda symbol, window: self._daily_closes(symbol, "1y" if window <= 240 else "2y")
+        )
         
+    def get_flight_stats(self) -> Dict:
+        """Leader / coalesced call counters of the upstream single-flight layer."""
+        return self._flights.get_stats()
+
+    def get_scheduler_stats(self) -> Dict:
+        """Rate / concurrency limiter counters and symbols failing in batch fetches."""
+        return self.scheduler.get_stats()
+
+    def get_quote_stats(self) -> Dict:
+        """Requests served from the quote table vs. bulk refresh cycles."""
+        return self.quotes.get_stats()
+
+    def get_fundamental_cache_stats(self) -> Dict:
+        """Hit / miss counters of the fundamentals cache."""
+        return self._fundamental_cache.get_stats()
+
     def clear_cache(self):
-        self._price_cache = {}
-        self._fundamental_cache = {}
+        self._candle_store.clear()
+        self._fundamental_cache.clear()
+        self._benchmarks.invalidate()
+        self.quotes.clear()
         print("[OK] Data Service cache cleared.")
 
     def fetch_latest_prices(self, symbols: List[str]) -> Dict[str, Dict]:
-        """Batch fetch latest price and daily change for symbols."""
+        """Latest price and daily change for symbols, from the shared quote table."""
         results = {}
-        try:
-            # Join symbols for yfinance batch fetch
-            ticker_list = ' '.join(symbols)
-            tickers = yf.Tickers(ticker_list)
-            
-            for sym in symbols:
-                try:
-                    ticker = tickers.tickers.get(sym)
-                    if ticker:
-                        # Fetch 1d history to get previous close and current price
-                        hist = ticker.history(period='2d')
-                        if not hist.empty:
-                            close_price = float(hist['Close'].iloc[-1])
-                            prev_close = float(hist['Close'].iloc[-2]) if len(hist) > 1 else close_price
-                            change = close_price - prev_close
-                            pct = (change / prev_close * 100) if prev_close != 0 else 0
-                            
-                            results[sym] = {
-                                "price": round(close_price, 2),
-                                "change": round(change, 2),
-                                "percent": round(pct, 2)
-                            }
-                        else:
-                            results[sym] = {"price": 0, "change": 0, "percent": 0}
-                except Exception as e:
-                    print(f"Error fetching batch price for {sym}: {e}")
-                    results[sym] = {"price": 0, "change": 0, "percent": 0}
-        except Exception as e:
-            print(f"Error in batch price fetch: {e}")
-            
+        quotes = self.quotes.get_quotes(symbols)
+
+        for sym in symbols:
+            quote = quotes.get(sym)
+            if not quote:
+                results[sym] = {"price": 0, "change": 0, "percent": 0}
+                continue
+            results[sym] = {
+                "price": round(quote['price'], 2),
+                "change": round(quote['change'], 2),
+                "percent": round(quote['percent'], 2)
+            }
+
         return results
         
-    def get_stock_data(self, symbol: str, period: str = "1y", interval: str = "1d") -> Dict:
+    def get_stock_data(self, symbol: str, period: str = "1y", interval: str = "1d", layout: str = "records",
+                       sections=tuple(SECTIONS)) -> Dict:
+        """
+        layout controls price_data: 'records' (one dict per bar), 'columnar'
+        (one JSON list per field, {'time': [epoch seconds], 'Open': [...], ...})
+        or 'arrays' (same columns as NumPy arrays, for binary transports).
+
+        `sections` selects the side data fetched alongside the candles
+        (fundamental, news, correlation). They run concurrently with the price
+        fetch; a section that misses its timeout keeps its default value and is
+        listed in result['pending'], to be loaded later via get_section().
+        Timeouts count from the start of the request.
+        """
         # Same logic as DataEngine.get_stock_data
         print(f"[>>] Fetching data: {symbol} ({period}/{interval})")
         
@@ -72,12 +127,28 @@ class DataService:
             'price_data': None,
             'fundamental': None,
             'news': [],
+            'correlation': [],
+            'pending': [],
             'error': None
         }
+
+        # 2-4. Fundamentals, news and correlation start first and overlap with the price fetch
+        # Section timeouts count from the start of the request, not from the end of the price fetch
+        started = time.monotonic()
+        futures = {
+            name: self._submit_section(symbol, name, started + SECTIONS[name][1]) for name in sections
+        }
         
         try:
             # 1. Price Data
-            df = self._get_price_data(symbol, period, interval)
+            if layout != 'records':
+                candles = self._get_price_candles(symbol, period, interval)
+                if candles is not None and candles.shape[1]:
+                    columns = self._columnar_candles(candles, symbol, interval)
+                    result['price_data'] = columns if layout == 'arrays' else to_json_columns(columns)
+                df = pd.DataFrame()
+            else:
+                df = self._get_price_data(symbol, period, interval)
             # Convert DataFrame to JSON-friendly dict for API response
             if not df.empty:
                 # Reset index to make Date a column
@@ -97,114 +168,220 @@ class DataService:
                 
                 result['price_data'] = df.to_dict(orient='records')
             
-            # 2. Fundamental Data
-            result['fundamental'] = self._get_fundamental_data(symbol)
-            
-            # 3. News (Simplified for API)
-            result['news'] = self._get_news_data(symbol)
-
-            # 4. Correlation Data (New Feature)
-            result['correlation'] = self._get_correlation_data(symbol)
-            
         except Exception as e:
             result['error'] = str(e)
             print(f"[ERROR] Fetch failed ({symbol}): {e}")
+
+        # Partial results: a slow section must not hold back the candles
+        for name, future in futures.items():
+            default, timeout = SECTIONS[name]
+            try:
+                result[name] = future.result(timeout=max(0.0, started + timeout - time.monotonic()))
+            except FutureTimeout:
+                # Still queued: drop it; already running: let it finish and warm the caches
+                future.cancel()
+                result[name] = default
+                result['pending'].append(name)
+                print(f"[WARN] Section '{name}' timed out for {symbol}")
+            except Exception as e:
+                result[name] = default
+                print(f"[ERROR] Section '{name}' failed ({symbol}): {e}")
             
         return result
 
+    def get_section(self, symbol: str, section: str, timeout: Optional[float] = None):
+        """
+        Fetches a single side section (lazy sub-resource of /api/stock).
+        Raises KeyError for unknown sections and TimeoutError when it does not
+        finish in time; the fetch keeps running and warms the caches.
+        """
+        default, default_timeout = SECTIONS[section]
+        timeout = default_timeout if timeout is None else timeout
+        future = self._submit_section(symbol, section, time.monotonic() + timeout)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise TimeoutError(f"Section '{section}' timed out for {symbol}")
+
+    def _submit_section(self, symbol: str, section: str, deadline: float):
+        return self._section_pools[section].submit(self._run_section, symbol, section, deadline)
+
+    def _run_section(self, symbol: str, section: str, deadline: float):
+        # A task that waited in the queue past its caller's deadline has no one to serve
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Section '{section}' skipped for {symbol}: deadline passed in queue")
+        return self._fetch_section(symbol, section)
+
+    def get_universe_correlation(self, symbols: List[str], window: int = 120, top_k: int = 10,
+                                 threshold: float = 0.5, include_matrix: bool = False) -> Dict:
+        """N x N daily return correlation, top pairs and clusters over a symbol universe."""
+        return self._universe.analyze(symbols, window=window, top_k=top_k,
+                                      threshold=threshold, include_matrix=include_matrix)
+
+    def _fetch_section(self, symbol: str, section: str):
+        if section == 'fundamental':
+            return self._get_fundamental_data(symbol)
+        if section == 'news':
+            return self._get_news_data(symbol)
+        if section == 'correlation':
+            return self._get_correlation_data(symbol)
+        raise KeyError(section)
+
+    def get_candles(self, symbol: str, period: str = "1y", interval: str = "1d") -> Optional[np.ndarray]:
+        """Raw (6, n) CandleStore candles (TS, O, H, L, C, V) for the period, refreshed when stale."""
+        return self._get_price_candles(symbol, period, interval)
+
     def _get_price_data(self, symbol: str, period: str, interval: str) -> pd.DataFrame:
-        # Copied logic from DataEngine
-        cache_key = f"{symbol}_{period}_{interval}"
-        if cache_key in self._price_cache:
-            cached_time, cached_data = self._price_cache[cache_key]
-            if datetime.now() - cached_time < timedelta(minutes=self.cache_duration):
-                # Ensure we return a DataFrame, as cached_data is now a list of dicts
-                return pd.DataFrame(cached_data)
-        
+        candles = self._get_price_candles(symbol, period, interval)
+        if candles is None or not candles.shape[1]:
+            return pd.DataFrame()
+        return self._normalize_candles(candles, symbol, interval)
+
+    def _get_price_candles(self, symbol: str, period: str, interval: str) -> Optional[np.ndarray]:
+        """Returns raw (6, n) CandleStore candles for the period, fetching from upstream when stale."""
+        # Smart period logic (pushing usage limits for free intraday data)
+        target_period = period
+        if period.lower() == "max":
+            if interval == "1h":
+                target_period = "730d"  # yfinance limit for hourly
+            elif interval in ["2m", "5m", "15m", "30m", "90m"]:
+                target_period = "60d"   # yfinance limit for most intraday
+            elif interval == "1m":
+                target_period = "7d"    # yfinance limit for 1-minute
+            else:
+                target_period = "max"
+        elif period == "1d" and interval in ["1m", "5m", "15m", "30m", "1h"]:
+            target_period = "5d"
+
         try:
-            ticker = yf.Ticker(symbol)
-            
-            # Smart period logic (pushing usage limits for free intraday data)
-            target_period = period
-            if period.lower() == "max":
-                if interval == "1h":
-                    target_period = "730d"  # yfinance limit for hourly
-                elif interval in ["2m", "5m", "15m", "30m", "90m"]:
-                    target_period = "60d"   # yfinance limit for most intraday
-                elif interval == "1m":
-                    target_period = "7d"    # yfinance limit for 1-minute
-                else:
-                    target_period = "max"
-            elif period == "1d" and interval in ["1m", "5m", "15m", "30m", "1h"]:
-                target_period = "5d"
-
-            df = ticker.history(
+            start_ts = period_start_ts(target_period)
+            if not self._candles_fresh(symbol, interval, start_ts):
+                # Concurrent requests for the same partition share a single upstream fetch
+                self._flights.do(
+                    (symbol, 'history', (interval, target_period)), self._refresh_candles,
+                    symbol, interval, target_period, start_ts, dataset='history'
+                )
+
+            meta = self._candle_store.get_meta(symbol, interval)
+            read_from = session_start_ts(start_ts, meta.get('last_ts') if meta else None, interval)
+            return self._candle_store.read(symbol, interval, start_ts=read_from)
+
+        except Exception as e:
+            print(f"Error getting price data: {e}")
+            return None
+
+    def _candles_fresh(self, symbol: str, interval: str, start_ts) -> bool:
+        """True if the stored partition covers start_ts and is younger than the cache duration."""
+        meta = self._candle_store.get_meta(symbol, interval)
+        return self._covers(meta, start_ts) and time.time() - meta.get('fetched_at', 0) < self.cache_duration * 60
+
+    @staticmethod
+    def _covers(meta: Optional[Dict], start_ts) -> bool:
+        return meta is not None and bool(
+            meta.get('complete') or
+            (start_ts is not None and meta.get('covered_from') is not None and meta['covered_from'] <= start_ts)
+        )
+
+    def _refresh_candles(self, symbol: str, interval: str, target_period: str, start_ts):
+        """Fetches the missing tail (or the whole period) from the market data provider into the CandleStore."""
+        # A caller that just finished the same fetch may already have refreshed the partition
+        if self._candles_fresh(symbol, interval, start_ts):
+            return
+        meta = self._candle_store.get_meta(symbol, interval)
+        covered = self._covers(meta, start_ts)
+
+        df = pd.DataFrame()
+
+        if covered and meta.get('last_ts') is not None:
+            # Only the missing tail: re-fetch from the last stored bar onwards
+            tail_start = datetime.fromtimestamp(meta['last_ts'], tz=pytz.utc)
+            try:
+                df = self.provider.history(symbol, start=tail_start, interval=interval, auto_adjust=False, prepost=True)
+            except Exception as e:
+                print(f"Tail fetch failed for {symbol} ({interval}): {e}")
+            if not df.empty:
+                self._candle_store.merge(symbol, interval, frame_to_candles(df), covered_from=start_ts)
+
+        if df.empty:
+            df = self.provider.history(
+                symbol,
                 period=target_period,
-                interval=interval, 
+                interval=interval,
                 auto_adjust=False,
                 prepost=True  # Enable pre/post market for more intraday candles
             )
-            
+            covered_from = start_ts
             if df.empty:
                 # Fallback
-                df = ticker.history(period="1mo", interval=interval, auto_adjust=False)
-            
-            if df.empty:
-                return pd.DataFrame()
-
-            # Format data
-            data = []
-            
-            # Localize to Istanbul time
-            utc_tz = pytz.utc
-            istanbul_tz = pytz.timezone('Europe/Istanbul')
-
-            for index, row in df.iterrows():
-                # Timestamp handling
-                dt_istanbul = None
-                if isinstance(index, pd.Timestamp):
-                    dt_utc = index.replace(tzinfo=utc_tz) if index.tzinfo is None else index
-                    dt_istanbul = dt_utc.astimezone(istanbul_tz)
-                else:
-                    try:
-                        dt_utc = pd.to_datetime(index).replace(tzinfo=utc_tz)
-                        dt_istanbul = dt_utc.astimezone(istanbul_tz)
-                    except:
-                        continue
-
-                # Filter for BIST Trading Hours (10:00 - 18:05) strictly for intraday BIST stocks only
-                # Crypto, Forex, and Commodities trade 24/7 so we skip this filter for them
-                is_bist = symbol.upper().endswith('.IS')
-                if is_bist and interval in ["1m", "2m", "5m", "15m", "30m", "1h", "90m"]:
-                    if dt_istanbul:
-                        # Market Open: 10:00. Market Close: 18:05 (approx)
-                        # We include 10:00 <= time <= 18:05
-                        total_minutes = dt_istanbul.hour * 60 + dt_istanbul.minute
-                        # 10:00 = 600 min, 18:05 = 1085 min
-                        if total_minutes < 600 or total_minutes > 1085:
-                            continue
-
-                item = {
-                    "Date": dt_istanbul.isoformat() if dt_istanbul else str(index),
-                    "Open": row['Open'],
-                    "High": row['High'],
-                    "Low": row['Low'],
-                    "Close": row['Close'],
-                    "Volume": row['Volume']
-                }
-                data.append(item)
-            
-            self._price_cache[cache_key] = (datetime.now(), data)
-            return pd.DataFrame(data) 
-            
-        except Exception as e:
-            print(f"Error getting price data: {e}")
-            return pd.DataFrame()
+                df = self.provider.history(symbol, period="1mo", interval=interval, auto_adjust=False)
+                covered_from = period_start_ts("1mo")
+            if not df.empty:
+                self._candle_store.merge(
+                    symbol, interval, frame_to_candles(df),
+                    covered_from=covered_from, complete=(target_period == "max")
+                )
+
+    @staticmethod
+    def _columnar_candles(candles: np.ndarray, symbol: str, interval: str) -> Dict[str, np.ndarray]:
+        """Columnar price_data: epoch-second timestamps plus one array per OHLCV field."""
+        candles, _, _ = DataService._session_filter(candles, symbol, interval)
+        columns = {'time': candles[0].astype(np.int64)}
+        columns.update(zip(['Open', 'High', 'Low', 'Close', 'Volume'], candles[1:]))
+        return columns
+
+    @staticmethod
+    def _session_filter(candles: np.ndarray, symbol: str, interval: str):
+        """
+        Converts candle timestamps to Istanbul time and, for intraday BIST symbols,
+        keeps only bars inside the 10:00 - 18:05 session.
+        Returns (candles, utc datetime64[s] array, Istanbul DatetimeIndex).
+        """
+        ts = candles[0].astype(np.int64).astype('datetime64[s]')
+        local = pd.DatetimeIndex(ts).tz_localize('UTC').tz_convert(ISTANBUL_TZ)
+
+        # Filter for BIST Trading Hours (10:00 - 18:05) strictly for intraday BIST stocks only
+        # Crypto, Forex, and Commodities trade 24/7 so we skip this filter for them
+        if symbol.upper().endswith('.IS') and interval in INTRADAY_INTERVALS:
+            # 10:00 = 600 min, 18:05 = 1085 min
+            total_minutes = local.hour.to_numpy() * 60 + local.minute.to_numpy()
+            mask = (total_minutes >= 600) & (total_minutes <= 1085)
+            candles, ts, local = candles[:, mask], ts[mask], local[mask]
+        return candles, ts, local
+
+    @staticmethod
+    def _normalize_candles(candles: np.ndarray, symbol: str, interval: str) -> pd.DataFrame:
+        """
+        Shapes stored (6, n) candles into the API frame: Istanbul-local ISO dates
+        and, for intraday BIST symbols, only bars inside the 10:00 - 18:05 session.
+        Everything runs as array operations on the timestamp column.
+        """
+        candles, ts, local = DataService._session_filter(candles, symbol, interval)
+
+        # ISO 8601 with UTC offset, same as datetime.isoformat()
+        wall = local.tz_localize(None).to_numpy().astype('datetime64[s]')
+        offsets = (wall - ts).astype(np.int64)
+        unique_offsets, inverse = np.unique(offsets, return_inverse=True)
+        suffixes = np.array([
+            f"{'+' if o >= 0 else '-'}{abs(o) // 3600:02d}:{abs(o) % 3600 // 60:02d}" for o in unique_offsets
+        ], dtype='U6')  # str dtype even when the session filter left no bars
+        dates = np.char.add(np.datetime_as_string(wall, unit='s'), suffixes[inverse.ravel()])
+
+        return pd.DataFrame({
+            "Date": dates,
+            "Open": candles[1],
+            "High": candles[2],
+            "Low": candles[3],
+            "Close": candles[4],
+            "Volume": candles[5]
+        })
 
     def _get_fundamental_data(self, symbol: str) -> Dict:
+        return self._flights.do((symbol, 'fundamental', ()), self._fetch_fundamental_data, symbol, dataset='fundamental')
+
+    def _fetch_fundamental_data(self, symbol: str) -> Dict:
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info or {} # Handle None info
+            info = self._fundamental_cache.get_info(symbol) or {} # Handle None info
             
             def safe_num(val):
                 """Helper to ensure numbers are JSON-friendly (no NaN/Inf)"""
@@ -242,32 +419,13 @@ class DataService:
             }
 
             # 2. Capture Statements (Multi-method fallback for stability)
-            def capture_stmt(ticker, name):
+            def capture_stmt(name):
                 try:
-                    # Method 1: New get_* methods
-                    # IMPORTANT: yfinance expects 'yearly' not 'annual'
-                    if name == 'income': stmt = ticker.get_income_stmt(freq='quarterly')
-                    elif name == 'balance': stmt = ticker.get_balance_sheet(freq='quarterly')
-                    elif name == 'cash': stmt = ticker.get_cash_flow(freq='quarterly')
-                    else: stmt = None
-                    
-                    if stmt is not None and not stmt.empty: return stmt, False
-                    
-                    # Method 2: Property access
-                    prop_name = f'quarterly_{name}_stmt' if name != 'balance' else 'quarterly_balance_sheet'
-                    stmt = getattr(ticker, prop_name, None)
+                    # Quarterly first, annual ('yearly') as fallback
+                    stmt = self._fundamental_cache.get_statement(symbol, name, freq='quarterly')
                     if stmt is not None and not stmt.empty: return stmt, False
-                    
-                    # Method 3: Annual fallback (using 'yearly')
-                    if name == 'income': stmt = ticker.get_income_stmt(freq='yearly')
-                    elif name == 'balance': stmt = ticker.get_balance_sheet(freq='yearly')
-                    elif name == 'cash': stmt = ticker.get_cash_flow(freq='yearly')
-                    
-                    if stmt is not None and not stmt.empty: return stmt, True
-                    
-                    # Method 4: Annual Property access
-                    prop_name = f'{name}_stmt' if name != 'balance' else 'balance_sheet'
-                    stmt = getattr(ticker, prop_name, None)
+
+                    stmt = self._fundamental_cache.get_statement(symbol, name, freq='yearly')
                     if stmt is not None and not stmt.empty: return stmt, True
                     
                     return None, False
@@ -275,9 +433,9 @@ class DataService:
                     print(f"Capture error ({name}) for {symbol}: {e}")
                     return None, False
 
-            q_inc, inc_annual = capture_stmt(ticker, 'income')
-            q_bs, bs_annual = capture_stmt(ticker, 'balance')
-            q_cf, cf_annual = capture_stmt(ticker, 'cash')
+            q_inc, inc_annual = capture_stmt('income')
+            q_bs, bs_annual = capture_stmt('balance')
+            q_cf, cf_annual = capture_stmt('cash')
 
             def get_financial_history(stmt, is_annual, mapping):
                 if stmt is None or stmt.empty:
@@ -478,57 +636,47 @@ class DataService:
     def _get_news_data(self, symbol: str) -> List[Dict]:
          # Simplified news fetch
         try:
-            ticker = yf.Ticker(symbol)
-            return ticker.news[:5]
+            news = self._flights.do((symbol, 'news', ()), self.provider.news, symbol, dataset='news')
+            return news[:5]
         except:
             return []
 
+    def _daily_closes(self, symbol: str, period: str = "1y"):
+        """(Istanbul trading days, closes) of daily bars over the period, one close per day."""
+        candles = self._get_price_candles(symbol, period, "1d")
+        if candles is None or not candles.shape[1]:
+            return None
+        candles, _, local = self._session_filter(candles, symbol, "1d")
+        days = local.tz_localize(None).to_numpy().astype('datetime64[D]')
+        last = np.r_[days[1:] != days[:-1], True]
+        return days[last], candles[4][last]
+
     def _get_correlation_data(self, symbol: str) -> List[Dict]:
         """
-        Calculates Pearson correlation between the stock and major benchmarks.
+        Pearson correlation between the stock and the major benchmarks, read
+        from the shared BenchmarkMatrix. 'correlation' is computed on daily
+        closes (drives the status label), 'return_correlation' on daily returns
+        and 'rolling' is the ROLLING_WINDOW-day return correlation over time.
         """
         try:
-            # 1. Define Benchmarks
-            benchmarks = {
-                'USD/TRY': 'TRY=X',
-                'Gram Altın': 'GC=F', # Global Gold Futures (Proxy)
-                'S&P 500': '^GSPC',
-                'BIST 100': 'XU100.IS'
-            }
-            
-            # 2. Fetch History (Last 1 year, daily)
-            # We need aligned dates for correlation
-            period = "1y"
-            interval = "1d"
-            
-            # Target Stock Data
-            target_df = self._get_price_data(symbol, period, interval)
-            if target_df.empty: return []
+            labels, symbols, calendar, bench_closes, bench_returns = self._benchmarks.get()
+            target = self._daily_closes(symbol)
+            if target is None or not labels: return []
 
-            # Prepare Target Series (Close prices indexed by Date)
-            # Ensure Date is datetime object for alignment
-            target_df['Date'] = pd.to_datetime(target_df['Date'].apply(lambda x: x.split('T')[0] if 'T' in str(x) else x))
-            target_series = target_df.set_index('Date')['Close']
+            keep = [i for i, s in enumerate(symbols) if s != symbol] # Don't correlate with itself
+            if not keep: return []
+            days, closes = target
+            target_closes = align(days, closes, calendar)
+            target_returns = align(days, simple_returns(closes), calendar)
 
-            correlations = []
-
-            for label, ticker_symbol in benchmarks.items():
-                if ticker_symbol == symbol: continue # Don't correlate with itself
-
-                # Fetch Benchmark Data
-                bench_df = self._get_price_data(ticker_symbol, period, interval)
-                if bench_df.empty: continue
+            level_corr = pairwise_corr(target_closes, bench_closes[keep])[0]
+            return_corr = pairwise_corr(target_returns, bench_returns[keep])[0]
 
-                bench_df['Date'] = pd.to_datetime(bench_df['Date'].apply(lambda x: x.split('T')[0] if 'T' in str(x) else x))
-                bench_series = bench_df.set_index('Date')['Close']
-
-                # 3. Align and Calculate Correlation
-                # Inner join to match dates exactly
-                combined = pd.concat([target_series, bench_series], axis=1, join='inner')
-                if len(combined) < 30: continue # Need enough data points
+            correlations = []
+            for j, i in enumerate(keep):
+                corr_val = level_corr[j]
+                if not np.isfinite(corr_val): continue # Need enough data points
 
-                corr_val = combined.iloc[:, 0].corr(combined.iloc[:, 1])
-                
                 # Determine "Driver" status
                 # If correlation is high (>0.7 or <-0.7), it's a strong driver
                 status = "Nötr"
@@ -537,18 +685,26 @@ class DataService:
                 elif corr_val > 0.4: status = "Hafif Pozitif"
                 elif corr_val < -0.4: status = "Hafif Ters"
 
+                # Rolling correlation over the days both sides traded
+                common = np.isfinite(target_returns) & np.isfinite(bench_returns[i])
+                rolling = rolling_corr(target_returns[common], bench_returns[i][common])
+                valid = np.isfinite(rolling)
+                rolling_days = np.datetime_as_string(calendar[common][valid], unit='D')
+
                 correlations.append({
-                    'id': ticker_symbol,
-                    'label': label,
-                    'correlation': round(corr_val, 2),
+                    'id': symbols[i],
+                    'label': labels[i],
+                    'correlation': round(float(corr_val), 2),
+                    'return_correlation': round(float(return_corr[j]), 2) if np.isfinite(return_corr[j]) else None,
                     'status': status,
-                    'info': f"{label} ile {status.lower()} ilişki"
+                    'info': f"{labels[i]} ile {status.lower()} ilişki",
+                    'rolling': [
+                        {'time': t, 'value': round(float(v), 3)} for t, v in zip(rolling_days, rolling[valid])
+                    ]
                 })
 
-
             return correlations
 
         except Exception as e:
             print(f"Correlation error for {symbol}: {e}")
             return []
-
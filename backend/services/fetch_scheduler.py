@@ -0,0 +1,211 @@
+"""
+Fetch Scheduler - shared rate limiting for batch upstream calls.
+
+Every batch request to the market data provider (screener bulk history,
+watchlist / portfolio quotes) goes through one FetchScheduler so the process
+as a whole stays within what the upstream tolerates:
+
+- a token bucket caps the request rate (`rate` per second, `burst` at once);
+- an AIMD limit caps concurrent calls: +1 per window of successful calls,
+  halved on an error, a throttling response or a very slow call;
+- interactive calls (quotes behind the watchlist, portfolio, indices and
+  the quote stream) get `interactive_slots` reserved slots outside the AIMD
+  limit and take the next rate token ahead of queued bulk calls, so a
+  screener scan does not hold them up;
+- failed calls are retried with full-jitter exponential backoff;
+- per-symbol failures are counted (consecutive and total) so symbols that
+  keep dropping out of batches are visible in /data/stats.
+"""
+
+import time
+import random
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """True for upstream throttling (HTTP 429 / yfinance YFRateLimitError / simulated)."""
+    text = f"{type(error).__name__} {error}".lower()
+    return 'ratelimit' in text or 'rate limit' in text or 'too many requests' in text or '429' in text
+
+
+class FetchScheduler:
+    def __init__(self, rate: float = 4.0, burst: int = 8, min_concurrency: int = 1,
+                 max_concurrency: int = 8, initial_concurrency: int = 2, max_retries: int = 3,
+                 base_delay: float = 0.5, max_delay: float = 8.0, slow_call: float = 20.0,
+                 interactive_slots: int = 2):
+        self.rate = rate
+        self.burst = burst
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.slow_call = slow_call
+        self.interactive_slots = interactive_slots
+
+        self._cond = threading.Condition()
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._limit = float(max(min_concurrency, min(initial_concurrency, max_concurrency)))
+        self._active = 0
+        self._interactive_active = 0
+        self._interactive_waiting = 0  # interactive callers not yet holding a rate token
+        self._rng = random.Random()
+        self._stats = {'calls': 0, 'succeeded': 0, 'retries': 0, 'failed': 0,
+                       'throttled': 0, 'slow': 0, 'rate_waits': 0, 'interactive_calls': 0}
+        self._symbols: Dict[str, Dict] = {}  # {symbol: {'consecutive', 'total', 'last_error', 'last_failure'}}
+
+    # ---- Public API ----
+
+    def run(self, fn: Callable, *args, symbols: Optional[Iterable[str]] = None,
+            interactive: bool = False, **kwargs) -> Any:
+        """
+        Runs fn(*args, **kwargs) within the rate and concurrency limits, retrying
+        failures with jittered backoff. After the last attempt the error is raised
+        and counted against `symbols`. `interactive` puts the call in the priority lane.
+        """
+        attempt = 0
+        while True:
+            self._acquire(interactive)
+            started = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                self._release(ok=False, throttled=is_rate_limited(e), interactive=interactive)
+                attempt += 1
+                if attempt > self.max_retries:
+                    with self._cond:
+                        self._stats['failed'] += 1
+                    self.account(symbols or [], [], error=e)
+                    raise
+                with self._cond:
+                    self._stats['retries'] += 1
+                time.sleep(self._backoff(attempt))
+                continue
+            self._release(ok=True, slow=time.monotonic() - started > self.slow_call, interactive=interactive)
+            return result
+
+    def run_batch(self, fn: Callable, symbols: Iterable[str], *args, interactive: bool = False, **kwargs) -> Dict:
+        """
+        Runs a batch call fn(symbols, ...) -> {symbol: value} through run(); symbols
+        missing from the response are requested once more, then accounted for.
+        """
+        symbols = list(symbols)
+        result = dict(self.run(fn, symbols, *args, symbols=symbols, interactive=interactive, **kwargs) or {})
+        error = None
+        missing = [sym for sym in symbols if _is_missing(result.get(sym))]
+        if missing:
+            try:
+                result.update(self.run(fn, missing, *args, symbols=missing, interactive=interactive, **kwargs) or {})
+            except Exception as e:
+                error = e
+        self.account(symbols, [sym for sym in symbols if not _is_missing(result.get(sym))], error=error)
+        return result
+
+    def account(self, requested: Iterable[str], succeeded: Iterable[str], error: Optional[Exception] = None):
+        """Records which symbols of a batch came back; the rest count as failures."""
+        succeeded = set(succeeded)
+        now = time.time()
+        reason = str(error) if error is not None else 'missing from response'
+        with self._cond:
+            for sym in requested:
+                if sym in succeeded:
+                    entry = self._symbols.get(sym)
+                    if entry is not None:
+                        entry['consecutive'] = 0
+                    continue
+                entry = self._symbols.setdefault(sym, {'consecutive': 0, 'total': 0})
+                entry['consecutive'] += 1
+                entry['total'] += 1
+                entry['last_error'] = reason[:200]
+                entry['last_failure'] = now
+
+    def get_stats(self, top: int = 20) -> Dict:
+        """Counters, the current concurrency limit and the symbols failing most often in a row."""
+        with self._cond:
+            failing = sorted(
+                ((sym, dict(entry)) for sym, entry in self._symbols.items() if entry['consecutive'] > 0),
+                key=lambda item: (-item[1]['consecutive'], item[0])
+            )
+            return {
+                **self._stats,
+                'concurrency_limit': round(self._limit, 2),
+                'active': self._active,
+                'interactive_active': self._interactive_active,
+                'failing_symbols': dict(failing[:top])
+            }
+
+    # ---- Limits ----
+
+    def _acquire(self, interactive: bool = False):
+        with self._cond:
+            if interactive:
+                # Reserved slots, outside the AIMD limit
+                self._interactive_waiting += 1
+                while self._interactive_active >= self.interactive_slots:
+                    self._cond.wait()
+                self._interactive_active += 1
+                self._stats['interactive_calls'] += 1
+            else:
+                # Concurrency slot (AIMD limit)
+                while self._active >= int(self._limit):
+                    self._cond.wait()
+                self._active += 1
+            self._stats['calls'] += 1
+
+            # Rate token; waiting interactive calls take the next one
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+                self._refilled_at = now
+                if self._tokens >= 1 and (interactive or not self._interactive_waiting):
+                    self._tokens -= 1
+                    if interactive:
+                        self._interactive_waiting -= 1
+                        self._cond.notify_all()
+                    return
+                self._stats['rate_waits'] += 1
+                self._cond.wait(max((1 - self._tokens) / self.rate, 0.01))
+
+    def _release(self, ok: bool, throttled: bool = False, slow: bool = False, interactive: bool = False):
+        with self._cond:
+            if interactive:
+                self._interactive_active -= 1
+            else:
+                self._active -= 1
+            if throttled:
+                self._stats['throttled'] += 1
+            if slow:
+                self._stats['slow'] += 1
+            if ok:
+                self._stats['succeeded'] += 1
+            if ok and not slow:
+                # Additive increase: about +1 per `limit` successful calls
+                self._limit = min(self.max_concurrency, self._limit + 1.0 / self._limit)
+            else:
+                # Multiplicative decrease
+                self._limit = max(self.min_concurrency, self._limit / 2)
+            self._cond.notify_all()
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, base * 2^attempt], capped
+        with self._cond:
+            return self._rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or bool(getattr(value, 'empty', False))
+
+
+_scheduler: Optional[FetchScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> FetchScheduler:
+    """Returns the process-wide scheduler shared by the screener, watchlist and portfolio paths."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = FetchScheduler()
+        return _scheduler
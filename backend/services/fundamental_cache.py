@@ -0,0 +1,204 @@
+"""
+Fundamental Cache - SQLite-backed cache for upstream fundamentals.
+
+Entries are keyed by (symbol, kind) where kind is 'info' or
+'<statement>_<freq>' (e.g. 'income_quarterly'). `info` carries live price
+fields and gets a short TTL; financial statements change a few times a year
+and get a long one. Empty statements are cached too, with the short TTL, so
+symbols without data do not hit the upstream on every request.
+
+Stale entries are served immediately and refreshed in a background thread
+(stale-while-revalidate); only true misses block on the provider. Parsed
+values are kept in memory in front of the database.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+import pandas as pd
+from typing import Any, Dict, Optional
+
+from .market_data import MarketDataProvider
+
+
+class FundamentalCache:
+    def __init__(self, provider: MarketDataProvider, db_path: str = None,
+                 info_ttl: float = 15 * 60, statement_ttl: float = 24 * 3600):
+        if db_path is None:
+            # Consistent with other services
+            db_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
+            os.makedirs(db_dir, exist_ok=True)
+            db_path = os.path.join(db_dir, 'fundamentals.db')
+        self.db_path = db_path
+        self.provider = provider
+        self.info_ttl = info_ttl
+        self.statement_ttl = statement_ttl
+
+        self._memory: Dict[tuple, tuple] = {}  # {(symbol, kind): (fetched_at, value)}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._stats = {
+            group: {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'errors': 0}
+            for group in ('info', 'statement')
+        }
+        self._init_db()
+
+    def _init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS fundamentals (
+                    symbol TEXT NOT NULL,
+                    kind TEXT NOT NULL, -- 'info' or '<statement>_<freq>'
+                    payload TEXT,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (symbol, kind)
+                )
+            ''')
+            conn.commit()
+
+    # ---- Public API ----
+
+    def get_info(self, symbol: str) -> Dict:
+        return self._get(symbol, 'info') or {}
+
+    def get_statement(self, symbol: str, statement: str, freq: str = 'quarterly') -> Optional[pd.DataFrame]:
+        return self._get(symbol, f"{statement}_{freq}")
+
+    def get_stats(self) -> Dict:
+        """Hit / stale hit / miss / refresh counters for info and statements."""
+        with self._lock:
+            stats = {group: dict(values) for group, values in self._stats.items()}
+            stats['entries'] = len(self._memory)
+            stats['refreshing'] = len(self._refreshing)
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._memory = {}
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('DELETE FROM fundamentals')
+            conn.commit()
+
+    # ---- Lookup ----
+
+    def _get(self, symbol: str, kind: str) -> Any:
+        symbol = symbol.upper()
+        group = 'info' if kind == 'info' else 'statement'
+        key = (symbol, kind)
+
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is None:
+            entry = self._load(symbol, kind)
+            if entry is not None:
+                with self._lock:
+                    self._memory[key] = entry
+
+        if entry is None:
+            with self._lock:
+                self._stats[group]['misses'] += 1
+            return self._refresh(symbol, kind)
+
+        fetched_at, value = entry
+        stale = time.time() - fetched_at >= self._ttl(kind, value)
+        with self._lock:
+            self._stats[group]['stale_hits' if stale else 'hits'] += 1
+            start = stale and key not in self._refreshing
+            if start:
+                self._refreshing.add(key)
+        if start:
+            threading.Thread(target=self._background_refresh, args=(symbol, kind), daemon=True).start()
+        return value
+
+    def _ttl(self, kind: str, value: Any) -> float:
+        if kind == 'info' or value is None:
+            return self.info_ttl
+        return self.statement_ttl
+
+    # ---- Refresh ----
+
+    def _fetch(self, symbol: str, kind: str) -> Any:
+        if kind == 'info':
+            return self.provider.fundamentals(symbol) or {}
+        statement, freq = kind.split('_', 1)
+        stmt = self.provider.financial_statement(symbol, statement, freq=freq)
+        return stmt if stmt is not None and not stmt.empty else None
+
+    def _refresh(self, symbol: str, kind: str) -> Any:
+        group = 'info' if kind == 'info' else 'statement'
+        try:
+            value = self._fetch(symbol, kind)
+        except Exception:
+            with self._lock:
+                self._stats[group]['errors'] += 1
+            raise
+        entry = (time.time(), value)
+        with self._lock:
+            self._memory[(symbol, kind)] = entry
+            self._stats[group]['refreshes'] += 1
+        self._store(symbol, kind, entry)
+        return value
+
+    def _background_refresh(self, symbol: str, kind: str):
+        try:
+            self._refresh(symbol, kind)
+        except Exception as e:
+            print(f"Fundamental refresh error ({symbol} {kind}): {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard((symbol, kind))
+
+    # ---- Persistence ----
+
+    def _load(self, symbol: str, kind: str) -> Optional[tuple]:
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                row = conn.execute(
+                    'SELECT payload, fetched_at FROM fundamentals WHERE symbol = ? AND kind = ?', (symbol, kind)
+                ).fetchone()
+        except Exception as e:
+            print(f"Fundamental cache read error ({symbol} {kind}): {e}")
+            return None
+        if row is None:
+            return None
+        payload, fetched_at = row
+        try:
+            return fetched_at, self._decode(kind, payload)
+        except (ValueError, TypeError, KeyError):
+            return None
+
+    def _store(self, symbol: str, kind: str, entry: tuple):
+        fetched_at, value = entry
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO fundamentals (symbol, kind, payload, fetched_at) VALUES (?, ?, ?, ?)',
+                    (symbol, kind, self._encode(kind, value), fetched_at)
+                )
+                conn.commit()
+        except Exception as e:
+            print(f"Fundamental cache write error ({symbol} {kind}): {e}")
+
+    @staticmethod
+    def _encode(kind: str, value: Any) -> Optional[str]:
+        if value is None:
+            return None
+        if kind == 'info':
+            return json.dumps(value, default=str)
+        # Statements keep their row / column order (most recent period first)
+        return json.dumps({
+            'index': [str(i) for i in value.index],
+            'columns': [str(c) for c in value.columns],
+            'data': value.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float).tolist()
+        })
+
+    @staticmethod
+    def _decode(kind: str, payload: Optional[str]) -> Any:
+        if payload is None:
+            return None
+        data = json.loads(payload)
+        if kind == 'info':
+            return data
+        return pd.DataFrame(data['data'], index=data['index'], columns=data['columns'])
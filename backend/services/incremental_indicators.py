@@ -0,0 +1,407 @@
+"""
+Incremental Indicator Engine - keeps IndicatorService outputs up to date bar by bar.
+
+A state is seeded once from the batch frame (IndicatorService) and then only
+the last candle is recomputed: replacing the forming bar or appending a new
+one costs O(1) per indicator, independent of history length. Rolling means
+keep running sums, EMAs / SuperTrend / VWAP keep their recursive carries, and
+the short fixed windows (stochastic, CCI, Bollinger std, NW kernel) are read
+from bounded deques.
+
+The formulas mirror IndicatorService one to one, so the streamed rows match
+the batch path up to floating point summation order.
+"""
+
+import math
+import threading
+from collections import deque
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+NW_WINDOW = 50
+NW_H = 14
+NW_MULT = 2.0
+NW_WEIGHTS = np.exp(-((NW_WINDOW - np.arange(NW_WINDOW + 1)) ** 2) / (2 * NW_H ** 2))
+
+INT_COLUMNS = ('NW_DIR', 'NW_SIGNAL', 'AI_PATTERN_TYPE', 'AI_PATTERN_CONF')
+
+
+def _div(a, b) -> float:
+    """Float division with NumPy semantics (x/0 -> inf/nan instead of raising)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return float(np.float64(a) / np.float64(b))
+
+
+def _ewm_step(prev: float, x: float, span: int) -> float:
+    """One step of pandas ewm(span, adjust=False).mean()."""
+    alpha = 2.0 / (span + 1.0)
+    old_wt = 1.0 - alpha
+    return (old_wt * prev + alpha * x) / (old_wt + alpha)
+
+
+class _Window:
+    """Committed tail of a rolling window (size - 1 values) with a running sum."""
+
+    def __init__(self, size: int, values):
+        self.size = size
+        tail = np.asarray(values, dtype=np.float64)[-(size - 1):] if size > 1 else []
+        self.values = deque((float(x) for x in tail), maxlen=size - 1)
+        self.total = 0.0
+        self.nonfinite = 0
+        for x in self.values:
+            self._add(x, 1)
+
+    def _add(self, x: float, sign: int):
+        if math.isfinite(x):
+            self.total += sign * x
+        else:
+            self.nonfinite += sign
+
+    def is_ready(self) -> bool:
+        return len(self.values) == self.size - 1
+
+    def array_with(self, x: float) -> np.ndarray:
+        return np.append(np.fromiter(self.values, dtype=np.float64, count=len(self.values)), x)
+
+    def sum_with(self, x: float) -> float:
+        if not self.is_ready():
+            return float('nan')
+        if self.nonfinite or not math.isfinite(x):
+            return float(np.sum(self.array_with(x)))
+        return self.total + x
+
+    def push(self, x: float):
+        if self.size == 1:
+            return
+        if self.is_ready():
+            self._add(self.values[0], -1)
+        self.values.append(x)
+        self._add(x, 1)
+
+
+class IncrementalIndicatorState:
+    MIN_BARS = 250      # MA200 plus warm-up; shorter series always use the batch path
+    MAX_APPEND = 64     # more new bars than this -> cheaper to rebuild in batch
+
+    def __init__(self, df: pd.DataFrame, records: List[Dict]):
+        """Seeds the committed state (bars 0..n-2) from a raw batch frame."""
+        self.lock = threading.Lock()
+        self.records = records
+        n = len(df)
+        k = n - 1  # number of committed bars
+
+        o = df['Open'].to_numpy(dtype=np.float64)
+        h = df['High'].to_numpy(dtype=np.float64)
+        l = df['Low'].to_numpy(dtype=np.float64)
+        c = df['Close'].to_numpy(dtype=np.float64)
+        v = df['Volume'].to_numpy(dtype=np.float64)
+
+        delta = np.diff(c, prepend=np.nan)
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        prev_c = np.roll(c, 1)
+        tr = np.maximum(h - l, np.maximum(np.abs(h - prev_c), np.abs(l - prev_c)))
+        tp = (h + l + c) / 3
+        prev_tp = np.roll(tp, 1)
+        mf = tp * v
+        mf_pos = np.where(tp > prev_tp, mf, 0.0)
+        mf_neg = np.where(tp < prev_tp, mf, 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mfv = ((c - l) - (h - c)) / (h - l) * v
+        absdiff = np.abs(c - df['NW_SMOOTH'].to_numpy(dtype=np.float64))
+        stoch_k = df['STOCH_K'].to_numpy(dtype=np.float64)
+
+        self.windows = {
+            'close20': _Window(20, c[:k]),
+            'close50': _Window(50, c[:k]),
+            'close200': _Window(200, c[:k]),
+            'gain14': _Window(14, gain[:k]),
+            'loss14': _Window(14, loss[:k]),
+            'tr14': _Window(14, tr[:k]),
+            'tr10': _Window(10, tr[:k]),
+            'high14': _Window(14, h[:k]),
+            'low14': _Window(14, l[:k]),
+            'stoch_k3': _Window(3, stoch_k[:k]),
+            'absdiff50': _Window(NW_WINDOW, absdiff[:k]),
+            'tp20': _Window(20, tp[:k]),
+            'mf_pos14': _Window(14, mf_pos[:k]),
+            'mf_neg14': _Window(14, mf_neg[:k]),
+            'mfv20': _Window(20, mfv[:k]),
+            'vol20': _Window(20, v[:k]),
+        }
+        self.nw_closes = deque(c[:k][-NW_WINDOW:].tolist(), maxlen=NW_WINDOW)
+        self.recent = deque(zip(o[:k][-2:].tolist(), c[:k][-2:].tolist()), maxlen=2)
+
+        j = k - 1  # last committed row
+        close_s = df['Close'].astype(float)
+        self.carry = {
+            'close': float(c[j]),
+            'tp': float(tp[j]),
+            'ema9': float(df['EMA9'].iloc[j]),
+            'ema21': float(df['EMA21'].iloc[j]),
+            'ema12': float(close_s.ewm(span=12, adjust=False).mean().iloc[j]),
+            'ema26': float(close_s.ewm(span=26, adjust=False).mean().iloc[j]),
+            'macd_signal': float(df['MACD_SIGNAL'].iloc[j]),
+            'st_upper': float(df['ST_UPPER'].iloc[j]),
+            'st_lower': float(df['ST_LOWER'].iloc[j]),
+            'st_trend': float(df['ST_TREND'].iloc[j]),
+            'cum_pv': float(np.cumsum(tp[:k] * v[:k])[-1]),
+            'cum_v': float(np.cumsum(v[:k])[-1]),
+            'nw': float(df['NW_SMOOTH'].iloc[j]),
+            'nw_upper': float(df['NW_UPPER'].iloc[j]),
+            'nw_lower': float(df['NW_LOWER'].iloc[j]),
+        }
+        self.last = self._compute((o[k], h[k], l[k], c[k], v[k]))
+
+    # ---- Public ----
+
+    def apply(self, data_list: List[Dict]) -> Optional[List[Dict]]:
+        """
+        Brings the state in line with data_list if it only differs in the last
+        bar and/or a few appended bars. Returns the full record list, or None
+        when the caller has to rebuild from the batch path.
+        """
+        with self.lock:
+            n, m = len(self.records), len(data_list)
+            if m < n or m - n > self.MAX_APPEND:
+                return None
+            if data_list[0].get('Date') != self.records[0].get('Date') or \
+                    data_list[n - 1].get('Date') != self.records[n - 1].get('Date'):
+                return None
+
+            for i in range(n - 1, m):
+                bar = self._parse_bar(data_list[i])
+                if bar is None:
+                    return None
+                if i == n - 1:
+                    self.last = self._compute(bar)
+                    self.records[-1] = self._to_record(data_list[i], bar, self.last[1])
+                else:
+                    self._commit()
+                    self.last = self._compute(bar)
+                    self.records.append(self._to_record(data_list[i], bar, self.last[1]))
+
+            return list(self.records)
+
+    def update_bar(self, item: Dict, append: bool = False) -> Optional[Dict]:
+        """
+        Single-bar form of apply() for callers that track the stream themselves:
+        revises the forming bar with `item`, or with append=True commits it and
+        starts `item` as the new forming bar. Returns the new last record, or
+        None if the bar is not usable (the state is left unchanged).
+        """
+        bar = self._parse_bar(item)
+        if bar is None:
+            return None
+        with self.lock:
+            if append:
+                self._commit()
+            self.last = self._compute(bar)
+            record = self._to_record(item, bar, self.last[1])
+            if append:
+                self.records.append(record)
+            else:
+                self.records[-1] = record
+            return record
+
+    # ---- Internals ----
+
+    @staticmethod
+    def _parse_bar(item: Dict):
+        try:
+            bar = tuple(float(item[col]) for col in ('Open', 'High', 'Low', 'Close', 'Volume'))
+        except (KeyError, TypeError, ValueError):
+            return None
+        # NaN candles change pandas' rolling/ewm semantics; leave them to the batch path
+        return bar if all(math.isfinite(x) for x in bar) else None
+
+    @staticmethod
+    def _to_record(item: Dict, bar, out: Dict) -> Dict:
+        record = dict(item)
+        record.update(zip(('Open', 'High', 'Low', 'Close', 'Volume'), bar))
+        for key, val in out.items():
+            if isinstance(val, str):
+                record[key] = val
+                continue
+            val = val if math.isfinite(val) else 0
+            record[key] = int(val) if key in INT_COLUMNS else float(val)
+        return record
+
+    def _commit(self):
+        """Folds the current last bar into the committed state."""
+        bar, _, push, carry = self.last
+        for name, val in push.items():
+            self.windows[name].push(val)
+        self.nw_closes.append(bar[3])
+        self.recent.append((bar[0], bar[3]))
+        self.carry = carry
+
+    def _compute(self, bar):
+        """Computes every indicator for `bar` on top of the committed state."""
+        o, h, l, c, v = bar
+        w = self.windows
+        k = self.carry
+        prev_c = k['close']
+        out = {}
+
+        # Moving averages / EMA
+        for p in (20, 50, 200):
+            out[f'MA{p}'] = w[f'close{p}'].sum_with(c) / p
+        ema9 = _ewm_step(k['ema9'], c, 9)
+        ema21 = _ewm_step(k['ema21'], c, 21)
+        out['EMA9'], out['EMA21'] = ema9, ema21
+
+        # RSI
+        delta = c - prev_c
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        rs = _div(w['gain14'].sum_with(gain) / 14, w['loss14'].sum_with(loss) / 14)
+        out['RSI'] = 100 - _div(100, 1 + rs)
+
+        # MACD
+        ema12 = _ewm_step(k['ema12'], c, 12)
+        ema26 = _ewm_step(k['ema26'], c, 26)
+        macd = ema12 - ema26
+        macd_signal = _ewm_step(k['macd_signal'], macd, 9)
+        out['MACD'], out['MACD_SIGNAL'] = macd, macd_signal
+
+        # Bollinger
+        sma20 = out['MA20']
+        rstd = float(np.std(w['close20'].array_with(c), ddof=1))
+        out['BB_UPPER'] = sma20 + (rstd * 2)
+        out['BB_LOWER'] = sma20 - (rstd * 2)
+        out['BB_MIDDLE'] = sma20
+
+        # Nadaraya-Watson
+        y = np.append(np.fromiter(self.nw_closes, dtype=np.float64, count=len(self.nw_closes)), c)
+        nw = float(np.sum(NW_WEIGHTS[-len(y):] * y) / np.sum(NW_WEIGHTS[-len(y):]))
+        absdiff = abs(c - nw)
+        mae = w['absdiff50'].sum_with(absdiff) / NW_WINDOW
+        nw_upper = nw + (mae * NW_MULT)
+        nw_lower = nw - (mae * NW_MULT)
+        out['NW_SMOOTH'], out['NW_UPPER'], out['NW_LOWER'] = nw, nw_upper, nw_lower
+        out['NW_DIR'] = 1 if nw - k['nw'] > 0 else -1
+        if c < nw_lower and prev_c >= k['nw_lower']:
+            out['NW_SIGNAL'] = 1
+        elif c > nw_upper and prev_c <= k['nw_upper']:
+            out['NW_SIGNAL'] = -1
+        else:
+            out['NW_SIGNAL'] = 0
+
+        # ATR / SuperTrend
+        tr = max(h - l, abs(h - prev_c), abs(l - prev_c))
+        atr = w['tr14'].sum_with(tr) / 14
+        out['ATR'] = atr
+        hl2 = (h + l) / 2
+        st_atr = w['tr10'].sum_with(tr) / 10  # SuperTrend (10, 3) uses its own ATR period
+        upperband = hl2 + (3 * st_atr)
+        lowerband = hl2 - (3 * st_atr)
+        st_upper = upperband if (math.isnan(k['st_upper']) or upperband < k['st_upper'] or prev_c > k['st_upper']) \
+            else k['st_upper']
+        st_lower = lowerband if (math.isnan(k['st_lower']) or lowerband > k['st_lower'] or prev_c < k['st_lower']) \
+            else k['st_lower']
+        if k['st_trend'] == 0:
+            st_trend = 0.0 if math.isnan(st_upper) else (-1.0 if c >= (st_upper + st_lower) / 2 else 1.0)
+        elif k['st_trend'] == 1 and c > st_upper:
+            st_trend = -1.0
+        elif k['st_trend'] == -1 and c < st_lower:
+            st_trend = 1.0
+        else:
+            st_trend = k['st_trend']
+        out['ST_UPPER'], out['ST_LOWER'], out['ST_TREND'] = st_upper, st_lower, st_trend
+
+        # Stochastic
+        low_min = float(w['low14'].array_with(l).min())
+        high_max = float(w['high14'].array_with(h).max())
+        stoch_k = _div(100 * (c - low_min), high_max - low_min)
+        out['STOCH_K'] = stoch_k
+        out['STOCH_D'] = w['stoch_k3'].sum_with(stoch_k) / 3
+
+        # VWAP
+        tp = (h + l + c) / 3
+        cum_pv = k['cum_pv'] + tp * v
+        cum_v = k['cum_v'] + v
+        out['VWAP'] = _div(cum_pv, cum_v)
+
+        # MFI
+        mf = tp * v
+        mf_pos = mf if tp > k['tp'] else 0.0
+        mf_neg = mf if tp < k['tp'] else 0.0
+        mfr = _div(w['mf_pos14'].sum_with(mf_pos), w['mf_neg14'].sum_with(mf_neg))
+        out['MFI'] = 100 - _div(100, 1 + mfr)
+
+        # CCI
+        tp_window = w['tp20'].array_with(tp)
+        sma_tp = w['tp20'].sum_with(tp) / 20
+        mad_tp = float(np.abs(tp_window - tp_window.mean()).mean())
+        out['CCI'] = _div(tp - sma_tp, 0.015 * mad_tp)
+
+        # %B, Williams %R, CMF
+        out['BB_PCT'] = _div(c - out['BB_LOWER'], out['BB_UPPER'] - out['BB_LOWER'])
+        out['WILLIAMS_R'] = _div(-100 * (high_max - c), high_max - low_min)
+        mfv = _div((c - l) - (h - c), h - l) * v
+        out['CMF'] = _div(w['mfv20'].sum_with(mfv), w['vol20'].sum_with(v))
+
+        out.update(self._pattern(bar, out['MA20'], w['vol20'].sum_with(v) / 20))
+
+        push = {
+            'close20': c, 'close50': c, 'close200': c,
+            'gain14': gain, 'loss14': loss, 'tr14': tr, 'tr10': tr,
+            'high14': h, 'low14': l, 'stoch_k3': stoch_k,
+            'absdiff50': absdiff, 'tp20': tp,
+            'mf_pos14': mf_pos, 'mf_neg14': mf_neg,
+            'mfv20': mfv, 'vol20': v,
+        }
+        carry = {
+            'close': c, 'tp': tp,
+            'ema9': ema9, 'ema21': ema21, 'ema12': ema12, 'ema26': ema26,
+            'macd_signal': macd_signal,
+            'st_upper': st_upper, 'st_lower': st_lower, 'st_trend': st_trend,
+            'cum_pv': cum_pv, 'cum_v': cum_v,
+            'nw': nw, 'nw_upper': nw_upper, 'nw_lower': nw_lower,
+        }
+        return bar, out, push, carry
+
+    def _pattern(self, bar, ma20: float, vol_avg: float) -> Dict:
+        """Single-bar version of IndicatorService.detect_patterns."""
+        o, h, l, c, v = bar
+        (o2, c2), (o1, c1) = self.recent
+        result = {'AI_PATTERN_LABEL': "", 'AI_PATTERN_TYPE': 0, 'AI_PATTERN_CONF': 0}
+
+        body = abs(c - o)
+        upper_wick = h - max(o, c)
+        lower_wick = min(o, c) - l
+        total_range = h - l
+        if total_range == 0:
+            return result
+
+        is_bullish_trend = c > ma20
+        is_bearish_trend = c < ma20
+        vol_spike = v > (vol_avg * 1.2)
+
+        label = ""
+        ptype = 0
+        conf = 0
+
+        if is_bearish_trend and lower_wick > (body * 2) and upper_wick < (body * 0.5):
+            label, ptype, conf = "Çekiç (Hammer)", 1, 70 + (20 if vol_spike else 0)
+        elif is_bullish_trend and upper_wick > (body * 2) and lower_wick < (body * 0.5):
+            label, ptype, conf = "Ters Çekiç (Shooting Star)", -1, 70 + (20 if vol_spike else 0)
+
+        prev_body = abs(c1 - o1)
+        if body > prev_body:
+            if is_bearish_trend and c > o and c1 < o1 and c > o1 and o < c1:
+                label, ptype, conf = "Boğa Yutan (Engulfing)", 1, 75 + (15 if vol_spike else 0)
+            elif is_bullish_trend and c < o and c1 > o1 and c < o1 and o > c1:
+                label, ptype, conf = "Ayı Yutan (Engulfing)", -1, 75 + (15 if vol_spike else 0)
+
+        if not label:
+            if is_bearish_trend and c2 < o2 and abs(c1 - o1) < (abs(c2 - o2) * 0.3) and c > o and c > (o2 + c2) / 2:
+                label, ptype, conf = "Sabah Yıldızı (Morning Star)", 1, 85
+            elif is_bullish_trend and c2 > o2 and abs(c1 - o1) < (abs(c2 - o2) * 0.3) and c < o and c < (o2 + c2) / 2:
+                label, ptype, conf = "Akşam Yıldızı (Evening Star)", -1, 85
+
+        if label:
+            result = {'AI_PATTERN_LABEL': label, 'AI_PATTERN_TYPE': ptype, 'AI_PATTERN_CONF': conf}
+        return result
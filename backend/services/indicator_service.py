@@ -1,16 +1,196 @@
+import math
 import pandas as pd
 import numpy as np
-from typing import Dict, List
+import threading
+from functools import lru_cache
+from numpy.lib.stride_tricks import sliding_window_view
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from .incremental_indicators import IncrementalIndicatorState
+from .serialization import to_json_columns
 
 class IndicatorService:
-    def add_indicators(self, data_list: List[Dict]) -> List[Dict]:
+    # Selectable indicators for add_selected_indicators:
+    # name -> (method, default params, output columns, dependencies as (name, params or None))
+    # MA / EMA take any number of periods; '{}' in their column name is the period.
+    INDICATORS = {
+        'MA': ('add_moving_averages', (20, 50, 200), ('MA{}',), ()),
+        'EMA': ('add_ema', (9, 21), ('EMA{}',), ()),
+        'RSI': ('add_rsi', (14,), ('RSI',), ()),
+        'MACD': ('add_macd', (12, 26, 9), ('MACD', 'MACD_SIGNAL'), ()),
+        'BB': ('add_bollinger_bands', (20, 2), ('BB_UPPER', 'BB_LOWER', 'BB_MIDDLE'), ()),
+        'NW': ('add_nadaraya_watson', (14, 50, 2.0), ('NW_SMOOTH', 'NW_UPPER', 'NW_LOWER', 'NW_DIR', 'NW_SIGNAL'), ()),
+        'ATR': ('add_atr', (14,), ('ATR',), ()),
+        'ST': ('add_supertrend', (10, 3), ('ST_UPPER', 'ST_LOWER', 'ST_TREND'), ()),
+        'STOCH': ('add_stochastic', (14, 3), ('STOCH_K', 'STOCH_D'), ()),
+        'VWAP': ('add_vwap', (), ('VWAP',), ()),
+        'MFI': ('add_mfi', (14,), ('MFI',), ()),
+        'CCI': ('add_cci', (20,), ('CCI',), ()),
+        'BB_PCT': ('add_bollinger_percent', (), ('BB_PCT',), (('BB', None),)),
+        'WILLIAMS_R': ('add_williams_r', (14,), ('WILLIAMS_R',), ()),
+        'CMF': ('add_cmf', (20,), ('CMF',), ()),
+        'PATTERNS': ('detect_patterns', (), ('AI_PATTERN_LABEL', 'AI_PATTERN_TYPE', 'AI_PATTERN_CONF'), (('MA', (20,)),)),
+    }
+    # Parameters that may be fractional (by position); all others are window lengths
+    FRACTIONAL_PARAMS = {'BB': (1,), 'NW': (0, 2), 'ST': (1,)}
+    INDICATOR_ALIASES = {
+        'SMA': 'MA', 'SUPERTREND': 'ST', 'STOCHASTIC': 'STOCH', 'WR': 'WILLIAMS_R',
+        'BBP': 'BB_PCT', 'AI': 'PATTERNS', 'AI_PATTERN': 'PATTERNS'
+    }
+
+    def __init__(self, max_streams: int = 64):
+        self.max_streams = max_streams
+        self._streams = OrderedDict()  # {key: IncrementalIndicatorState}, LRU ordered
+        self._streams_lock = threading.Lock()
+
+    def add_indicators(self, data_list: List[Dict], layout: str = "records") -> List[Dict]:
         """
         Receives a list of dictionaries (records from DataService),
         converts to DataFrame, adds indicators, and returns list of dicts.
+        With layout 'columnar' / 'arrays' the input and output are column dicts
+        ({'time': [...], 'Open': [...], ...}) of JSON lists / NumPy arrays instead.
+        """
+        if not data_list:
+            return [] if layout == 'records' else {}
+        return self._format_output(self._compute_frame(data_list), layout)
+
+    def update_indicators(self, key: str, data_list: List[Dict]) -> List[Dict]:
+        """
+        Incremental mode of add_indicators for a candle stream (e.g. symbol + interval).
+        If data_list only differs from the previous call in the last bar or a few
+        appended bars, just those rows are recomputed from the stored rolling state;
+        otherwise the batch path runs and re-seeds the state.
         """
         if not data_list:
             return []
-            
+
+        with self._streams_lock:
+            state = self._streams.get(key)
+            if state is not None:
+                self._streams.move_to_end(key)
+
+        if state is not None:
+            records = state.apply(data_list)
+            if records is not None:
+                return records
+
+        state, records = self.create_stream(data_list)
+        if state is not None:
+            with self._streams_lock:
+                self._streams[key] = state
+                self._streams.move_to_end(key)
+                while len(self._streams) > self.max_streams:
+                    self._streams.popitem(last=False)
+            return list(records)
+        return records
+
+    def create_stream(self, data_list: List[Dict]) -> Tuple[Optional[IncrementalIndicatorState], List[Dict]]:
+        """
+        Batch-computes data_list and seeds an incremental state from it, for callers
+        that keep their own streams. Returns (state, records); state is None when the
+        series is too short for the incremental path.
+        """
+        df = self._compute_frame(data_list)
+        records = self._to_records(df)
+        if len(records) < IncrementalIndicatorState.MIN_BARS:
+            return None, records
+        return IncrementalIndicatorState(df, records), records
+
+    def parse_indicator_spec(self, spec: str) -> List[Tuple[str, Tuple]]:
+        """
+        Parses an indicator selection such as "RSI:14,EMA:9,BB:20:2" into
+        [(name, params), ...]. Omitted params fall back to the defaults.
+        Raises ValueError for unknown names or malformed params (parameters must be
+        finite and positive, and window lengths whole numbers).
+        """
+        selection = []
+        for token in spec.split(','):
+            token = token.strip()
+            if not token:
+                continue
+            name, *raw_params = [part.strip() for part in token.split(':')]
+            name = name.upper()
+            name = self.INDICATOR_ALIASES.get(name, name)
+            if name not in self.INDICATORS:
+                raise ValueError(f"Unknown indicator: {name}")
+
+            try:
+                params = tuple(int(float(p)) if float(p).is_integer() else float(p) for p in raw_params)
+            except (ValueError, OverflowError):
+                raise ValueError(f"Invalid parameters for {name}: {token}")
+            fractional = self.FRACTIONAL_PARAMS.get(name, ())
+            for i, p in enumerate(params):
+                if not math.isfinite(p) or p <= 0 or (isinstance(p, float) and i not in fractional):
+                    raise ValueError(f"Invalid parameters for {name}: {token}")
+
+            defaults = self.INDICATORS[name][1]
+            if name in ('MA', 'EMA'):
+                if any(not isinstance(p, int) or p <= 0 for p in params):
+                    raise ValueError(f"Invalid parameters for {name}: {token}")
+                params = params or defaults
+            else:
+                if len(params) > len(defaults):
+                    raise ValueError(f"Too many parameters for {name}: {token}")
+                params = params + defaults[len(params):]
+            selection.append((name, params))
+        return selection
+
+    def add_selected_indicators(self, data_list: List[Dict], selection: List[Tuple[str, Tuple]],
+                                layout: str = "records") -> List[Dict]:
+        """
+        Computes only the selected indicators (plus their dependencies) and
+        returns records (or columns) carrying the input columns and the selected outputs.
+        """
+        if not data_list:
+            return [] if layout == 'records' else {}
+
+        # Resolve dependencies (BB_PCT -> BB, PATTERNS -> MA20)
+        plan = {}
+        periods = {'MA': [], 'EMA': []}
+        outputs = []
+        pending = [(name, params, True) for name, params in selection]
+        while pending:
+            name, params, requested = pending.pop(0)
+            method, defaults, columns, deps = self.INDICATORS[name]
+            if name in periods:
+                params = params or defaults
+                periods[name].extend(p for p in params if p not in periods[name])
+                cols = [columns[0].format(p) for p in params]
+            else:
+                if params is None:
+                    if name in plan:
+                        continue
+                    params = defaults
+                plan[name] = params
+                cols = list(columns)
+            if requested:
+                outputs.extend(c for c in cols if c not in outputs)
+            for dep_name, dep_params in deps:
+                if dep_name in periods:
+                    if dep_params is None or any(p not in periods[dep_name] for p in dep_params):
+                        pending.append((dep_name, dep_params, False))
+                elif dep_name not in plan and not any(n == dep_name for n, _, _ in pending):
+                    pending.append((dep_name, dep_params, False))
+
+        df = pd.DataFrame(data_list)
+        input_columns = list(df.columns)
+        for c in ['Open', 'High', 'Low', 'Close', 'Volume']:
+            if c in df.columns:
+                df[c] = pd.to_numeric(df[c], errors='coerce')
+
+        # Same order as the full batch so dependencies are in place
+        for name, (method, _, _, _) in self.INDICATORS.items():
+            if name in periods:
+                if periods[name]:
+                    df = getattr(self, method)(df, tuple(periods[name]))
+            elif name in plan:
+                df = getattr(self, method)(df, *plan[name])
+
+        keep = input_columns + [c for c in outputs if c in df.columns and c not in input_columns]
+        return self._format_output(df[keep], layout)
+
+    def _compute_frame(self, data_list: List[Dict]) -> pd.DataFrame:
+        """Batch computation of every indicator; returns the raw frame (NaN kept)."""
         df = pd.DataFrame(data_list)
         
         # Ensure numeric columns
@@ -36,7 +216,18 @@ class IndicatorService:
         df = self.add_williams_r(df)
         df = self.add_cmf(df)
         df = self.detect_patterns(df)
-        
+        return df
+
+    @classmethod
+    def _format_output(cls, df: pd.DataFrame, layout: str):
+        if layout == 'arrays':
+            return {col: df[col].to_numpy() for col in df.columns}
+        if layout == 'columnar':
+            return to_json_columns(df)
+        return cls._to_records(df)
+
+    @staticmethod
+    def _to_records(df: pd.DataFrame) -> List[Dict]:
         # Handle NaN values for JSON serialization
         df = df.replace([np.inf, -np.inf], np.nan)
         df = df.fillna(0)
@@ -50,88 +241,67 @@ class IndicatorService:
         if 'MA20' not in df.columns:
             df = self.add_moving_averages(df)
             
-        df['AI_PATTERN_LABEL'] = ""
-        df['AI_PATTERN_TYPE'] = 0 # 1 for Bullish, -1 for Bearish
-        df['AI_PATTERN_CONF'] = 0
-        
-        close = df['Close'].values
-        open_ = df['Open'].values
-        high = df['High'].values
-        low = df['Low'].values
-        vol = df['Volume'].values
-        ma20 = df['MA20'].values
+        close = df['Close'].values.astype(np.float64)
+        open_ = df['Open'].values.astype(np.float64)
+        high = df['High'].values.astype(np.float64)
+        low = df['Low'].values.astype(np.float64)
+        vol = df['Volume'].values.astype(np.float64)
+        ma20 = df['MA20'].values.astype(np.float64)
         vol_avg = df['Volume'].rolling(window=20).mean().values
 
-        for i in range(2, len(df)):
-            body = abs(close[i] - open_[i])
-            upper_wick = high[i] - max(open_[i], close[i])
-            lower_wick = min(open_[i], close[i]) - low[i]
-            total_range = high[i] - low[i]
-            if total_range == 0: continue
-            
-            is_bullish_trend = close[i] > ma20[i]
-            is_bearish_trend = close[i] < ma20[i]
-            vol_spike = vol[i] > (vol_avg[i] * 1.2)
-            
-            label = ""
-            ptype = 0
-            conf = 0
-
-            # 1. HAMMER (Boğa - Düşüş trendinde)
-            if is_bearish_trend and lower_wick > (body * 2) and upper_wick < (body * 0.5):
-                label = "Çekiç (Hammer)"
-                ptype = 1
-                conf = 70 + (20 if vol_spike else 0)
-            
-            # 2. SHOOTING STAR (Ayı - Yükseliş trendinde)
-            elif is_bullish_trend and upper_wick > (body * 2) and lower_wick < (body * 0.5):
-                label = "Ters Çekiç (Shooting Star)"
-                ptype = -1
-                conf = 70 + (20 if vol_spike else 0)
-
-            # 3. ENGULFING (Yutan Mum)
-            prev_body = abs(close[i-1] - open_[i-1])
-            if body > prev_body:
-                # Bullish Engulfing
-                if is_bearish_trend and close[i] > open_[i] and close[i-1] < open_[i-1] and close[i] > open_[i-1] and open_[i] < close[i-1]:
-                    label = "Boğa Yutan (Engulfing)"
-                    ptype = 1
-                    conf = 75 + (15 if vol_spike else 0)
-                # Bearish Engulfing
-                elif is_bullish_trend and close[i] < open_[i] and close[i-1] > open_[i-1] and close[i] < open_[i-1] and open_[i] > close[i-1]:
-                    label = "Ayı Yutan (Engulfing)"
-                    ptype = -1
-                    conf = 75 + (15 if vol_spike else 0)
-
-            # 4. MORNING / EVENING STAR (Yıldızlar)
-            if not label:
-                # Morning Star (Bullish Reversal)
-                if is_bearish_trend and close[i-2] < open_[i-2] and abs(close[i-1]-open_[i-1]) < (abs(close[i-2]-open_[i-2])*0.3) and close[i] > open_[i] and close[i] > (open_[i-2] + close[i-2])/2:
-                    label = "Sabah Yıldızı (Morning Star)"
-                    ptype = 1
-                    conf = 85
-                # Evening Star (Bearish Reversal)
-                elif is_bullish_trend and close[i-2] > open_[i-2] and abs(close[i-1]-open_[i-1]) < (abs(close[i-2]-open_[i-2])*0.3) and close[i] < open_[i] and close[i] < (open_[i-2] + close[i-2])/2:
-                    label = "Akşam Yıldızı (Evening Star)"
-                    ptype = -1
-                    conf = 85
-
-            if label:
-                df.at[df.index[i], 'AI_PATTERN_LABEL'] = label
-                df.at[df.index[i], 'AI_PATTERN_TYPE'] = ptype
-                df.at[df.index[i], 'AI_PATTERN_CONF'] = conf
+        # Previous one / two candles (first two bars are never labelled)
+        open_1, close_1 = np.roll(open_, 1), np.roll(close, 1)
+        open_2, close_2 = np.roll(open_, 2), np.roll(close, 2)
+
+        body = np.abs(close - open_)
+        upper_wick = high - np.maximum(open_, close)
+        lower_wick = np.minimum(open_, close) - low
+        total_range = high - low
+        valid = total_range != 0
+        valid[:2] = False
+
+        is_bullish_trend = valid & (close > ma20)
+        is_bearish_trend = valid & (close < ma20)
+        vol_spike = vol > (vol_avg * 1.2)
+
+        # 1. HAMMER (Boğa - Düşüş trendinde) / 2. SHOOTING STAR (Ayı - Yükseliş trendinde)
+        hammer = is_bearish_trend & (lower_wick > (body * 2)) & (upper_wick < (body * 0.5))
+        shooting_star = is_bullish_trend & (upper_wick > (body * 2)) & (lower_wick < (body * 0.5))
+
+        # 3. ENGULFING (Yutan Mum) - overrides hammer / shooting star
+        bigger_body = body > np.abs(close_1 - open_1)
+        bull_engulf = bigger_body & is_bearish_trend & (close > open_) & (close_1 < open_1) & (close > open_1) & (open_ < close_1)
+        bear_engulf = bigger_body & is_bullish_trend & (close < open_) & (close_1 > open_1) & (close < open_1) & (open_ > close_1)
+
+        # 4. MORNING / EVENING STAR (Yıldızlar) - only when nothing else matched
+        small_middle = np.abs(close_1 - open_1) < (np.abs(close_2 - open_2) * 0.3)
+        mid_2 = (open_2 + close_2) / 2
+        morning_star = is_bearish_trend & (close_2 < open_2) & small_middle & (close > open_) & (close > mid_2)
+        evening_star = is_bullish_trend & (close_2 > open_2) & small_middle & (close < open_) & (close < mid_2)
+
+        # np.select keeps the first match, which reproduces the precedence above
+        conditions = [bull_engulf, bear_engulf, hammer, shooting_star, morning_star, evening_star]
+        df['AI_PATTERN_LABEL'] = np.select(conditions, [
+            "Boğa Yutan (Engulfing)", "Ayı Yutan (Engulfing)",
+            "Çekiç (Hammer)", "Ters Çekiç (Shooting Star)",
+            "Sabah Yıldızı (Morning Star)", "Akşam Yıldızı (Evening Star)"
+        ], default="")
+        df['AI_PATTERN_TYPE'] = np.select(conditions, [1, -1, 1, -1, 1, -1], default=0) # 1 for Bullish, -1 for Bearish
+        df['AI_PATTERN_CONF'] = np.select(conditions, [
+            75 + 15 * vol_spike, 75 + 15 * vol_spike,
+            70 + 20 * vol_spike, 70 + 20 * vol_spike,
+            85, 85
+        ], default=0)
 
         return df
 
-    def add_moving_averages(self, df: pd.DataFrame) -> pd.DataFrame:
-        periods = [20, 50, 200]
+    def add_moving_averages(self, df: pd.DataFrame, periods=(20, 50, 200)) -> pd.DataFrame:
         for p in periods:
             if len(df) >= p:
                 df[f'MA{p}'] = df['Close'].rolling(window=p).mean()
         return df
 
-    def add_ema(self, df: pd.DataFrame) -> pd.DataFrame:
-        periods = [9, 21]
+    def add_ema(self, df: pd.DataFrame, periods=(9, 21)) -> pd.DataFrame:
         for p in periods:
             if len(df) >= p:
                 df[f'EMA{p}'] = df['Close'].ewm(span=p, adjust=False).mean()
@@ -146,12 +316,12 @@ class IndicatorService:
         df['RSI'] = 100 - (100 / (1 + rs))
         return df
 
-    def add_macd(self, df: pd.DataFrame) -> pd.DataFrame:
-        if len(df) < 26: return df
-        exp1 = df['Close'].ewm(span=12, adjust=False).mean()
-        exp2 = df['Close'].ewm(span=26, adjust=False).mean()
+    def add_macd(self, df: pd.DataFrame, fast=12, slow=26, signal=9) -> pd.DataFrame:
+        if len(df) < slow: return df
+        exp1 = df['Close'].ewm(span=fast, adjust=False).mean()
+        exp2 = df['Close'].ewm(span=slow, adjust=False).mean()
         df['MACD'] = exp1 - exp2
-        df['MACD_SIGNAL'] = df['MACD'].ewm(span=9, adjust=False).mean()
+        df['MACD_SIGNAL'] = df['MACD'].ewm(span=signal, adjust=False).mean()
         return df
 
     def add_bollinger_bands(self, df: pd.DataFrame, period=20, std_dev=2) -> pd.DataFrame:
@@ -163,59 +333,67 @@ class IndicatorService:
         df['BB_MIDDLE'] = sma
         return df
 
-    def add_atr(self, df: pd.DataFrame, period=14) -> pd.DataFrame:
-        if len(df) < period: return df
+    @staticmethod
+    def _average_true_range(df: pd.DataFrame, period: int) -> pd.Series:
         high_low = df['High'] - df['Low']
         high_close = np.abs(df['High'] - df['Close'].shift())
         low_close = np.abs(df['Low'] - df['Close'].shift())
         ranges = pd.concat([high_low, high_close, low_close], axis=1)
         true_range = np.max(ranges, axis=1)
-        df['ATR'] = true_range.rolling(window=period).mean()
+        return true_range.rolling(window=period).mean()
+
+    def add_atr(self, df: pd.DataFrame, period=14) -> pd.DataFrame:
+        if len(df) < period: return df
+        df['ATR'] = self._average_true_range(df, period)
         return df
 
     def add_supertrend(self, df: pd.DataFrame, period=10, multiplier=3) -> pd.DataFrame:
-        if 'ATR' not in df.columns:
-            df = self.add_atr(df, period=period)
+        if len(df) < period: return df
+        # SuperTrend's own ATR period, independent of the ATR column
+        atr = self._average_true_range(df, period)
         
         hl2 = (df['High'] + df['Low']) / 2
-        upperband = hl2 + (multiplier * df['ATR'])
-        lowerband = hl2 - (multiplier * df['ATR'])
+        upperband = (hl2 + (multiplier * atr)).to_numpy(dtype=np.float64).tolist()
+        lowerband = (hl2 - (multiplier * atr)).to_numpy(dtype=np.float64).tolist()
+        close = df['Close'].to_numpy(dtype=np.float64).tolist()
         
-        # SuperTrend calculation logic
-        supertrend = [True] * len(df)
-        final_upperband = [0.0] * len(df)
-        final_lowerband = [0.0] * len(df)
-        trend = np.zeros(len(df))
+        # SuperTrend calculation logic (plain float recurrence, no per-element pandas access)
+        n = len(close)
+        final_upperband = upperband[:1] + [0.0] * (n - 1)
+        final_lowerband = lowerband[:1] + [0.0] * (n - 1)
+        trend = [0.0] * n
         
-        for i in range(1, len(df)):
-            # Final Upperband
-            if upperband.iloc[i] < final_upperband[i-1] or df['Close'].iloc[i-1] > final_upperband[i-1]:
-                final_upperband[i] = upperband.iloc[i]
+        for i in range(1, n):
+            prev_upper = final_upperband[i-1]
+            prev_lower = final_lowerband[i-1]
+            prev_close = close[i-1]
+
+            # Final Upperband (NaN during the ATR warm-up: start from the raw band)
+            if math.isnan(prev_upper) or upperband[i] < prev_upper or prev_close > prev_upper:
+                final_upperband[i] = upperband[i]
             else:
-                final_upperband[i] = final_upperband[i-1]
+                final_upperband[i] = prev_upper
                 
             # Final Lowerband
-            if lowerband.iloc[i] > final_lowerband[i-1] or df['Close'].iloc[i-1] < final_lowerband[i-1]:
-                final_lowerband[i] = lowerband.iloc[i]
+            if math.isnan(prev_lower) or lowerband[i] > prev_lower or prev_close < prev_lower:
+                final_lowerband[i] = lowerband[i]
             else:
-                final_lowerband[i] = final_lowerband[i-1]
+                final_lowerband[i] = prev_lower
                 
-            # Trend
-            if df['Close'].iloc[i] <= final_upperband[i]:
-                trend[i] = 1 # Down (or rather index 1)
-            else:
-                trend[i] = -1 # Up
-                
-            if trend[i-1] == 1 and df['Close'].iloc[i] > final_upperband[i]:
-                trend[i] = -1
-            elif trend[i-1] == -1 and df['Close'].iloc[i] < final_lowerband[i]:
-                trend[i] = 1
+            # Trend (0 until the bands exist, then seeded from the close against the band midpoint)
+            if trend[i-1] == 0:
+                if not math.isnan(final_upperband[i]):
+                    trend[i] = -1.0 if close[i] >= (final_upperband[i] + final_lowerband[i]) / 2 else 1.0
+            elif trend[i-1] == 1 and close[i] > final_upperband[i]:
+                trend[i] = -1.0
+            elif trend[i-1] == -1 and close[i] < final_lowerband[i]:
+                trend[i] = 1.0
             else:
                 trend[i] = trend[i-1]
 
-        df['ST_UPPER'] = final_upperband
-        df['ST_LOWER'] = final_lowerband
-        df['ST_TREND'] = trend # -1 for Up (Green), 1 for Down (Red)
+        df['ST_UPPER'] = np.array(final_upperband)
+        df['ST_LOWER'] = np.array(final_lowerband)
+        df['ST_TREND'] = np.array(trend) # -1 for Up (Green), 1 for Down (Red)
         return df
 
     def add_stochastic(self, df: pd.DataFrame, k_period=14, d_period=3) -> pd.DataFrame:
@@ -233,26 +411,36 @@ class IndicatorService:
         df['VWAP'] = np.cumsum(tp * v) / np.cumsum(v)
         return df
 
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def _gaussian_kernel(window: int, h: float) -> np.ndarray:
+        """Kernel weights for a full window; shorter (warm-up) windows use its tail."""
+        x = np.arange(window + 1)
+        return np.exp(-((window - x) ** 2) / (2 * h ** 2))
+
     def add_nadaraya_watson(self, df: pd.DataFrame, h=14, window=50, mult=2.0) -> pd.DataFrame:
         """
         Nadaraya-Watson Estimator (Gaussian Kernel) + Kernel Envelopes & LuxAlgo Signals
         """
         if len(df) < window: return df
         
-        close = df['Close'].values
+        close = df['Close'].values.astype(np.float64)
         nw_vals = np.zeros_like(close)
+        weights = self._gaussian_kernel(window, h)
         
         # 1. Calculate NW Smooth
-        for i in range(len(close)):
-            start = max(0, i - window)
-            end = i + 1
-            y = close[start:end]
-            x = np.arange(len(y))
-            current_x = x[-1]
-            
-            # Gaussian Kernel
-            weights = np.exp(-((current_x - x) ** 2) / (2 * h ** 2))
-            nw_vals[i] = np.sum(weights * y) / np.sum(weights)
+        # Warm-up bars see a truncated window
+        for i in range(min(window, len(close))):
+            w = weights[window - i:]
+            nw_vals[i] = np.sum(w * close[:i + 1]) / np.sum(w)
+
+        # Full windows: sliding-window view against the precomputed kernel (chunked to bound memory)
+        if len(close) > window:
+            views = sliding_window_view(close, window + 1)
+            w_sum = np.sum(weights)
+            for start in range(0, len(views), 8192):
+                chunk = views[start:start + 8192]
+                nw_vals[window + start:window + start + len(chunk)] = np.sum(chunk * weights, axis=1) / w_sum
             
         df['NW_SMOOTH'] = nw_vals
         
@@ -261,21 +449,22 @@ class IndicatorService:
         diff = np.abs(close - nw_vals)
         # Smooth the diff to get a dynamic envelope
         mae = pd.Series(diff).rolling(window=window).mean().values
-        df['NW_UPPER'] = nw_vals + (mae * mult)
-        df['NW_LOWER'] = nw_vals - (mae * mult)
+        upper = nw_vals + (mae * mult)
+        lower = nw_vals - (mae * mult)
+        df['NW_UPPER'] = upper
+        df['NW_LOWER'] = lower
         
         # 3. Calculate Direction (Slope)
         df['NW_DIR'] = np.where(df['NW_SMOOTH'].diff() > 0, 1, -1)
         
         # 4. Detect Signals (Price crossing or tagging envelopes)
-        df['NW_SIGNAL'] = 0
-        for i in range(1, len(df)):
-            # Buy Signal: Price crosses below Lower Envelope or local bottom below it
-            if close[i] < df['NW_LOWER'].iloc[i] and close[i-1] >= df['NW_LOWER'].iloc[i-1]:
-                df.loc[df.index[i], 'NW_SIGNAL'] = 1 # Green Triangle (Up)
-            # Sell Signal: Price crosses above Upper Envelope or local top above it
-            elif close[i] > df['NW_UPPER'].iloc[i] and close[i-1] <= df['NW_UPPER'].iloc[i-1]:
-                df.loc[df.index[i], 'NW_SIGNAL'] = -1 # Red Triangle (Down)
+        # Buy Signal: Price crosses below Lower Envelope -> Green Triangle (Up)
+        # Sell Signal: Price crosses above Upper Envelope -> Red Triangle (Down)
+        buy = np.zeros(len(close), dtype=bool)
+        sell = np.zeros(len(close), dtype=bool)
+        buy[1:] = (close[1:] < lower[1:]) & (close[:-1] >= lower[:-1])
+        sell[1:] = ~buy[1:] & (close[1:] > upper[1:]) & (close[:-1] <= upper[:-1])
+        df['NW_SIGNAL'] = np.where(buy, 1, np.where(sell, -1, 0))
 
         return df
 
@@ -293,10 +482,24 @@ class IndicatorService:
         if len(df) < period: return df
         tp = (df['High'] + df['Low'] + df['Close']) / 3
         sma_tp = tp.rolling(window=period).mean()
-        mad_tp = tp.rolling(window=period).apply(lambda x: np.abs(x - x.mean()).mean())
+        mad_tp = pd.Series(self._rolling_mad(tp.to_numpy(dtype=np.float64), period), index=df.index)
         df['CCI'] = (tp - sma_tp) / (0.015 * mad_tp)
         return df
 
+    @staticmethod
+    def _rolling_mad(values: np.ndarray, period: int) -> np.ndarray:
+        """
+        Rolling mean absolute deviation, equal to
+        rolling(period).apply(lambda x: np.abs(x - x.mean()).mean()) without a Python call per window.
+        """
+        mad = np.full(len(values), np.nan)
+        if len(values) < period:
+            return mad
+        # Contiguous rows so each window is reduced in the same order as a 1-D array
+        windows = np.ascontiguousarray(sliding_window_view(values, period))
+        mad[period - 1:] = np.abs(windows - windows.mean(axis=1, keepdims=True)).mean(axis=1)
+        return mad
+
     def add_bollinger_percent(self, df: pd.DataFrame) -> pd.DataFrame:
         if 'BB_UPPER' not in df.columns:
             df = self.add_bollinger_bands(df)
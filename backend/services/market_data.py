@@ -0,0 +1,375 @@
+"""
+Market Data Providers - single upstream interface for every service.
+
+MarketDataProvider defines what the backend needs from a market data feed:
+    history(symbol, ...)                   -> OHLCV DataFrame (yfinance layout)
+    bulk_history(symbols, ...)             -> {symbol: OHLCV DataFrame}, one batch
+    quotes(symbols)                        -> {symbol: {'price', 'previous_close'}}
+    fundamentals(symbol)                   -> info dict
+    financial_statement(symbol, name, freq)-> statement DataFrame or None
+    news(symbol)                           -> list of news dicts
+
+YFinanceProvider is the live implementation. ReplayProvider serves recorded
+or synthetic data from local files with a configurable latency, so the
+backend can be load-tested and benchmarked without network access.
+
+The process-wide provider is picked by get_provider():
+    MARKET_DATA_PROVIDER = yfinance (default) | replay
+    REPLAY_DATA_DIR      = replay root (default: backend/data/replay)
+    REPLAY_LATENCY_MS    = simulated latency per upstream call (default: 0)
+    REPLAY_ERROR_RATE    = share of calls rejected as rate limited (default: 0)
+
+Stores that persist upstream data (candles, fundamentals, screener results)
+live under provider_data_dir(provider), so replayed or synthetic data never
+mixes with the live feed's.
+"""
+
+import os
+import re
+import json
+import time
+import zlib
+import random
+import threading
+from abc import ABC, abstractmethod
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from typing import Dict, List, Optional
+
+STATEMENTS = ('income', 'balance', 'cash')
+
+
+class MarketDataProvider(ABC):
+    name = 'base'
+
+    @abstractmethod
+    def history(self, symbol: str, period: Optional[str] = None, interval: str = '1d',
+                start=None, auto_adjust: bool = True, prepost: bool = False) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def bulk_history(self, symbols: List[str], period: str = '1y', interval: str = '1d',
+                     auto_adjust: bool = True) -> Dict[str, pd.DataFrame]:
+        """History for a batch of symbols; symbols without data are left out."""
+        frames = {}
+        for sym in symbols:
+            try:
+                df = self.history(sym, period=period, interval=interval, auto_adjust=auto_adjust)
+            except Exception as e:
+                print(f"History error ({sym}): {e}")
+                continue
+            if df is not None and not df.empty:
+                frames[sym] = df
+        return frames
+
+    def quotes(self, symbols: List[str]) -> Dict[str, Dict]:
+        """
+        Latest close and previous close per symbol from one bulk_history batch
+        (5 days, so weekends and holidays still leave two bars); symbols without
+        data are left out.
+        """
+        results = {}
+        if not symbols:
+            return results
+        for sym, hist in self.bulk_history(list(symbols), period='5d', interval='1d').items():
+            quote = self._quote_from_history(hist.dropna(subset=['Close']))
+            if quote:
+                results[sym] = quote
+        return results
+
+    @abstractmethod
+    def fundamentals(self, symbol: str) -> Dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def financial_statement(self, symbol: str, statement: str, freq: str = 'quarterly') -> Optional[pd.DataFrame]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def news(self, symbol: str) -> List[Dict]:
+        raise NotImplementedError
+
+    @staticmethod
+    def _quote_from_history(hist: pd.DataFrame) -> Optional[Dict]:
+        if hist is None or hist.empty:
+            return None
+        close = float(hist['Close'].iloc[-1])
+        prev_close = float(hist['Close'].iloc[-2]) if len(hist) > 1 else close
+        return {'price': close, 'previous_close': prev_close}
+
+
+class YFinanceProvider(MarketDataProvider):
+    name = 'yfinance'
+
+    def history(self, symbol: str, period: Optional[str] = None, interval: str = '1d',
+                start=None, auto_adjust: bool = True, prepost: bool = False) -> pd.DataFrame:
+        kwargs = {'interval': interval, 'auto_adjust': auto_adjust, 'prepost': prepost}
+        if period is not None:
+            kwargs['period'] = period
+        if start is not None:
+            kwargs['start'] = start
+        return yf.Ticker(symbol).history(**kwargs)
+
+    def bulk_history(self, symbols: List[str], period: str = '1y', interval: str = '1d',
+                     auto_adjust: bool = True) -> Dict[str, pd.DataFrame]:
+        frames = {}
+        if not symbols:
+            return frames
+        data = yf.download(
+            symbols, period=period, interval=interval, auto_adjust=auto_adjust,
+            group_by='ticker', threads=True, progress=False,
+            ignore_tz=False  # keep exchange timestamps, same as Ticker.history
+        )
+        if data is None or data.empty:
+            return frames
+        multi = isinstance(data.columns, pd.MultiIndex)
+        tickers = set(data.columns.get_level_values(0)) if multi else set(symbols[:1])
+        for sym in symbols:
+            if sym not in tickers:
+                continue
+            # The panel shares one date index; drop the days this symbol did not trade
+            df = (data[sym] if multi else data).dropna(how='all')
+            if not df.empty:
+                frames[sym] = df
+        return frames
+
+    def fundamentals(self, symbol: str) -> Dict:
+        return yf.Ticker(symbol).info or {}
+
+    def financial_statement(self, symbol: str, statement: str, freq: str = 'quarterly') -> Optional[pd.DataFrame]:
+        ticker = yf.Ticker(symbol)
+        # Method 1: get_* methods (yfinance expects 'yearly' not 'annual')
+        getter = {'income': 'get_income_stmt', 'balance': 'get_balance_sheet', 'cash': 'get_cash_flow'}[statement]
+        stmt = getattr(ticker, getter)(freq=freq)
+        if stmt is not None and not stmt.empty:
+            return stmt
+        # Method 2: property access
+        prop = {'income': 'income_stmt', 'balance': 'balance_sheet', 'cash': 'cash_flow'}[statement]
+        if freq == 'quarterly':
+            prop = f'quarterly_{prop}'
+        stmt = getattr(ticker, prop, None)
+        if stmt is not None and not stmt.empty:
+            return stmt
+        return None
+
+    def news(self, symbol: str) -> List[Dict]:
+        return yf.Ticker(symbol).news or []
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Serves market data from local files:
+        <root>/<SYMBOL>/<interval>.csv          recorded OHLCV (Date index + OHLCV columns)
+        <root>/<SYMBOL>/info.json               fundamentals info dict
+        <root>/<SYMBOL>/<statement>_<freq>.csv  financial statements
+        <root>/<SYMBOL>/news.json               news list
+
+    Symbols or intervals without a recorded file get a deterministic synthetic
+    random walk (seeded by symbol + interval) of `bars` bars ending at `end`,
+    unless synthetic=False. Every call sleeps latency_ms +- jitter_ms to
+    mimic the upstream round trip. Periods are resolved against the last
+    available bar, so replays are reproducible.
+    """
+    name = 'replay'
+
+    FREQUENCIES = {
+        '1m': '1min', '2m': '2min', '5m': '5min', '15m': '15min', '30m': '30min',
+        '60m': '60min', '1h': '60min', '90m': '90min',
+        '1d': '1D', '5d': '5D', '1wk': '7D', '1mo': '30D', '3mo': '91D'
+    }
+
+    def __init__(self, root_dir: str = None, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 synthetic: bool = True, bars: int = 750, end=None, seed: int = 0, error_rate: float = 0.0):
+        if root_dir is None:
+            root_dir = os.path.join(os.path.dirname(__file__), '..', 'data', 'replay')
+        self.root_dir = root_dir
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.synthetic = synthetic
+        self.bars = bars
+        if end is not None:
+            end = pd.Timestamp(end)
+            end = end.tz_localize('UTC') if end.tz is None else end.tz_convert('UTC')
+        self.end = end
+        self.seed = seed
+        # Share of round trips rejected with a simulated "Too Many Requests" (for load tests)
+        self.error_rate = error_rate
+        self._frames: Dict[tuple, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+
+    # ---- Helpers ----
+
+    def _sleep(self):
+        if self.latency_ms <= 0 and self.jitter_ms <= 0 and self.error_rate <= 0:
+            return
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+            throttled = self.error_rate > 0 and self._rng.random() < self.error_rate
+        time.sleep(max(0.0, self.latency_ms + jitter) / 1000.0)
+        if throttled:
+            raise RuntimeError("Too Many Requests (simulated rate limit)")
+
+    def _symbol_dir(self, symbol: str) -> str:
+        # Same escaping as CandleStore so ^GSPC, TRY=X, GC=F stay filesystem-safe
+        safe = re.sub(r'[^A-Za-z0-9._-]', lambda m: f"%{ord(m.group()):02X}", symbol.upper())
+        return os.path.join(self.root_dir, safe)
+
+    def _read_json(self, symbol: str, name: str):
+        try:
+            with open(os.path.join(self._symbol_dir(symbol), name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _exchange_tz(symbol: str) -> str:
+        return 'Europe/Istanbul' if symbol.upper().endswith('.IS') else 'UTC'
+
+    def _load(self, symbol: str, interval: str) -> pd.DataFrame:
+        key = (symbol.upper(), interval)
+        with self._lock:
+            frame = self._frames.get(key)
+        if frame is not None:
+            return frame
+
+        path = os.path.join(self._symbol_dir(symbol), f"{interval}.csv")
+        if os.path.exists(path):
+            frame = pd.read_csv(path, index_col=0)
+            index = pd.to_datetime(frame.index, utc=True).tz_convert(self._exchange_tz(symbol))
+            frame.index = pd.DatetimeIndex(index, name=frame.index.name or 'Date')
+            frame = frame.sort_index()
+        elif self.synthetic:
+            frame = self._synthetic(symbol, interval)
+        else:
+            frame = pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+
+        with self._lock:
+            self._frames[key] = frame
+        return frame
+
+    def _synthetic(self, symbol: str, interval: str) -> pd.DataFrame:
+        """Deterministic geometric random walk with consistent OHLC."""
+        freq = self.FREQUENCIES.get(interval, '1D')
+        step = pd.Timedelta(freq)
+        end = self.end if self.end is not None else pd.Timestamp.now(tz='UTC')
+        end = end.floor(step if step < pd.Timedelta('1D') else '1D')
+        index = pd.date_range(end=end, periods=self.bars, freq=freq, tz='UTC')
+
+        rng = np.random.default_rng(zlib.crc32(f"{self.seed}:{symbol.upper()}:{interval}".encode()))
+        n = self.bars
+        vol = 0.02 * np.sqrt(step / pd.Timedelta('1D'))
+        start_price = float(rng.uniform(10, 500))
+        close = start_price * np.exp(np.cumsum(rng.normal(0, vol, n)))
+        open_ = np.concatenate([[start_price], close[:-1]]) * np.exp(rng.normal(0, vol / 4, n))
+        wick = np.abs(rng.normal(0, vol / 2, (2, n)))
+        high = np.maximum(open_, close) * (1 + wick[0])
+        low = np.minimum(open_, close) * (1 - wick[1])
+        volume = np.floor(rng.lognormal(13, 0.5, n))
+
+        name = 'Date' if step >= pd.Timedelta('1D') else 'Datetime'
+        return pd.DataFrame(
+            {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume},
+            index=pd.DatetimeIndex(index.tz_convert(self._exchange_tz(symbol)), name=name)
+        )
+
+    @staticmethod
+    def _slice_period(frame: pd.DataFrame, period: str) -> pd.DataFrame:
+        if frame.empty or not period or period.lower() == 'max':
+            return frame
+        period = period.lower()
+        last = frame.index[-1]
+        if period == 'ytd':
+            return frame[frame.index >= last.normalize().replace(month=1, day=1)]
+        offsets = {'d': lambda n: pd.DateOffset(days=n), 'wk': lambda n: pd.DateOffset(weeks=n),
+                   'mo': lambda n: pd.DateOffset(months=n), 'y': lambda n: pd.DateOffset(years=n)}
+        for suffix, offset in offsets.items():
+            if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+                return frame[frame.index > last - offset(int(period[:-len(suffix)]))]
+        return frame
+
+    # ---- Provider API ----
+
+    def history(self, symbol: str, period: Optional[str] = None, interval: str = '1d',
+                start=None, auto_adjust: bool = True, prepost: bool = False) -> pd.DataFrame:
+        self._sleep()
+        frame = self._load(symbol, interval)
+        if start is not None:
+            start = pd.Timestamp(start)
+            start = start.tz_localize('UTC') if start.tz is None else start
+            frame = frame[frame.index >= start]
+        else:
+            frame = self._slice_period(frame, period or '1mo')
+        return frame.copy()
+
+    def bulk_history(self, symbols: List[str], period: str = '1y', interval: str = '1d',
+                     auto_adjust: bool = True) -> Dict[str, pd.DataFrame]:
+        # One simulated round trip for the whole batch
+        self._sleep()
+        frames = {}
+        for sym in symbols:
+            df = self._slice_period(self._load(sym, interval), period)
+            if not df.empty:
+                frames[sym] = df.copy()
+        return frames
+
+    def fundamentals(self, symbol: str) -> Dict:
+        self._sleep()
+        info = self._read_json(symbol, 'info.json')
+        return info if isinstance(info, dict) else {'symbol': symbol, 'longName': symbol}
+
+    def financial_statement(self, symbol: str, statement: str, freq: str = 'quarterly') -> Optional[pd.DataFrame]:
+        self._sleep()
+        path = os.path.join(self._symbol_dir(symbol), f"{statement}_{freq}.csv")
+        if not os.path.exists(path):
+            return None
+        return pd.read_csv(path, index_col=0)
+
+    def news(self, symbol: str) -> List[Dict]:
+        self._sleep()
+        news = self._read_json(symbol, 'news.json')
+        return news if isinstance(news, list) else []
+
+    # ---- Recording ----
+
+    def save_history(self, symbol: str, interval: str, frame: pd.DataFrame):
+        """Records an OHLCV frame (e.g. from YFinanceProvider.history) for later replay."""
+        sym_dir = self._symbol_dir(symbol)
+        os.makedirs(sym_dir, exist_ok=True)
+        frame[['Open', 'High', 'Low', 'Close', 'Volume']].to_csv(os.path.join(sym_dir, f"{interval}.csv"))
+        with self._lock:
+            self._frames.pop((symbol.upper(), interval), None)
+
+
+def provider_data_dir(provider: MarketDataProvider) -> str:
+    """backend/data/providers/<provider.name>: root of the stores holding this provider's data."""
+    path = os.path.join(os.path.dirname(__file__), '..', 'data', 'providers', provider.name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+_provider: Optional[MarketDataProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_provider() -> MarketDataProvider:
+    """Returns the process-wide provider, created from the environment on first use."""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            if os.environ.get('MARKET_DATA_PROVIDER', 'yfinance').lower() == 'replay':
+                _provider = ReplayProvider(
+                    root_dir=os.environ.get('REPLAY_DATA_DIR') or None,
+                    latency_ms=float(os.environ.get('REPLAY_LATENCY_MS', 0)),
+                    error_rate=float(os.environ.get('REPLAY_ERROR_RATE', 0))
+                )
+            else:
+                _provider = YFinanceProvider()
+        return _provider
+
+
+def set_provider(provider: MarketDataProvider):
+    """Replaces the process-wide provider (used by benchmarks and load tests)."""
+    global _provider
+    with _provider_lock:
+        _provider = provider
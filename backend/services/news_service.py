@@ -1,12 +1,13 @@
-import yfinance as yf
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 import time
+from .market_data import MarketDataProvider, get_provider
 
 class NewsService:
-    def __init__(self, cache_duration_minutes: int = 30):
+    def __init__(self, cache_duration_minutes: int = 30, provider: MarketDataProvider = None):
         self.cache_duration = cache_duration_minutes
+        self.provider = provider or get_provider()
         self._cache = {} # {symbol: (timestamp, news_list)}
         self._general_cache = None # (timestamp, news_list) for general market news
 
@@ -65,8 +66,7 @@ class NewsService:
 
     def _fetch_yfinance_news(self, symbol: str) -> list:
         try:
-            ticker = yf.Ticker(symbol)
-            news = ticker.news
+            news = self.provider.news(symbol)
             results = []
             for n in news:
                 results.append({
@@ -8,18 +8,24 @@ Formulas:
 import sqlite3
 import json
 import os
-import yfinance as yf
 from datetime import datetime
 from typing import List, Dict, Optional
+from .market_data import MarketDataProvider, get_provider
+from .quote_service import QuoteService, get_quote_service
 
 
 class PortfolioService:
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, provider: MarketDataProvider = None,
+                 quote_service: QuoteService = None):
         if db_path is None:
             db_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
             os.makedirs(db_dir, exist_ok=True)
             db_path = os.path.join(db_dir, 'portfolio.db')
         self.db_path = db_path
+        self.provider = provider or get_provider()
+        if quote_service is None:
+            quote_service = get_quote_service() if provider is None else QuoteService(self.provider)
+        self.quotes = quote_service
         self._init_db()
 
     def _init_db(self):
@@ -194,19 +200,5 @@ class PortfolioService:
         }
 
     def _fetch_current_prices(self, symbols: List[str]) -> Dict[str, float]:
-        """Batch fetch latest prices using yfinance."""
-        prices = {}
-        try:
-            tickers = yf.Tickers(' '.join(symbols))
-            for sym in symbols:
-                try:
-                    ticker = tickers.tickers.get(sym)
-                    if ticker:
-                        hist = ticker.history(period='1d')
-                        if not hist.empty:
-                            prices[sym] = float(hist['Close'].iloc[-1])
-                except Exception:
-                    pass
-        except Exception:
-            pass
-        return prices
+        """Latest prices from the shared quote table."""
+        return self.quotes.get_prices(symbols)
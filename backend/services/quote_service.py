@@ -0,0 +1,160 @@
+"""
+Quote Service - shared short-TTL last price / previous close table.
+
+Watchlist, portfolio, alerts and the index bar all read quotes from one
+QuoteService. A read marks its symbols as watched; anything older than
+`ttl` seconds is refreshed together with every other stale watched symbol in
+bulk batches (one provider.quotes call per `batch_size` symbols, through the
+shared FetchScheduler's interactive lane). A symbol being refreshed is marked
+in flight, so concurrent requests from several dashboards wait for that one
+refresh instead of each going upstream; no lock is held during the fetch.
+Symbols nobody asked for in `watch_ttl` seconds stop being refreshed.
+"""
+
+import time
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from .market_data import MarketDataProvider, get_provider
+from .fetch_scheduler import FetchScheduler, get_scheduler
+
+
+class QuoteService:
+    def __init__(self, provider: MarketDataProvider = None, scheduler: FetchScheduler = None,
+                 ttl: float = 15.0, batch_size: int = 100, watch_ttl: float = 600.0):
+        self.provider = provider or get_provider()
+        self.scheduler = scheduler or get_scheduler()
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.watch_ttl = watch_ttl
+
+        self._quotes: Dict[str, Dict] = {}   # {symbol: {'price', 'previous_close', 'fetched_at'}}
+        self._watched: Dict[str, float] = {}  # {symbol: last requested at}
+        self._misses: Dict[str, float] = {}   # {symbol: last refresh that returned nothing}
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, threading.Event] = {}  # {symbol: set when its refresh finishes}
+        self._stats = {'requests': 0, 'hits': 0, 'refreshes': 0, 'refreshed_symbols': 0, 'errors': 0}
+
+    # ---- Public API ----
+
+    def get_quotes(self, symbols: Iterable[str]) -> Dict[str, Dict]:
+        """
+        {symbol: {'price', 'previous_close', 'change', 'percent', 'fetched_at'}} for the
+        requested symbols, at most `ttl` seconds old. Symbols without data are left out.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        now = time.time()
+        with self._lock:
+            self._stats['requests'] += 1
+            for sym in symbols:
+                self._watched[sym] = now
+            stale = self._stale(symbols, now)
+            if not stale:
+                self._stats['hits'] += 1
+
+        if stale:
+            self._refresh(stale)
+
+        with self._lock:
+            return {sym: self._snapshot(self._quotes[sym]) for sym in symbols if sym in self._quotes}
+
+    def get_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        return {sym: quote['price'] for sym, quote in self.get_quotes(symbols).items()}
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, 'symbols': len(self._quotes), 'watched': len(self._watched)}
+
+    def clear(self):
+        with self._lock:
+            self._quotes = {}
+            self._misses = {}
+
+    # ---- Refresh ----
+
+    def _stale(self, symbols: Iterable[str], now: float) -> List[str]:
+        stale = []
+        for sym in symbols:
+            fetched_at = self._quotes[sym]['fetched_at'] if sym in self._quotes else self._misses.get(sym)
+            if fetched_at is None or now - fetched_at >= self.ttl:
+                stale.append(sym)
+        return stale
+
+    def _refresh(self, symbols: List[str]):
+        now = time.time()
+        done = threading.Event()
+        with self._lock:
+            # Another request may have refreshed them in the meantime
+            needed = self._stale(symbols, now)
+            if not needed:
+                return
+            # Symbols already being refreshed are waited for, not fetched again
+            waits = {self._inflight[sym] for sym in needed if sym in self._inflight}
+            # Bring every stale watched symbol along so one cycle serves all dashboards
+            self._watched = {sym: t for sym, t in self._watched.items() if now - t < self.watch_ttl}
+            batch = [sym for sym in dict.fromkeys(needed + self._stale(self._watched, now))
+                     if sym not in self._inflight]
+            for sym in batch:
+                self._inflight[sym] = done
+            if batch:
+                self._stats['refreshes'] += 1
+
+        try:
+            for i in range(0, len(batch), self.batch_size):
+                self._fetch(batch[i:i + self.batch_size])
+        finally:
+            with self._lock:
+                for sym in batch:
+                    if self._inflight.get(sym) is done:
+                        del self._inflight[sym]
+            done.set()
+        for event in waits:
+            event.wait()
+
+    def _fetch(self, chunk: List[str]):
+        try:
+            quotes = self.scheduler.run_batch(self.provider.quotes, chunk, interactive=True)
+        except Exception as e:
+            print(f"Quote refresh error ({chunk[0]}..{chunk[-1]}): {e}")
+            with self._lock:
+                self._stats['errors'] += 1
+            return
+        fetched_at = time.time()
+        with self._lock:
+            # Symbols without data are not asked for again until the TTL passes
+            for sym in chunk:
+                if sym not in quotes:
+                    self._misses[sym] = fetched_at
+            for sym, quote in quotes.items():
+                self._misses.pop(sym, None)
+                self._quotes[sym] = {
+                    'price': quote['price'],
+                    'previous_close': quote['previous_close'],
+                    'fetched_at': fetched_at
+                }
+            self._stats['refreshed_symbols'] += len(quotes)
+
+    @staticmethod
+    def _snapshot(quote: Dict) -> Dict:
+        price, prev_close = quote['price'], quote['previous_close']
+        change = price - prev_close
+        return {
+            'price': price,
+            'previous_close': prev_close,
+            'change': change,
+            'percent': (change / prev_close * 100) if prev_close else 0.0,
+            'fetched_at': quote['fetched_at']
+        }
+
+
+_quote_service: Optional[QuoteService] = None
+_quote_service_lock = threading.Lock()
+
+
+def get_quote_service() -> QuoteService:
+    """Returns the process-wide quote table."""
+    global _quote_service
+    with _quote_service_lock:
+        if _quote_service is None:
+            _quote_service = QuoteService()
+        return _quote_service
@@ -0,0 +1,171 @@
+"""
+Quote Stream - server push of live quote deltas and triggered alerts.
+
+One background refresher serves every connected client: each cycle it reads
+the union of subscribed symbols (plus symbols with active alerts) from the
+shared QuoteService, keeps only the symbols whose price changed since the
+last broadcast, checks alerts against those, and fans the result out to the
+subscriber queues. Each client receives the deltas for its own symbols and
+every triggered alert. Upstream and SQLite load therefore depends on the
+number of symbols, not on clients x poll rate. The refresher thread starts
+with the first subscriber and stops when the last one leaves.
+
+Subscribers are async generators on the event loop (one asyncio.Queue each),
+so open streams hold no threadpool worker while they wait.
+"""
+
+import asyncio
+import threading
+from typing import AsyncIterator, Dict, Iterable, Optional, Set
+
+from .quote_service import QuoteService
+
+
+class QuoteStream:
+    def __init__(self, quote_service: QuoteService, alert_service=None, interval: float = 5.0, bar_alerts=None):
+        self.quotes = quote_service
+        self.alert_service = alert_service
+        self.bar_alerts = bar_alerts  # optional BarAlertFeed for indicator alerts
+        self.interval = interval
+
+        # {listener: {symbol: price last sent to that listener (None before the snapshot)}}
+        self._subscribers: Dict[asyncio.Queue, Dict[str, Optional[float]]] = {}
+        self._loops: Dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+        self._last_sent: Dict[str, float] = {}  # {symbol: last broadcast price}
+        self._seen_alerts: Set[int] = set()      # active alert ids already checked once
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {'cycles': 0, 'deltas': 0, 'alerts': 0}
+
+    # ---- Public API ----
+
+    async def stream(self, symbols: Iterable[str], heartbeat: float = 15.0) -> AsyncIterator[tuple]:
+        """
+        Yields ('quotes', {symbol: quote}) with a full snapshot first and then only
+        changed symbols, ('alerts', [triggered alerts]) and ('ping', {}) when idle.
+        """
+        symbols = {s.upper() for s in symbols if s}
+        listener = self._subscribe(symbols, asyncio.get_running_loop())
+        try:
+            # The snapshot may wait on an upstream refresh: keep it off the event loop
+            quotes = await asyncio.to_thread(self.quotes.get_quotes, symbols)
+            with self._lock:
+                sent = self._subscribers[listener]
+                for sym, quote in quotes.items():
+                    sent[sym] = quote['price']
+            yield 'quotes', {sym: self._format(q) for sym, q in quotes.items()}
+            while True:
+                try:
+                    yield await asyncio.wait_for(listener.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield 'ping', {}
+        finally:
+            self._unsubscribe(listener)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, 'subscribers': len(self._subscribers),
+                    'symbols': len(set().union(*self._subscribers.values()))}
+
+    # ---- Subscribers ----
+
+    def _subscribe(self, symbols: Set[str], loop: asyncio.AbstractEventLoop) -> asyncio.Queue:
+        listener = asyncio.Queue()
+        with self._lock:
+            self._subscribers[listener] = dict.fromkeys(symbols)
+            self._loops[listener] = loop
+            if self._thread is None or not self._thread.is_alive():
+                self._wake.clear()
+                self._thread = threading.Thread(target=self._run, daemon=True, name='quote-stream')
+                self._thread.start()
+        return listener
+
+    def _unsubscribe(self, listener: asyncio.Queue):
+        with self._lock:
+            self._subscribers.pop(listener, None)
+            self._loops.pop(listener, None)
+            if not self._subscribers:
+                self._wake.set()
+
+    # ---- Refresher ----
+
+    def _run(self):
+        while not self._wake.wait(self.interval):
+            with self._lock:
+                if not self._subscribers:
+                    break
+                listeners = list(self._subscribers)
+            try:
+                self._cycle(listeners)
+            except Exception as e:
+                print(f"Quote stream error: {e}")
+        with self._lock:
+            self._thread = None
+            if self._subscribers:
+                # Someone subscribed while the refresher was stopping
+                self._wake.clear()
+                self._thread = threading.Thread(target=self._run, daemon=True, name='quote-stream')
+                self._thread.start()
+
+    def _cycle(self, listeners):
+        with self._lock:
+            symbols = set().union(*(self._subscribers.get(l, {}) for l in listeners))
+        alerts = self.alert_service.get_alerts(active_only=True) if self.alert_service is not None else []
+        symbols |= {a['symbol'] for a in alerts}
+        quotes = self.quotes.get_quotes(symbols)
+
+        deltas = {}
+        with self._lock:
+            for sym, quote in quotes.items():
+                if self._last_sent.get(sym) != quote['price']:
+                    self._last_sent[sym] = quote['price']
+                    deltas[sym] = quote
+            self._stats['cycles'] += 1
+            self._stats['deltas'] += len(deltas)
+
+        # Alerts only need checking for changed prices, plus symbols of newly added alerts
+        fresh = {a['symbol'] for a in alerts if a['id'] not in self._seen_alerts}
+        self._seen_alerts = {a['id'] for a in alerts}
+        check = {sym: quotes[sym]['price'] for sym in set(deltas) | fresh if sym in quotes}
+        triggered = []
+        if check:
+            triggered = self.alert_service.check_alerts(check) if self.alert_service is not None else []
+            if self.bar_alerts is not None:
+                triggered += self.bar_alerts.check(check)
+            with self._lock:
+                self._stats['alerts'] += len(triggered)
+        if not deltas and not triggered:
+            return
+
+        for listener in listeners:
+            with self._lock:
+                sent = self._subscribers.get(listener)
+                loop = self._loops.get(listener)
+                if sent is None:
+                    continue
+                # Compare against what this listener already has (its snapshot may be newer)
+                mine = {sym: q for sym, q in deltas.items() if sym in sent and sent[sym] != q['price']}
+                for sym, quote in mine.items():
+                    sent[sym] = quote['price']
+            if mine:
+                self._put(loop, listener, ('quotes', {sym: self._format(q) for sym, q in mine.items()}))
+            if triggered:
+                self._put(loop, listener, ('alerts', triggered))
+
+    @staticmethod
+    def _put(loop: asyncio.AbstractEventLoop, listener: asyncio.Queue, event: tuple):
+        # asyncio queues are not thread-safe: hand the event to the subscriber's loop
+        try:
+            loop.call_soon_threadsafe(listener.put_nowait, event)
+        except RuntimeError:
+            pass  # loop closed; the subscriber is going away
+
+    @staticmethod
+    def _format(quote: Dict) -> Dict:
+        # Same shape as /watchlist/data rows
+        return {
+            "price": round(quote['price'], 2),
+            "change": round(quote['change'], 2),
+            "percent": round(quote['percent'], 2)
+        }
@@ -0,0 +1,156 @@
+"""
+Screen Expressions - user-defined screener filters compiled to NumPy masks.
+
+A screen is a boolean expression over the screener's indicator panel, e.g.
+
+    RSI < 30 and CLOSE > MA200 and VOL > 1.5 * VOL_AVG20
+
+Supported: field names (case-insensitive, see FIELDS / ALIASES), numbers,
++ - * /, unary minus, comparisons (chained ones such as 30 < RSI < 50 too),
+and / or / not (also AND / OR / NOT) and parentheses. The text is parsed
+with Python's `ast` module and only the node types above are accepted, then
+turned into a tree of closures evaluated column-wise over the whole panel.
+Missing indicator values are NaN, so any comparison against them is False.
+"""
+
+import ast
+import re
+import hashlib
+import operator
+import numpy as np
+from typing import Callable, Dict
+
+# Panel columns (one value per symbol, last bar unless prefixed PREV_)
+FIELDS = {
+    'CLOSE': 'Last close',
+    'OPEN': 'Last open',
+    'HIGH': 'Last high',
+    'LOW': 'Last low',
+    'VOL': 'Last volume',
+    'PREV_CLOSE': 'Previous close',
+    'CHANGE': 'Daily change (%)',
+    'RSI': 'RSI 14',
+    'PREV_RSI': 'Previous RSI 14',
+    'MA20': '20-day simple moving average',
+    'MA50': '50-day simple moving average',
+    'MA200': '200-day simple moving average',
+    'PREV_MA50': 'Previous MA50',
+    'PREV_MA200': 'Previous MA200',
+    'VOL_AVG20': '20-day average volume',
+    'SCORE': 'Screener score (0-100)',
+}
+ALIASES = {'PRICE': 'CLOSE', 'VOLUME': 'VOL', 'EMA50': 'MA50', 'EMA200': 'MA200'}
+
+MAX_LENGTH = 500
+
+_COMPARE = {
+    ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt,
+    ast.GtE: operator.ge, ast.Eq: operator.eq, ast.NotEq: operator.ne,
+}
+_ARITHMETIC = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+_KEYWORDS = re.compile(r'\b(AND|OR|NOT)\b')
+
+
+def normalize(text: str) -> str:
+    """Canonical form used as the cache key (keywords lower-case, single spaces)."""
+    text = _KEYWORDS.sub(lambda m: m.group(1).lower(), text.strip())
+    return ' '.join(text.split())
+
+
+def expression_hash(text: str) -> str:
+    return hashlib.sha1(normalize(text).encode('utf-8')).hexdigest()[:16]
+
+
+def compile_expression(text: str) -> Callable[[Dict[str, np.ndarray]], np.ndarray]:
+    """
+    Compiles a screen into fn(columns) -> boolean mask over the panel rows.
+    Raises ValueError with a readable message for invalid expressions.
+    """
+    if not text or not text.strip():
+        raise ValueError("Empty screen expression")
+    if len(text) > MAX_LENGTH:
+        raise ValueError(f"Screen expression longer than {MAX_LENGTH} characters")
+    try:
+        tree = ast.parse(normalize(text), mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Invalid screen expression: {e.msg}")
+
+    fn = _compile(tree.body)
+
+    def evaluate(columns: Dict[str, np.ndarray]) -> np.ndarray:
+        rows = len(next(iter(columns.values()))) if columns else 0
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            mask = fn(columns)
+        if np.ndim(mask) == 0:
+            mask = np.full(rows, bool(mask))
+        if np.asarray(mask).dtype != bool:
+            raise ValueError("Screen expression must be a condition (e.g. RSI < 30)")
+        return np.asarray(mask)
+
+    return evaluate
+
+
+def _compile(node: ast.AST) -> Callable:
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile(v) for v in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        def bool_op(cols):
+            mask = _as_bool(parts[0](cols))
+            for part in parts[1:]:
+                mask = combine(mask, _as_bool(part(cols)))
+            return mask
+        return bool_op
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile(node.operand)
+        if isinstance(node.op, ast.Not):
+            return lambda cols: np.logical_not(_as_bool(operand(cols)))
+        if isinstance(node.op, ast.USub):
+            return lambda cols: -operand(cols)
+        if isinstance(node.op, ast.UAdd):
+            return operand
+
+    if isinstance(node, ast.Compare):
+        terms = [_compile(node.left)] + [_compile(c) for c in node.comparators]
+        ops = []
+        for op in node.ops:
+            if type(op) not in _COMPARE:
+                raise ValueError(f"Unsupported comparison: {type(op).__name__}")
+            ops.append(_COMPARE[type(op)])
+        def compare(cols):
+            values = [t(cols) for t in terms]
+            mask = ops[0](values[0], values[1])
+            for i in range(1, len(ops)):
+                mask = np.logical_and(mask, ops[i](values[i], values[i + 1]))
+            return mask
+        return compare
+
+    if isinstance(node, ast.BinOp):
+        if type(node.op) not in _ARITHMETIC:
+            raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
+        fn, left, right = _ARITHMETIC[type(node.op)], _compile(node.left), _compile(node.right)
+        return lambda cols: fn(left(cols), right(cols))
+
+    if isinstance(node, ast.Name):
+        name = node.id.upper()
+        name = ALIASES.get(name, name)
+        if name not in FIELDS:
+            raise ValueError(f"Unknown field: {node.id} (available: {', '.join(FIELDS)})")
+        return lambda cols: cols[name]
+
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        # NumPy scalars, so constant-only arithmetic (1/0) follows the array rules: inf / nan, no exception
+        try:
+            value = np.float64(node.value)
+        except OverflowError:
+            raise ValueError("Number out of range in screen expression")
+        return lambda cols: value
+
+    raise ValueError(f"Unsupported syntax in screen expression: {type(node).__name__}")
+
+
+def _as_bool(values) -> np.ndarray:
+    values = np.asarray(values)
+    if values.dtype != bool:
+        raise ValueError("and / or / not need conditions on both sides (e.g. RSI < 30 and CLOSE > MA200)")
+    return values
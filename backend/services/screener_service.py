@@ -1,16 +1,44 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
+import os
+import json
 import time
+import queue
 import threading
-from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 from .indicator_service import IndicatorService
+from .market_data import MarketDataProvider, get_provider, provider_data_dir
+from .fetch_scheduler import FetchScheduler, get_scheduler
+from .candle_store import CandleStore, frame_to_candles, period_start_ts
+from .screen_expression import compile_expression, expression_hash
+
+# Smallest bulk period that covers the gap since a symbol's last stored bar
+TAIL_PERIODS = [(4, '5d'), (28, '1mo'), (88, '3mo'), (178, '6mo')]
+# Bars per symbol in the scoring panel: MA200 on the last two bars needs 201
+PANEL_BARS = 201
+# Shorter histories are skipped (the full indicator batch used to fail on them)
+MIN_BARS = 20
+# Compiled screen expressions (and their results for the current scan) kept in memory
+MAX_SCREENS = 64
 
 class ScreenerService:
-    def __init__(self, indicator_service: IndicatorService):
+    def __init__(self, indicator_service: IndicatorService, provider: MarketDataProvider = None,
+                 chunk_size: int = 50, scheduler: FetchScheduler = None,
+                 candle_store: CandleStore = None, cooldown_seconds: int = 60, state_path: str = None):
         self.indicator_service = indicator_service
+        self.provider = provider or get_provider()
+        # Symbols per bulk history request; how many run at once is up to the shared scheduler
+        self.chunk_size = chunk_size
+        self.scheduler = scheduler or get_scheduler()
+        self.cooldown_seconds = cooldown_seconds
+        # Daily history persists between scans (shared with DataService); rescans only fetch the tail
+        self._store = candle_store or CandleStore(os.path.join(provider_data_dir(self.provider), 'candles'))
+        if state_path is None:
+            state_path = os.path.join(provider_data_dir(self.provider), 'screener_results.json')
+        self.state_path = state_path
         self._cache = {
             'last_run': None,
             'results': [],
@@ -18,6 +46,13 @@ class ScreenerService:
             'progress': 0
         }
         self._lock = threading.Lock()
+        # Indicator panel of the last scan: {'results': [...], 'columns': {FIELD: array}}, rows in results order
+        self._panel = None
+        self._screens = OrderedDict()  # {expression hash: {'fn', 'panel', 'results'}}
+        # Live scan subscribers (one queue per stream) and the results published so far in this scan
+        self._listeners: List[queue.Queue] = []
+        self._partial: List[Dict] = []
+        self._load_state()
         
         self.bist_100_symbols = []
         self._fetch_bist100_symbols()
@@ -104,9 +139,11 @@ class ScreenerService:
                 'count': len(self._cache['results'])
             }
 
-    def get_results(self, filter_type: Optional[str] = None) -> List[Dict]:
+    def get_results(self, filter_type: Optional[str] = None, expression: Optional[str] = None) -> List[Dict]:
+        """Latest results, optionally narrowed by a screen expression and / or a preset filter."""
+        screened = self.run_screen(expression) if expression else None
         with self._lock:
-            results = self._cache['results']
+            results = self._cache['results'] if screened is None else screened
             if not filter_type:
                 return results
             
@@ -117,166 +154,433 @@ class ScreenerService:
                 return [r for r in results if r.get('price_above_ema200')]
             return results
 
+    def run_screen(self, expression: str) -> List[Dict]:
+        """
+        Evaluates a screen expression (see screen_expression) against the last scan's
+        indicator panel. Compiled expressions and their results are cached by
+        expression hash until the next scan. Raises ValueError for invalid input.
+        """
+        key = expression_hash(expression)
+        panel = self._get_panel()
+        with self._lock:
+            entry = self._screens.get(key)
+            if entry is not None:
+                self._screens.move_to_end(key)
+                if entry['panel'] is panel:
+                    return entry['results']
+
+        fn = entry['fn'] if entry is not None else compile_expression(expression)
+        if panel is None:
+            results = []
+        else:
+            mask = fn(panel['columns'])
+            results = [r for r, keep in zip(panel['results'], mask) if keep]
+
+        with self._lock:
+            self._screens[key] = {'fn': fn, 'panel': panel, 'results': results}
+            self._screens.move_to_end(key)
+            while len(self._screens) > MAX_SCREENS:
+                self._screens.popitem(last=False)
+        return results
+
+    def _get_panel(self) -> Optional[Dict]:
+        with self._lock:
+            panel = self._panel
+            symbols = [r['symbol'] for r in self._cache['results']]
+        if panel is not None or not symbols:
+            return panel
+        # Results restored from disk: rebuild the panel from the stored history once
+        results, columns = self._screen_panel(symbols)
+        panel = self._sorted_panel(results, columns)
+        with self._lock:
+            if self._panel is None:
+                self._panel = panel
+            return self._panel
+
     def start_background_scan(self):
         """Triggers a non-blocking background scan if not already running."""
         with self._lock:
             if self._cache['status'] == 'running':
                 return
             
-            # If cache is valid (20 mins), don't rerun unless forced
-            if self._cache['last_run'] and datetime.now() - self._cache['last_run'] < timedelta(minutes=20):
+            # Rescans are incremental, so the cool-down only guards against back-to-back runs
+            if self._cache['last_run'] and datetime.now() - self._cache['last_run'] < timedelta(seconds=self.cooldown_seconds):
                 return
 
+            # Mark running before the thread starts so concurrent starts and streams see it
+            self._cache['status'] = 'running'
+            self._cache['progress'] = 0
+            self._partial = []
+
         # Start thread
         thread = threading.Thread(target=self._run_scan)
         thread.daemon = True
         thread.start()
 
+    def stream_scan(self, start: bool = False, heartbeat: float = 1.0) -> Iterator[tuple]:
+        """
+        Yields ('result', result) for every symbol as soon as its chunk is scored,
+        ('progress', status) after each chunk and every `heartbeat` seconds, and a
+        final ('done', status). Results already published in the running scan are
+        replayed first; when no scan is running the latest results are replayed.
+        """
+        listener = queue.Queue()
+        with self._lock:
+            backlog = list(self._partial) if self._cache['status'] == 'running' else None
+            self._listeners.append(listener)
+        try:
+            if backlog is None and start:
+                self.start_background_scan()
+                with self._lock:
+                    if self._cache['status'] == 'running':
+                        backlog = list(self._partial)
+            if backlog is None:
+                for result in self.get_results():
+                    yield 'result', result
+                yield 'done', self.get_status()
+                return
+
+            # The backlog may overlap with queued events; skip symbols already sent
+            sent = set()
+            for result in backlog:
+                sent.add(result['symbol'])
+                yield 'result', result
+            yield 'progress', self.get_status()
+            while True:
+                try:
+                    event, data = listener.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield 'progress', self.get_status()
+                    continue
+                if event == 'result':
+                    if data['symbol'] in sent:
+                        continue
+                    sent.add(data['symbol'])
+                yield event, data
+                if event == 'done':
+                    return
+        finally:
+            with self._lock:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+
+    def _publish(self, event: str, data) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener.put((event, data))
+
     def _run_scan(self):
         with self._lock:
             self._cache['status'] = 'running'
             self._cache['progress'] = 0
-            self._cache['results'] = []
+            self._partial = []
 
-        total = len(self.bist_100_symbols)
-        results = []
-        
-        # Parallel Execution
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            future_to_symbol = {executor.submit(self._analyze_symbol, sym): sym for sym in self.bist_100_symbols}
-            
-            for i, future in enumerate(future_to_symbol):
-                sym = future_to_symbol[future]
+        symbols = list(dict.fromkeys(self.bist_100_symbols))
+        total = len(symbols)
+        done = 0
+        parts = []
+
+        # Bulk download per (period, chunk): full history for new symbols, just the tail for known ones
+        tasks = []
+        for period, group in self._plan_refresh(symbols).items():
+            tasks += [(group[i:i + self.chunk_size], period) for i in range(0, len(group), self.chunk_size)]
+
+        with ThreadPoolExecutor(max_workers=self.scheduler.max_concurrency) as fetcher:
+            futures = {fetcher.submit(self._refresh_chunk, chunk, period): chunk for chunk, period in tasks}
+            # Completion order: a chunk is scored (one vectorized pass) and published as soon as it lands
+            for future in as_completed(futures):
+                chunk = futures[future]
                 try:
-                    res = future.result()
-                    if res:
-                        results.append(res)
+                    future.result()
                 except Exception as e:
-                    print(f"[SCREENER] Error analyzing {sym}: {e}")
-                
-                # Update progress
+                    print(f"[SCREENER] Chunk refresh error: {e}")
+                results, columns = self._screen_panel(chunk)
+                parts.append((results, columns))
+                done += len(chunk)
+
                 with self._lock:
-                    self._cache['progress'] = int(((i + 1) / total) * 100)
+                    self._partial.extend(results)
+                    self._cache['progress'] = min(int((done / total) * 100), 99)
+                for result in results:
+                    self._publish('result', result)
+                self._publish('progress', self.get_status())
 
-        # Sort by Score descending
-        results.sort(key=lambda x: x.get('score', 0), reverse=True)
+        results = [r for part, _ in parts for r in part]
+        names = sorted({name for _, columns in parts for name in columns})
+        columns = {
+            name: np.concatenate([c[name] for _, c in parts if name in c]) for name in names
+        }
+        panel = self._sorted_panel(results, columns)
 
         with self._lock:
-            self._cache['results'] = results
+            self._cache['results'] = panel['results']
+            self._panel = panel
             self._cache['last_run'] = datetime.now()
             self._cache['status'] = 'idle'
             self._cache['progress'] = 100
+            self._partial = []
+        self._save_state()
+        self._publish('done', self.get_status())
+
+    def _plan_refresh(self, symbols: List[str]) -> Dict[str, List[str]]:
+        """Groups symbols by the bulk period needed to bring their stored history up to date."""
+        year_start = period_start_ts("1y")
+        now = time.time()
+        plan = {}
+        for sym in symbols:
+            meta = self._store.get_meta(sym, "1d")
+            period = "1y"
+            covered = meta is not None and meta.get('last_ts') is not None and (
+                meta.get('complete') or (meta.get('covered_from') is not None and meta['covered_from'] <= year_start)
+            )
+            if covered:
+                gap_days = (now - meta['last_ts']) / 86400
+                period = next((p for limit, p in TAIL_PERIODS if gap_days <= limit), "1y")
+            plan.setdefault(period, []).append(sym)
+        return plan
+
+    def _refresh_chunk(self, chunk: List[str], period: str) -> List[str]:
+        """Fetches a chunk in bulk, merges it into the CandleStore and returns the chunk."""
+        if period == "1y":
+            frames = self._fetch_chunk(chunk)
+        else:
+            try:
+                frames = self.scheduler.run_batch(self.provider.bulk_history, chunk, period=period,
+                                                  interval="1d", auto_adjust=False)
+            except Exception as e:
+                print(f"[SCREENER] Tail refresh failed for {chunk[0]}..{chunk[-1]}: {e}")
+                frames = {}
 
-    def _analyze_symbol(self, symbol: str) -> Optional[Dict]:
+        for sym, df in frames.items():
+            if df is None or df.empty:
+                continue
+            try:
+                covered_from = period_start_ts("2y" if period == "1y" and len(df) > 260 else period)
+                self._store.merge(sym, "1d", frame_to_candles(df), covered_from=covered_from)
+            except Exception as e:
+                print(f"[SCREENER] Store error for {sym}: {e}")
+        return chunk
+
+    def _fetch_chunk(self, chunk: List[str]) -> Dict[str, pd.DataFrame]:
+        """1y daily history for a chunk of symbols, with a bulk 2y retry for short histories."""
+        frames = {sym: pd.DataFrame() for sym in chunk}
         try:
-            ticker = yf.Ticker(symbol)
-            # Fetch last 1y data
-            df = ticker.history(period="1y", interval="1d", auto_adjust=False)
-            
-            if df.empty or len(df) < 50:
-                df = ticker.history(period="2y", interval="1d", auto_adjust=False)
-                if df.empty: return None
-
-            records = df.reset_index().to_dict(orient='records')
-            for r in records:
-                if 'Date' not in r and 'index' in r: r['Date'] = r['index']
-                elif 'Date' not in r and 'Datetime' in r: r['Date'] = r['Datetime']
-            
-            analyzed = self.indicator_service.add_indicators(records)
-            if not analyzed: return None
-            
-            last = analyzed[-1]
-            prev = analyzed[-2] if len(analyzed) > 1 else last
-            
-            close = float(last.get('Close', 0))
-            rsi = float(last.get('RSI', 50))
-            prev_rsi = float(prev.get('RSI', 50))
-            ema200 = float(last.get('MA200', 0))
-            ema50 = float(last.get('MA50', 0))
-            prev_close = float(prev.get('Close', 0))
-            prev_ema200 = float(prev.get('MA200', 0))
-            prev_ema50 = float(prev.get('MA50', 0))
-            
-            score = 0
-            signals = []
-            
-            # ═══════════════════════════════════════════
-            # RSI-Based Signals (Most Important)
-            # ═══════════════════════════════════════════
-            
-            # 🔵 AŞIRI SATIM (Oversold) - RSI < 30
-            if rsi < 30:
-                score += 40
-                signals.append({"type": "oversold", "label": "AŞIRI SATIM", "color": "blue"})
-                # Extra: Dip Dönüşü - RSI was oversold and starting to recover
-                if rsi > prev_rsi:
-                    score += 20
-                    signals.append({"type": "dip_donus", "label": "DİP DÖNÜŞÜ", "color": "orange"})
-            
-            # 🟡 TOPLANMA BÖLGESİ - RSI 30-40
-            elif rsi < 40:
-                score += 20
-                signals.append({"type": "accumulation", "label": "TOPLANMA", "color": "blue"})
-                if rsi > prev_rsi:
-                    score += 10
-                    signals.append({"type": "rsi_rising", "label": "RSI YUKARI", "color": "orange"})
-            
-            # ⚪ NÖTR BÖLGE - RSI 40-60
-            elif rsi < 60:
-                score += 5
-                # No signal - neutral zone
-            
-            # 🟢 GÜÇLÜ MOMENTUM - RSI 60-70
-            elif rsi < 70:
-                score += 10
-                signals.append({"type": "momentum", "label": "GÜÇLÜ MOMENTUM", "color": "green"})
-            
-            # 🔴 AŞIRI ALIM (Overbought) - RSI > 70
-            else:
-                score += 5
-                signals.append({"type": "overbought", "label": "AŞIRI ALIM", "color": "red"})
-                if rsi > 80:
-                    signals.append({"type": "extreme_overbought", "label": "TEHLİKE BÖLGESİ", "color": "red"})
-            
-            # ═══════════════════════════════════════════
-            # EMA-Based Signals
-            # ═══════════════════════════════════════════
-            
-            # 🚀 EMA 200 Kırılımı (Price just crossed above EMA200)
-            if ema200 > 0 and close > ema200 and prev_close <= prev_ema200:
-                score += 35
-                signals.append({"type": "ema_cross", "label": "EMA 200 KIRILIMI", "color": "gold"})
-            
-            # 📈 Fiyat EMA200 Üstünde (Bullish Trend)
-            elif ema200 > 0 and close > ema200:
-                score += 10
-            
-            # 📉 Fiyat EMA200 Altında (Bearish Territory)
-            elif ema200 > 0 and close < ema200:
-                score += 0  # No bonus for bearish
-            
-            # ⭐ Golden Cross (EMA50 crosses above EMA200)
-            if ema50 > 0 and ema200 > 0 and ema50 > ema200 and prev_ema50 <= prev_ema200:
-                score += 30
-                signals.append({"type": "golden_cross", "label": "GOLDEN CROSS", "color": "green"})
-            
-            # 💀 Death Cross (EMA50 crosses below EMA200)
-            if ema50 > 0 and ema200 > 0 and ema50 < ema200 and prev_ema50 >= prev_ema200:
-                score -= 10
-                signals.append({"type": "death_cross", "label": "DEATH CROSS", "color": "red"})
+            frames.update(self.scheduler.run_batch(self.provider.bulk_history, chunk, period="1y",
+                                                   interval="1d", auto_adjust=False))
+            short = [sym for sym, df in frames.items() if df.empty or len(df) < 50]
+            if short:
+                frames.update(self.scheduler.run(self.provider.bulk_history, short, period="2y",
+                                                 interval="1d", auto_adjust=False, symbols=short))
+        except Exception as e:
+            print(f"[SCREENER] Bulk history failed for {chunk[0]}..{chunk[-1]}: {e}")
+        return frames
 
-            return {
+    def _screen_panel(self, symbols: List[str]) -> tuple:
+        """
+        Stacks the stored history of all symbols into one panel and scores them together.
+        Returns (results, columns) where columns holds the screen fields per result row.
+        """
+        names, tails = [], []
+        for sym in symbols:
+            try:
+                candles = self._store.read(sym, "1d", bars=PANEL_BARS)
+            except Exception as e:
+                print(f"[SCREENER] Store read error for {sym}: {e}")
+                continue
+            if candles is None or not candles.shape[1]:
+                continue
+            names.append(sym)
+            tails.append(candles)
+        if not names:
+            return [], {}
+        close, lengths = self._stack_panel([t[4] for t in tails])
+        results = self._score_panel(names, close, lengths)
+
+        keep = lengths >= MIN_BARS
+        volume, _ = self._stack_panel([t[5] for t in tails])
+        columns = {name: values[keep] for name, values in self._panel_columns(tails, close, volume, lengths).items()}
+        columns['SCORE'] = np.array([r['score'] for r in results], dtype=float)
+        return results, columns
+
+    @staticmethod
+    def _sorted_panel(results: List[Dict], columns: Dict[str, np.ndarray]) -> Dict:
+        """Sorts by score descending (symbol breaks ties) and keeps the columns in the same row order."""
+        order = sorted(range(len(results)), key=lambda i: (-results[i].get('score', 0), results[i].get('symbol', '')))
+        return {
+            'results': [results[i] for i in order],
+            'columns': {name: values[order] for name, values in columns.items()}
+        }
+
+    # ---- Persistence ----
+
+    def _load_state(self):
+        """Restores the last scan results so a restart does not start from an empty screener."""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            self._cache['results'] = saved.get('results', [])
+            if saved.get('last_run'):
+                self._cache['last_run'] = datetime.fromisoformat(saved['last_run'])
+        except (OSError, ValueError):
+            pass
+
+    def _save_state(self):
+        with self._lock:
+            saved = {
+                'last_run': self._cache['last_run'].isoformat() if self._cache['last_run'] else None,
+                'results': self._cache['results']
+            }
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            tmp_path = self.state_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(saved, f, ensure_ascii=False)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            print(f"[SCREENER] Could not save results: {e}")
+
+    # ---- Vectorized scoring ----
+
+    @staticmethod
+    def _stack_panel(closes: List[np.ndarray]) -> tuple:
+        """
+        Right-aligns each symbol's last PANEL_BARS closes in a (symbols, PANEL_BARS)
+        array padded with NaN on the left. Rows are aligned by bar position, not by
+        date: every indicator is computed over a symbol's own bars, as before.
+        """
+        panel = np.full((len(closes), PANEL_BARS), np.nan)
+        lengths = np.zeros(len(closes), dtype=np.int64)
+        for i, close in enumerate(closes):
+            if len(close):
+                panel[i, -len(close):] = close
+            lengths[i] = len(close)
+        return panel, lengths
+
+    @staticmethod
+    def _finite(values: np.ndarray) -> np.ndarray:
+        # Same as IndicatorService._to_records: NaN / inf become 0
+        return np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0)
+
+    @classmethod
+    def _panel_sma(cls, panel: np.ndarray, lengths: np.ndarray, period: int) -> tuple:
+        """MA<period> at the last and previous bar; 0 where the history is shorter than the period."""
+        last = panel[:, -period:].mean(axis=1)
+        prev = panel[:, -period - 1:-1].mean(axis=1)
+        has = lengths >= period
+        return np.where(has, cls._finite(last), 0.0), np.where(has, cls._finite(prev), 0.0)
+
+    @classmethod
+    def _panel_rsi(cls, panel: np.ndarray, lengths: np.ndarray, period: int = 14) -> tuple:
+        """
+        Simple-average RSI at the last and previous bar; 50 where the history has fewer
+        than period + 1 bars. NaN deltas (including the padding) count as 0 gain / loss.
+        """
+        delta = np.diff(panel[:, -period - 2:], axis=1)
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            last = 100 - (100 / (1 + gain[:, 1:].mean(axis=1) / loss[:, 1:].mean(axis=1)))
+            prev = 100 - (100 / (1 + gain[:, :-1].mean(axis=1) / loss[:, :-1].mean(axis=1)))
+        has = lengths >= period + 1
+        return np.where(has, cls._finite(last), 50.0), np.where(has, cls._finite(prev), 50.0)
+
+    @classmethod
+    def _panel_columns(cls, tails: List[np.ndarray], close: np.ndarray, volume: np.ndarray,
+                       lengths: np.ndarray) -> Dict[str, np.ndarray]:
+        """Screen fields for the last bar of every row; unavailable values are NaN."""
+        def last(row: int) -> np.ndarray:
+            return np.array([t[row, -1] for t in tails], dtype=float)
+
+        def sma(panel: np.ndarray, period: int, offset: int = 0) -> np.ndarray:
+            end = panel.shape[1] - offset
+            values = panel[:, end - period:end].mean(axis=1)
+            return np.where(lengths >= period + offset, values, np.nan)
+
+        rsi, prev_rsi = cls._panel_rsi(close, lengths)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = (close[:, -1] / close[:, -2] - 1) * 100
+        return {
+            'CLOSE': close[:, -1],
+            'OPEN': last(1),
+            'HIGH': last(2),
+            'LOW': last(3),
+            'VOL': volume[:, -1],
+            'PREV_CLOSE': close[:, -2],
+            'CHANGE': np.where(np.isfinite(change), change, np.nan),
+            'RSI': rsi,
+            'PREV_RSI': prev_rsi,
+            'MA20': sma(close, 20),
+            'MA50': sma(close, 50),
+            'MA200': sma(close, 200),
+            'PREV_MA50': sma(close, 50, 1),
+            'PREV_MA200': sma(close, 200, 1),
+            'VOL_AVG20': sma(volume, 20),
+        }
+
+    @classmethod
+    def _score_panel(cls, symbols: List[str], panel: np.ndarray, lengths: np.ndarray) -> List[Dict]:
+        """Evaluates the screener rules for every row of the panel as array masks."""
+        close = cls._finite(panel[:, -1])
+        prev_close = cls._finite(panel[:, -2])
+        rsi, prev_rsi = cls._panel_rsi(panel, lengths)
+        ema200, prev_ema200 = cls._panel_sma(panel, lengths, 200)
+        ema50, prev_ema50 = cls._panel_sma(panel, lengths, 50)
+
+        # ═══════════════════════════════════════════
+        # RSI-Based Signals (Most Important)
+        # ═══════════════════════════════════════════
+        rsi_rising = rsi > prev_rsi
+        oversold = rsi < 30                          # 🔵 AŞIRI SATIM
+        accumulation = (rsi >= 30) & (rsi < 40)      # 🟡 TOPLANMA BÖLGESİ
+        neutral = (rsi >= 40) & (rsi < 60)           # ⚪ NÖTR BÖLGE
+        momentum = (rsi >= 60) & (rsi < 70)          # 🟢 GÜÇLÜ MOMENTUM
+        overbought = rsi >= 70                       # 🔴 AŞIRI ALIM
+
+        # ═══════════════════════════════════════════
+        # EMA-Based Signals
+        # ═══════════════════════════════════════════
+        has_ema200 = ema200 > 0
+        above_ema200 = has_ema200 & (close > ema200)
+        ema_cross = above_ema200 & (prev_close <= prev_ema200)     # 🚀 EMA 200 Kırılımı
+        both = (ema50 > 0) & has_ema200
+        golden = both & (ema50 > ema200) & (prev_ema50 <= prev_ema200)  # ⭐ Golden Cross
+        death = both & (ema50 < ema200) & (prev_ema50 >= prev_ema200)   # 💀 Death Cross
+
+        score = (40 * oversold + 20 * (oversold & rsi_rising)
+                 + 20 * accumulation + 10 * (accumulation & rsi_rising)
+                 + 5 * neutral + 10 * momentum + 5 * overbought
+                 + 35 * ema_cross + 10 * (above_ema200 & ~ema_cross)
+                 + 30 * golden - 10 * death)
+        score = np.clip(score, 0, 100)
+
+        rules = [
+            (oversold, {"type": "oversold", "label": "AŞIRI SATIM", "color": "blue"}),
+            (oversold & rsi_rising, {"type": "dip_donus", "label": "DİP DÖNÜŞÜ", "color": "orange"}),
+            (accumulation, {"type": "accumulation", "label": "TOPLANMA", "color": "blue"}),
+            (accumulation & rsi_rising, {"type": "rsi_rising", "label": "RSI YUKARI", "color": "orange"}),
+            (momentum, {"type": "momentum", "label": "GÜÇLÜ MOMENTUM", "color": "green"}),
+            (overbought, {"type": "overbought", "label": "AŞIRI ALIM", "color": "red"}),
+            (rsi > 80, {"type": "extreme_overbought", "label": "TEHLİKE BÖLGESİ", "color": "red"}),
+            (ema_cross, {"type": "ema_cross", "label": "EMA 200 KIRILIMI", "color": "gold"}),
+            (golden, {"type": "golden_cross", "label": "GOLDEN CROSS", "color": "green"}),
+            (death, {"type": "death_cross", "label": "DEATH CROSS", "color": "red"}),
+        ]
+        hits = np.column_stack([mask for mask, _ in rules])
+
+        results = []
+        for i, symbol in enumerate(symbols):
+            if lengths[i] < MIN_BARS:
+                continue
+            results.append({
                 'symbol': symbol,
                 'name': symbol.replace('.IS', ''),
-                'price': round(close, 2),
+                'price': round(float(close[i]), 2),
                 'change': 0,
-                'rsi': round(rsi, 2),
-                'ema200': round(ema200, 2),
-                'score': max(min(score, 100), 0),
-                'signals': signals,
-                'price_above_ema200': close > ema200 if ema200 > 0 else False
-            }
-
-        except Exception as e:
-            # print(f"Error {symbol}: {e}")
-            return None
+                'rsi': round(float(rsi[i]), 2),
+                'ema200': round(float(ema200[i]), 2),
+                'score': int(score[i]),
+                'signals': [dict(rules[j][1]) for j in np.flatnonzero(hits[i])],
+                'price_above_ema200': bool(above_ema200[i])
+            })
+        return results
@@ -0,0 +1,137 @@
+"""
+Serialization helpers for chart payloads.
+
+Columnar (struct-of-arrays) layout: one list per field instead of one dict
+per bar, built straight from NumPy arrays. Missing / non-finite values are
+sent as null.
+
+Binary transports (Arrow IPC stream, MessagePack) encode the same columns
+from their NumPy buffers without a JSON step. pyarrow and msgpack are
+optional; a media type is only offered when its package is installed.
+"""
+
+import json
+import numpy as np
+import pandas as pd
+from typing import Dict, Union
+
+
+def to_json_columns(columns: Union[pd.DataFrame, Dict[str, np.ndarray]]) -> Dict[str, list]:
+    """Converts a frame or a dict of arrays into JSON-ready column lists."""
+    result = {}
+    for name in columns.keys():
+        values = columns[name]
+        values = values.to_numpy() if isinstance(values, pd.Series) else np.asarray(values)
+        if values.dtype.kind == 'f':
+            finite = np.isfinite(values)
+            if not finite.all():
+                values = values.astype(object)
+                values[~finite] = None
+        result[name] = values.tolist()
+    return result
+
+
+# ---- Binary transports (optional dependencies) ----
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+MSGPACK = 'application/msgpack'
+JSON = 'application/json'
+
+_MEDIA_ALIASES = {'application/x-msgpack': MSGPACK, 'application/vnd.msgpack': MSGPACK}
+
+
+def available_media_types() -> list:
+    types = [JSON]
+    if pa is not None:
+        types.append(ARROW_STREAM)
+    if msgpack is not None:
+        types.append(MSGPACK)
+    return types
+
+
+def negotiate(accept: str) -> str:
+    """
+    Picks the response media type from an Accept header. Returns JSON when the
+    header is empty or only asks for JSON / */*, the best supported binary type
+    otherwise, and None if the client exclusively asks for something unavailable.
+    """
+    if not accept:
+        return JSON
+    candidates = []
+    for order, part in enumerate(accept.split(',')):
+        media, *params = [p.strip() for p in part.split(';')]
+        media = _MEDIA_ALIASES.get(media.lower(), media.lower())
+        q = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            candidates.append((-q, order, media))
+
+    supported = available_media_types()
+    for _, _, media in sorted(candidates):
+        if media in supported:
+            return media
+        if media in ('*/*', 'application/*'):
+            return JSON
+    return None
+
+
+def _payload_meta(result: Dict) -> Dict:
+    return {k: v for k, v in result.items() if k != 'price_data'}
+
+
+def encode_arrow(result: Dict) -> bytes:
+    """
+    Arrow IPC stream: price_data columns become the record batch (zero-copy
+    from NumPy for numeric columns); the remaining response fields travel as
+    JSON in the schema metadata under b'meta'.
+    """
+    columns = result.get('price_data') or {}
+    table = pa.table({name: pa.array(values) for name, values in columns.items()})
+    meta = json.dumps(_payload_meta(result), default=str, allow_nan=False).encode('utf-8')
+    table = table.replace_schema_metadata({b'meta': meta})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_msgpack(result: Dict) -> bytes:
+    """
+    MessagePack: numeric price_data columns are packed as raw little-endian
+    buffers ({'dtype': '<f8', 'data': <bin>}), string columns as plain arrays.
+    NaN is kept as NaN inside float buffers.
+    """
+    packed = {}
+    for name, values in (result.get('price_data') or {}).items():
+        values = np.asarray(values)
+        if values.dtype.kind in 'fiub':
+            values = values.astype(values.dtype.newbyteorder('<'), copy=False)
+            packed[name] = {'dtype': values.dtype.str, 'data': values.tobytes()}
+        else:
+            packed[name] = values.tolist()
+    payload = _payload_meta(result)
+    payload['price_data'] = packed
+    return msgpack.packb(payload, default=str, use_bin_type=True)
+
+
+def encode(result: Dict, media_type: str) -> bytes:
+    if media_type == ARROW_STREAM:
+        return encode_arrow(result)
+    if media_type == MSGPACK:
+        return encode_msgpack(result)
+    raise ValueError(f"Unsupported media type: {media_type}")
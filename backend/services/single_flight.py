@@ -0,0 +1,73 @@
+"""
+Single Flight - coalesces concurrent identical upstream calls.
+
+FastAPI runs sync routes in a threadpool, so several requests for the same
+symbol can reach yfinance at the same time. SingleFlight.do() lets the first
+caller for a key run the function while later callers for the same key block
+until it finishes and receive the same result (or exception). Nothing is
+cached once the call completes; that is the job of the caches behind it.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def do(self, key: Hashable, fn: Callable, *args, dataset: str = 'default', **kwargs) -> Any:
+        """
+        Runs fn(*args, **kwargs) once per in-flight key. `dataset` only labels
+        the counters (e.g. 'history', 'fundamental', 'news').
+        """
+        with self._lock:
+            stats = self._stats.setdefault(dataset, {'calls': 0, 'executed': 0, 'coalesced': 0, 'errors': 0})
+            stats['calls'] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                stats['coalesced'] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                stats['executed'] += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            with self._lock:
+                stats['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def get_stats(self) -> Dict:
+        """Per-dataset counters plus the number of calls currently in flight."""
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'datasets': {name: dict(stats) for name, stats in self._stats.items()}
+            }
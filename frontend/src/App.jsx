@@ -11,6 +11,7 @@ import ScreenerView from './views/ScreenerView';
 import PortfolioView from './views/PortfolioView';
 import BacktestView from './views/BacktestView';
 import SymbolSearchModal from './components/SymbolSearchModal';
+import { ALERT_CONDITIONS } from './components/SetAlertModal';
 import { Activity, Search, RefreshCw, Settings, BarChart2, PieChart, Briefcase, Plus, History } from 'lucide-react';
 import './App.css';
 
@@ -21,6 +22,7 @@ function App() {
   const period = 'max';
   const [data, setData] = useState({ price: [], indicators: {} });
   const [fundamental, setFundamental] = useState(null);
+  const [fundamentalLoading, setFundamentalLoading] = useState(false);
   const [indices, setIndices] = useState([]);
   const [availableSymbols, setAvailableSymbols] = useState({ bist_100: [], forex: [], commodities: [], crypto: [] });
   const [loading, setLoading] = useState(false);
@@ -48,9 +50,23 @@ function App() {
         targetSymbol = `${targetSymbol}.IS`;
       }
 
+      // Side panels load on their own so the chart never waits for them
+      const loadSection = (section, apply) => axios
+        .get(`http://localhost:8000/api/stock/${targetSymbol}/${section}`, { signal: controller.signal })
+        .then(res => { if (!controller.signal.aborted) apply(res.data[section]); })
+        .catch(err => {
+          if (!axios.isCancel(err) && err.name !== 'AbortError') console.error(`Error fetching ${section}:`, err);
+        });
+
+      setFundamentalLoading(true);
+      loadSection('fundamental', setFundamental).finally(() => {
+        if (!controller.signal.aborted) setFundamentalLoading(false);
+      });
+      loadSection('correlation', correlation => setData(prev => ({ ...prev, correlation })));
+
       console.log(`Fetching data for ${targetSymbol} (${period}/${timeframe})...`);
       const response = await axios.get(
-        `http://localhost:8000/api/stock/${targetSymbol}?period=${period}&interval=${timeframe}`,
+        `http://localhost:8000/api/stock/${targetSymbol}?period=${period}&interval=${timeframe}&sections=none`,
         { signal: controller.signal }
       );
 
@@ -151,12 +167,11 @@ function App() {
           indicatorsData[key].sort((a, b) => (typeof a.time === 'number' ? a.time - b.time : new Date(a.time) - new Date(b.time)));
         });
 
-        setData({
+        setData(prev => ({
+          ...prev, // correlation arrives separately
           price: uniquePriceData,
-          indicators: indicatorsData,
-          correlation: response.data.correlation // Store correlation data
-        });
-        setFundamental(response.data.fundamental);
+          indicators: indicatorsData
+        }));
       }
     } catch (error) {
       if (axios.isCancel(error) || error.name === 'AbortError') return; // Cancelled, ignore
@@ -197,8 +212,12 @@ function App() {
     const handlePriceAlert = (e) => {
       const triggered = e.detail;
       triggered.forEach(alert => {
-        const title = `🔔 Fiyat Alarmı: ${alert.symbol}`;
-        const body = `${alert.symbol} fiyatı ${alert.target_price} ₺ ${alert.condition === 'ABOVE' ? 'üzerine çıktı' : 'altına indi'}!`;
+        const spec = ALERT_CONDITIONS[alert.condition];
+        const isPrice = alert.condition === 'ABOVE' || alert.condition === 'BELOW';
+        const title = `🔔 ${isPrice ? 'Fiyat Alarmı' : 'İndikatör Alarmı'}: ${alert.symbol}`;
+        const body = isPrice
+          ? `${alert.symbol} fiyatı ${alert.target_price} ₺ ${alert.condition === 'ABOVE' ? 'üzerine çıktı' : 'altına indi'}!`
+          : `${alert.symbol}: ${spec ? spec.label : alert.condition}${spec?.param ? ` (${alert.target_price})` : ''} · ${alert.triggered_price} ₺`;
 
         // Browser Notification
         if (Notification.permission === 'granted') {
@@ -367,7 +386,7 @@ function App() {
               <div style={{ flex: '1', overflowY: 'auto' }}>
                 {sidebarTab === 'analysis' ? (
                   <div style={{ padding: '16px' }}>
-                    <FundamentalPanel data={fundamental} symbol={symbol} loading={loading} />
+                    <FundamentalPanel data={fundamental} symbol={symbol} loading={fundamentalLoading} />
                     <div style={{ marginTop: '16px' }}>
                       <CorrelationCard data={data.correlation} />
                     </div>
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import axios from 'axios';
 import { Bell, Trash2, CheckCircle, Clock, TrendingUp, TrendingDown, X } from 'lucide-react';
+import { ALERT_CONDITIONS } from './SetAlertModal';
 
 const API = 'http://localhost:8000/api';
 
@@ -54,10 +55,13 @@ const AlertsPanel = ({ onRefresh }) => {
                 {alerts.length === 0 ? (
                     <div style={styles.empty}>Henüz alarm kurulmadı.</div>
                 ) : (
-                    alerts.map((alert) => (
+                    alerts.map((alert) => {
+                        const spec = ALERT_CONDITIONS[alert.condition] || { label: alert.condition, up: true };
+                        const isPrice = alert.condition === 'ABOVE' || alert.condition === 'BELOW';
+                        return (
                         <div key={alert.id} style={{
                             ...styles.item,
-                            borderLeft: `3px solid ${alert.is_triggered ? '#787b86' : (alert.condition === 'ABOVE' ? '#00c853' : '#ff5252')}`
+                            borderLeft: `3px solid ${alert.is_triggered ? '#787b86' : (spec.up ? '#00c853' : '#ff5252')}`
                         }}>
                             <div style={styles.itemMain}>
                                 <div style={styles.symbolRow}>
@@ -65,9 +69,10 @@ const AlertsPanel = ({ onRefresh }) => {
                                     {alert.is_triggered ? (
                                         <span style={styles.triggeredBadge}>Tetiklendi</span>
                                     ) : (
-                                        <span style={alert.condition === 'ABOVE' ? styles.condAbove : styles.condBelow}>
-                                            {alert.condition === 'ABOVE' ? <TrendingUp size={10} /> : <TrendingDown size={10} />}
-                                            {alert.target_price.toLocaleString()}
+                                        <span style={spec.up ? styles.condAbove : styles.condBelow}>
+                                            {spec.up ? <TrendingUp size={10} /> : <TrendingDown size={10} />}
+                                            {isPrice ? alert.target_price.toLocaleString()
+                                                : `${spec.label}${spec.param ? ` ${alert.target_price}` : ''}`}
                                         </span>
                                     )}
                                 </div>
@@ -80,7 +85,8 @@ const AlertsPanel = ({ onRefresh }) => {
                                 <Trash2 size={14} />
                             </button>
                         </div>
-                    ))
+                        );
+                    })
                 )}
             </div>
         </div>
@@ -4,15 +4,35 @@ import { Bell, X, AlertTriangle } from 'lucide-react';
 
 const API = 'http://localhost:8000/api';
 
+// Alert conditions supported by the backend (ABOVE / BELOW plus indicator conditions).
+// `param` labels the target_price field where the condition takes a parameter.
+export const ALERT_CONDITIONS = {
+    ABOVE: { label: 'Fiyat Üzerine Çıkınca', up: true },
+    BELOW: { label: 'Fiyat Altına İnince', up: false },
+    RSI_CROSS_ABOVE: { label: 'RSI Yukarı Keserse', param: 'RSI Seviyesi', defaultValue: 70, up: true },
+    RSI_CROSS_BELOW: { label: 'RSI Aşağı Keserse', param: 'RSI Seviyesi', defaultValue: 30, up: false },
+    CLOSE_ABOVE_MA200: { label: 'Kapanış MA200 Üzerinde', up: true },
+    CLOSE_BELOW_MA200: { label: 'Kapanış MA200 Altında', up: false },
+    ST_FLIP_UP: { label: 'SuperTrend Yükselişe Dönerse', up: true },
+    ST_FLIP_DOWN: { label: 'SuperTrend Düşüşe Dönerse', up: false },
+    PCT_UP: { label: 'Günlük Yükseliş (%)', param: 'Yüzde (%)', defaultValue: 5, up: true },
+    PCT_DOWN: { label: 'Günlük Düşüş (%)', param: 'Yüzde (%)', defaultValue: 5, up: false },
+    VOLUME_SPIKE: { label: 'Hacim Patlaması', param: '20 Günlük Ort. Hacmin Katı', defaultValue: 2, up: true },
+    NW_BUY: { label: 'NW Al Sinyali', up: true },
+    NW_SELL: { label: 'NW Sat Sinyali', up: false },
+};
+
 const SetAlertModal = ({ isOpen, onClose, symbol, currentPrice }) => {
     const [targetPrice, setTargetPrice] = useState('');
     const [condition, setCondition] = useState('ABOVE');
+    const [kind, setKind] = useState('PRICE'); // 'PRICE' or an indicator condition
     const [loading, setLoading] = useState(false);
     const [error, setError] = useState(null);
 
     useEffect(() => {
         if (isOpen) {
             setTargetPrice(currentPrice ? currentPrice.toString() : '');
+            setKind('PRICE');
             setError(null);
         }
     }, [isOpen, currentPrice]);
@@ -20,11 +40,24 @@ const SetAlertModal = ({ isOpen, onClose, symbol, currentPrice }) => {
     // Auto-update condition based on target price vs current price
     useEffect(() => {
         const target = parseFloat(targetPrice);
-        if (!isNaN(target) && currentPrice) {
+        if (kind === 'PRICE' && !isNaN(target) && currentPrice) {
             if (target > currentPrice) setCondition('ABOVE');
             else setCondition('BELOW');
         }
-    }, [targetPrice, currentPrice]);
+    }, [targetPrice, currentPrice, kind]);
+
+    const changeKind = (value) => {
+        setKind(value);
+        if (value === 'PRICE') {
+            setTargetPrice(currentPrice ? currentPrice.toString() : '');
+        } else {
+            setCondition(value);
+            setTargetPrice(String(ALERT_CONDITIONS[value].defaultValue ?? 0));
+        }
+    };
+
+    const spec = ALERT_CONDITIONS[kind === 'PRICE' ? condition : kind];
+    const showTarget = kind === 'PRICE' || spec.param;
 
     const handleSubmit = async (e) => {
         e.preventDefault();
@@ -34,8 +67,8 @@ const SetAlertModal = ({ isOpen, onClose, symbol, currentPrice }) => {
         try {
             await axios.post(`${API}/alerts`, {
                 symbol: symbol,
-                target_price: parseFloat(targetPrice),
-                condition: condition
+                target_price: parseFloat(targetPrice) || 0,
+                condition: kind === 'PRICE' ? condition : kind
             });
             window.dispatchEvent(new CustomEvent('alertsUpdated'));
             onClose();
@@ -66,14 +99,24 @@ const SetAlertModal = ({ isOpen, onClose, symbol, currentPrice }) => {
                 <div style={styles.header}>
                     <div style={{ display: 'flex', alignItems: 'center', gap: '8px' }}>
                         <Bell size={18} color="var(--accent)" />
-                        <h3 style={styles.title}>Fiyat Alarmı Kur: {symbol}</h3>
+                        <h3 style={styles.title}>Alarm Kur: {symbol}</h3>
                     </div>
                     <button style={styles.closeBtn} onClick={onClose}><X size={20} /></button>
                 </div>
 
                 <form onSubmit={handleSubmit} style={styles.form}>
                     <div style={styles.inputGroup}>
-                        <label style={styles.label}>Hedef Fiyat (₺)</label>
+                        <label style={styles.label}>Alarm Türü</label>
+                        <select value={kind} onChange={(e) => changeKind(e.target.value)} style={styles.select}>
+                            <option value="PRICE">Fiyat</option>
+                            {Object.entries(ALERT_CONDITIONS)
+                                .filter(([key]) => key !== 'ABOVE' && key !== 'BELOW')
+                                .map(([key, c]) => <option key={key} value={key}>{c.label}</option>)}
+                        </select>
+                    </div>
+
+                    {showTarget && <div style={styles.inputGroup}>
+                        <label style={styles.label}>{kind === 'PRICE' ? 'Hedef Fiyat (₺)' : spec.param}</label>
                         <input
                             type="number"
                             step="0.01"
@@ -86,11 +129,13 @@ const SetAlertModal = ({ isOpen, onClose, symbol, currentPrice }) => {
                         <div style={styles.currentPriceHint}>
                             Şu anki fiyat: {currentPrice?.toLocaleString()} ₺
                         </div>
-                    </div>
+                    </div>}
 
                     <div style={styles.conditionDisplay}>
-                        Koşul: <span style={condition === 'ABOVE' ? styles.condAbove : styles.condBelow}>
-                            Fiyat {targetPrice} ₺ {condition === 'ABOVE' ? 'Üzerine Çıkınca' : 'Altına İnince'}
+                        Koşul: <span style={spec.up ? styles.condAbove : styles.condBelow}>
+                            {kind === 'PRICE'
+                                ? `Fiyat ${targetPrice} ₺ ${condition === 'ABOVE' ? 'Üzerine Çıkınca' : 'Altına İnince'}`
+                                : `${spec.label}${spec.param ? ` (${targetPrice})` : ''}`}
                         </span>
                     </div>
 
@@ -177,6 +222,16 @@ const styles = {
         outline: 'none',
         boxSizing: 'border-box'
     },
+    select: {
+        width: '100%',
+        background: '#131722',
+        border: '1px solid #30363d',
+        color: 'white',
+        padding: '10px',
+        borderRadius: '8px',
+        fontSize: '0.9rem',
+        outline: 'none'
+    },
     currentPriceHint: {
         fontSize: '0.7rem',
         color: '#787b86',
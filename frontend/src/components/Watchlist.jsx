@@ -11,6 +11,24 @@ const Watchlist = ({ onSelectSymbol }) => {
     const [selectedAlertSymbol, setSelectedAlertSymbol] = useState(null);
     const prevPricesRef = useRef({});
 
+    const streamRef = useRef(null);
+
+    // Merges {symbol: {price, change, percent}} into the list and sets flash classes
+    const applyQuotes = (quotes) => {
+        setList(prevList => prevList.map(item => {
+            const quote = quotes[item.symbol];
+            if (!quote) return item;
+            const prev = prevPricesRef.current[item.symbol];
+            let flashClass = '';
+            if (prev !== undefined) {
+                if (quote.price > prev) flashClass = 'flash-up';
+                else if (quote.price < prev) flashClass = 'flash-down';
+            }
+            prevPricesRef.current[item.symbol] = quote.price;
+            return { ...item, ...quote, flashClass };
+        }));
+    };
+
     const fetchWatchlist = async () => {
         try {
             const res = await axios.get(`${API}/watchlist/data`);
@@ -21,34 +39,45 @@ const Watchlist = ({ onSelectSymbol }) => {
                 window.dispatchEvent(new CustomEvent('alertsUpdated'));
             }
 
-            setList(prevList => {
-                return watchlist.map(item => {
-                    const prev = prevPricesRef.current[item.symbol];
-                    let flashClass = '';
-                    if (prev !== undefined) {
-                        if (item.price > prev) flashClass = 'flash-up';
-                        else if (item.price < prev) flashClass = 'flash-down';
-                    }
-                    prevPricesRef.current[item.symbol] = item.price;
-                    return { ...item, flashClass };
-                });
-            });
+            watchlist.forEach(item => { prevPricesRef.current[item.symbol] = item.price; });
+            setList(watchlist.map(item => ({ ...item, flashClass: '' })));
             setLoading(false);
         } catch (err) {
             console.error("Watchlist fetch error:", err);
         }
     };
 
+    // Live prices: the server pushes only changed symbols and triggered alerts (no polling)
+    const openStream = () => {
+        if (streamRef.current) streamRef.current.close();
+        const source = new EventSource(`${API}/quotes/stream`);
+        source.addEventListener('quotes', (e) => applyQuotes(JSON.parse(e.data)));
+        source.addEventListener('alerts', (e) => {
+            const triggered = JSON.parse(e.data);
+            if (triggered.length > 0) {
+                window.dispatchEvent(new CustomEvent('priceAlertTriggered', { detail: triggered }));
+                window.dispatchEvent(new CustomEvent('alertsUpdated'));
+            }
+        });
+        streamRef.current = source;
+    };
+
     useEffect(() => {
-        fetchWatchlist();
-        const interval = setInterval(fetchWatchlist, 10000); // Poll every 10s
+        // A fetch that resolves after cleanup (unmount, StrictMode remount) must not open a stream nobody closes
+        let cancelled = false;
+        const reload = () => fetchWatchlist().then(() => {
+            if (!cancelled) openStream();
+        });
+        reload();
 
-        const handleUpdate = () => fetchWatchlist();
-        window.addEventListener('watchlistUpdated', handleUpdate);
+        // Symbol list changed: reload the rows and resubscribe with the new set
+        window.addEventListener('watchlistUpdated', reload);
 
         return () => {
-            clearInterval(interval);
-            window.removeEventListener('watchlistUpdated', handleUpdate);
+            cancelled = true;
+            if (streamRef.current) streamRef.current.close();
+            streamRef.current = null;
+            window.removeEventListener('watchlistUpdated', reload);
         };
     }, []);
 
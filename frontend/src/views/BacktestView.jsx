@@ -48,7 +48,7 @@ const BacktestView = ({ symbol, onOpenSearch, onSelectSymbol }) => {
         const period = 'max';
 
         try {
-            const resp = await axios.get(`http://localhost:8000/api/stock/${sym}?period=${period}&interval=${inv}&indicators=true`);
+            const resp = await axios.get(`http://localhost:8000/api/stock/${sym}?period=${period}&interval=${inv}&indicators=true&sections=none`);
             const priceData = resp.data.price_data || resp.data.price || [];
             if (priceData.length === 0) return;
 
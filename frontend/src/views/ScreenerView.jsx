@@ -7,16 +7,16 @@ const ScreenerView = ({ onSelectSymbol }) => {
     const [results, setResults] = useState([]);
     const [loading, setLoading] = useState(false);
     const [error, setError] = useState(null);
-    const pollIntervalRef = useRef(null);
+    const [expression, setExpression] = useState('');
+    const expressionRef = useRef('');
+    const streamRef = useRef(null);
 
     const fetchStatus = async () => {
         try {
             const response = await axios.get('http://localhost:8000/api/screener/status');
             setStatus(response.data);
-            if (response.data.status === 'idle' && response.data.progress === 100) {
-                stopPolling();
-                fetchResults();
-            }
+            // A scan is already running: follow it live
+            if (response.data.status === 'running') openStream(false);
         } catch (err) {
             console.error('Status fetch error:', err);
         }
@@ -25,48 +25,75 @@ const ScreenerView = ({ onSelectSymbol }) => {
     const fetchResults = async () => {
         setLoading(true);
         try {
-            const response = await axios.get('http://localhost:8000/api/screener/results');
+            const expr = expressionRef.current.trim();
+            const response = await axios.get('http://localhost:8000/api/screener/results', {
+                params: expr ? { expr } : {}
+            });
             setResults(response.data);
+            setError(null);
             setLoading(false);
         } catch (err) {
-            setError('Sonuçlar alınamadı.');
+            // 400: invalid screen expression
+            setError(err.response?.status === 400 ? `Geçersiz filtre: ${err.response.data.detail}` : 'Sonuçlar alınamadı.');
             setLoading(false);
         }
     };
 
-    const startScan = async () => {
-        try {
-            setError(null);
-            await axios.get('http://localhost:8000/api/screener/start');
-            setStatus({ status: 'running', progress: 0 });
-            startPolling();
-        } catch (err) {
-            setError('Tarama başlatılamadı.');
-        }
+    const applyExpression = (e) => {
+        e.preventDefault();
+        expressionRef.current = expression;
+        fetchResults();
     };
 
-    const startPolling = () => {
-        if (pollIntervalRef.current) return;
-        pollIntervalRef.current = setInterval(fetchStatus, 1500);
+    // SSE: results arrive per symbol as soon as they are scored, progress after each chunk
+    const openStream = (start) => {
+        if (streamRef.current) return;
+        const source = new EventSource(`http://localhost:8000/api/screener/stream${start ? '?start=true' : ''}`);
+        streamRef.current = source;
+        let first = true;
+
+        source.addEventListener('result', (e) => {
+            const item = JSON.parse(e.data);
+            setResults(prev => {
+                const base = first ? [] : prev.filter(r => r.symbol !== item.symbol);
+                first = false;
+                return [...base, item].sort((a, b) => b.score - a.score || a.symbol.localeCompare(b.symbol));
+            });
+        });
+        source.addEventListener('progress', (e) => setStatus(JSON.parse(e.data)));
+        source.addEventListener('done', (e) => {
+            setStatus(JSON.parse(e.data));
+            closeStream();
+            // Final, fully sorted list (with the custom filter applied, if any)
+            fetchResults();
+        });
+        source.onerror = () => {
+            closeStream();
+            fetchStatus();
+        };
     };
 
-    const stopPolling = () => {
-        if (pollIntervalRef.current) {
-            clearInterval(pollIntervalRef.current);
-            pollIntervalRef.current = null;
+    const closeStream = () => {
+        if (streamRef.current) {
+            streamRef.current.close();
+            streamRef.current = null;
         }
     };
 
+    const startScan = () => {
+        setError(null);
+        setStatus({ status: 'running', progress: 0 });
+        openStream(true);
+    };
+
     useEffect(() => {
-        // Initial status check
+        // Initial status check (attaches to a running scan)
         fetchStatus();
-        // If it was already running, start polling
-        if (status.status === 'running') startPolling();
 
         // Also fetch current results if any
         fetchResults();
 
-        return () => stopPolling();
+        return () => closeStream();
     }, []);
 
     const getScoreColor = (score) => {
@@ -122,6 +149,20 @@ const ScreenerView = ({ onSelectSymbol }) => {
                 </div>
             )}
 
+            <form onSubmit={applyExpression} style={{ display: 'flex', gap: '8px', marginBottom: '16px' }}>
+                <div style={{ flex: 1, display: 'flex', alignItems: 'center', gap: '8px', background: 'var(--card-bg)', border: '1px solid var(--border-color)', borderRadius: '8px', padding: '0 12px' }}>
+                    <Search size={16} style={{ color: 'var(--text-dim)' }} />
+                    <input
+                        value={expression}
+                        onChange={(e) => setExpression(e.target.value)}
+                        placeholder="Özel filtre, ör. RSI < 30 and CLOSE > MA200 and VOL > 1.5 * VOL_AVG20"
+                        className="mono"
+                        style={{ flex: 1, background: 'transparent', border: 'none', outline: 'none', color: 'white', padding: '10px 0', fontSize: '0.85rem' }}
+                    />
+                </div>
+                <button type="submit" className="btn-primary" style={{ background: 'var(--accent-color)' }}>Filtrele</button>
+            </form>
+
             {error && (
                 <div style={{ color: '#f44336', display: 'flex', alignItems: 'center', gap: '8px', marginBottom: '16px', padding: '12px', background: 'rgba(244, 67, 54, 0.1)', borderRadius: '8px' }}>
                     <AlertTriangle size={20} /> {error}